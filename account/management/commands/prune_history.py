@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from account.services import prune_history
+
+
+class Command(BaseCommand):
+    help = (
+        'Fold budget history older than the given age into per-month summary rows. '
+        'Interrupted runs can simply be started again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, required=True, metavar='DAYS',
+            help='Prune history of the whole months older than this many days.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows folded per batch.')
+
+    def handle(self, *args, **options):
+        before = timezone.localdate() - timedelta(days=options['older_than'])
+
+        def progress(pruned, remaining):
+            self.stdout.write(f'  {pruned}/{remaining} rows pruned')
+
+        pruned = 0
+        for alias in settings.SHARD_DATABASES or [None]:
+            if alias:
+                self.stdout.write(f'Pruning {alias}')
+            pruned += prune_history(before, batch_size=options['batch_size'], progress=progress, using=alias)
+
+        self.stdout.write(self.style.SUCCESS(f'Folded {pruned} history rows into monthly summaries.'))
@@ -0,0 +1,35 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from account.services import purge_user
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete users and all of their data in bounded batches. '
+        'Interrupted runs can simply be started again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='*', type=int, help='IDs of the users to purge.')
+        parser.add_argument(
+            '--inactive', action='store_true',
+            help='Purge every deactivated user (e.g. accounts whose deletion was requested).'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per batch.')
+
+    def handle(self, *args, **options):
+        user_ids = list(options['user_ids'])
+        if options['inactive']:
+            user_ids += User.objects.filter(is_active=False).order_by('pk').values_list('pk', flat=True)
+        if not user_ids:
+            raise CommandError('Pass user IDs or --inactive.')
+
+        def progress(label, count):
+            self.stdout.write(f'  {label}: {count} rows deleted')
+
+        for index, user_id in enumerate(user_ids, start=1):
+            self.stdout.write(f'[{index}/{len(user_ids)}] Purging user {user_id}')
+            purge_user(user_id, batch_size=options['batch_size'], progress=progress)
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {len(user_ids)} users.'))
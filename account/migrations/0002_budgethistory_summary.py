@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budgethistory',
+            name='summary',
+            field=models.BooleanField(default=False),
+        ),
+    ]
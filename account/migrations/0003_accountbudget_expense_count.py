@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-19 18:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_expenses(apps, schema_editor):
+    AccountBudget = apps.get_model('account', 'AccountBudget')
+    Expense = apps.get_model('category', 'Expense')
+    counts = (
+        Expense.objects.filter(user_id=OuterRef('user_id'))
+        .order_by()
+        .values('user_id')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    AccountBudget.objects.using(schema_editor.connection.alias).update(
+        expense_count=Coalesce(Subquery(counts), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0002_budgethistory_summary'),
+        ('category', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountbudget',
+            name='expense_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_expenses, migrations.RunPython.noop),
+    ]
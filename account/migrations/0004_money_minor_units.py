@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-19 18:50
+
+import core.fields
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Round
+
+MONEY_COLUMNS = [
+    ('AccountBudget', 'budget'),
+    ('BudgetHistory', 'amount'),
+]
+
+
+def scale(factor, precision):
+    def scale_columns(apps, schema_editor):
+        for model_name, field in MONEY_COLUMNS:
+            model = apps.get_model('account', model_name)
+            model.objects.using(schema_editor.connection.alias).update(**{field: Round(F(field) * factor, precision)})
+    return scale_columns
+
+
+class Migration(migrations.Migration):
+    """
+    Store money as integer cents: widen the decimal columns, multiply the
+    values by 100 in place, then switch the columns to BIGINT.
+    """
+
+    dependencies = [
+        ('account', '0003_accountbudget_expense_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='accountbudget',
+            name='budget',
+            field=models.DecimalField(decimal_places=2, default=1000.0, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='budgethistory',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.RunPython(scale(100, 0), scale(Decimal('0.01'), 2)),
+        migrations.AlterField(
+            model_name='accountbudget',
+            name='budget',
+            field=core.fields.MoneyField(default=Decimal('1000.00')),
+        ),
+        migrations.AlterField(
+            model_name='budgethistory',
+            name='amount',
+            field=core.fields.MoneyField(),
+        ),
+    ]
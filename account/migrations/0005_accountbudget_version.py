@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountbudget',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -3,18 +3,20 @@ from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils import timezone
+from decimal import Decimal
+from core.db.sharding import provision_user
+from core.fields import MoneyField
+from core.models import VersionedModel
 
-class AccountBudget(models.Model):
+class AccountBudget(VersionedModel):
     user = models.OneToOneField(
         User, 
         on_delete=models.CASCADE,
         related_name='account_budget'
     )
-    budget = models.DecimalField(
-        max_digits=10, 
-        decimal_places=2, 
-        default=1000.00
-    )
+    budget = MoneyField(default=Decimal('1000.00'))
+    # Maintained by the expense signals; lets expense lists skip COUNT(*).
+    expense_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.user.username}'s Budget: {self.budget}"
@@ -28,11 +30,13 @@ class BudgetHistory(models.Model):
     ]
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="budget_history")
     change_type = models.CharField(max_length=10, choices=CHANGE_TYPES)
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    amount = MoneyField()
     date = models.DateField(default=timezone.now)
     description = models.TextField(blank=True, null=True)
     expense = models.ForeignKey('category.Expense', on_delete=models.SET_NULL, null=True, blank=True, related_name="budget_history")
     category = models.ForeignKey('category.Category', on_delete=models.SET_NULL, null=True, blank=True, related_name="budget_history")
+    # Set on per-month rows that `prune_history` folds older entries into.
+    summary = models.BooleanField(default=False)
 
     def __str__(self):
         return f"{self.user.username} - {self.change_type} - {self.amount} on {self.date}"
@@ -41,9 +45,10 @@ class BudgetHistory(models.Model):
 @receiver(post_save, sender=User)
 def create_account_budget(instance, created, **kwargs):
     if created:
-      account_budget = AccountBudget.objects.create(user=instance)
+      shard = provision_user(instance)
+      account_budget = AccountBudget.objects.db_manager(shard).create(user=instance)
 
-      BudgetHistory.objects.create(
+      BudgetHistory.objects.db_manager(shard).create(
           user=instance,
           change_type=BudgetHistory.INCOME,
           amount=account_budget.budget,
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from core.hashing import hash_password
 from .models import AccountBudget
 
 class UserSerializer(serializers.ModelSerializer):
@@ -11,11 +12,13 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         password = validated_data.pop('password')
         user = User(**validated_data)
-        user.set_password(password)
+        user.password = hash_password(password)
         user.save()
         return user
     
 class AccountBudgetSerializer(serializers.ModelSerializer):
+    budget = serializers.DecimalField(max_digits=10, decimal_places=2)
+
     class Meta:
         model = AccountBudget
         fields = ['budget'] 
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Account purge and data-retention pruning.
+
+Both operations delete in bounded batches with raw DELETE statements, so
+the per-row budget signals in `category.models` never fire. Every batch
+commits on its own: an interrupted run leaves consistent data behind and
+simply continues where it stopped when started again.
+"""
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+from category.models import (
+    Category, CategoryLimit, CategoryLimitEvent, CategorySpend, CategoryToken, Expense
+)
+from core.db.sharding import DIRECTORY_DATABASE, sharding_enabled, use_shard
+from core.models import Change
+from .models import AccountBudget, BudgetHistory
+
+# Children before parents, so no batch leaves a dangling foreign key.
+PURGE_ORDER = (
+    BudgetHistory, CategoryLimitEvent, CategorySpend, CategoryLimit, CategoryToken, Expense, Category,
+    AccountBudget
+)
+
+
+def _delete_in_batches(queryset, using, batch_size):
+    """
+    Raw-delete `queryset` batch by batch, yielding the running total.
+    """
+    deleted = 0
+    while True:
+        ids = list(queryset.using(using).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        with transaction.atomic(using=using):
+            queryset.model.objects.using(using).filter(pk__in=ids)._raw_delete(using)
+        deleted += len(ids)
+        yield deleted
+
+
+def purge_user(user_id, batch_size=1000, progress=None):
+    """
+    Delete a user and all of their data.
+
+    Args:
+        user_id: Primary key of the user to purge.
+        batch_size: Rows deleted per statement.
+        progress: Optional callable receiving (label, rows deleted so far)
+            after each batch.
+
+    Returns:
+        Total number of deleted rows.
+    """
+    total = 0
+
+    def report(label, count):
+        if progress:
+            progress(label, count)
+
+    with use_shard(user_id if sharding_enabled() else None) as alias:
+        for model in PURGE_ORDER:
+            using = router.db_for_write(model)
+            deleted = 0
+            for deleted in _delete_in_batches(model.objects.filter(user_id=user_id), using, batch_size):
+                report(model._meta.label, deleted)
+            total += deleted
+
+        if alias and alias != DIRECTORY_DATABASE:
+            User.objects.using(alias).filter(pk=user_id)._raw_delete(alias)
+
+    deleted = 0
+    for deleted in _delete_in_batches(Change.objects.filter(user_id=user_id), DIRECTORY_DATABASE, batch_size):
+        report(Change._meta.label, deleted)
+    total += deleted
+
+    # Only the user row and small per-user rows are left for the cascade.
+    total += User.objects.using(DIRECTORY_DATABASE).filter(pk=user_id).delete()[0]
+    return total
+
+
+def prune_history(before, batch_size=1000, progress=None, using=None):
+    """
+    Fold budget history older than `before` into per-month summary rows.
+
+    Detail rows are grouped by user, month, change type and category, added
+    to that month's summary row (created if missing) and deleted in the
+    same transaction, so totals per month and category stay unchanged.
+    Only whole months are pruned: `before` is rounded down to the first day
+    of its month.
+
+    Args:
+        before: Date; history dated before its month is pruned.
+        batch_size: Detail rows folded per batch.
+        progress: Optional callable receiving (rows pruned so far, rows
+            remaining when the run started) after each batch.
+        using: Database to prune; defaults to the history database.
+
+    Returns:
+        Number of pruned detail rows.
+    """
+    using = using or router.db_for_write(BudgetHistory)
+    cutoff = before.replace(day=1)
+    details = BudgetHistory.objects.using(using).filter(date__lt=cutoff, summary=False)
+    remaining = details.count()
+    pruned = 0
+
+    while True:
+        with transaction.atomic(using=using):
+            ids = list(details.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return pruned
+            batch = BudgetHistory.objects.using(using).filter(pk__in=ids)
+            groups = (
+                batch.annotate(month=TruncMonth('date'))
+                .values('user_id', 'month', 'change_type', 'category_id')
+                .annotate(total=Sum('amount'))
+                .order_by()
+            )
+            for group in groups:
+                key = {
+                    'user_id': group['user_id'],
+                    'date': group['month'],
+                    'change_type': group['change_type'],
+                    'category_id': group['category_id'],
+                    'summary': True,
+                }
+                summary = (
+                    BudgetHistory.objects.using(using).select_for_update().filter(**key).first()
+                    or BudgetHistory(amount=0, description=f"Summary for {group['month']:%Y-%m}", **key)
+                )
+                summary.amount += group['total']
+                summary.save(using=using)
+            batch._raw_delete(using)
+
+        pruned += len(ids)
+        if progress:
+            progress(pruned, remaining)
@@ -0,0 +1,7 @@
+from core.jobs import task
+from .services import purge_user
+
+
+@task(name='account.purge_user')
+def purge_user_task(user_id):
+    purge_user(user_id)
@@ -0,0 +1,100 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Sum
+from rest_framework.test import force_authenticate
+from account.models import AccountBudget, BudgetHistory
+from account.services import purge_user
+from account.views import AccountDeletionViewSet
+from category.models import Category, Expense
+from core.models import Change, Job
+
+
+@pytest.fixture
+def expenses(user, category):
+    """
+    Fixture to create a handful of expenses.
+    """
+    return [
+        Expense.objects.create(user=user, category=category, amount=Decimal('10.00'), description=f'Expense {i}')
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db
+def test_purge_user_removes_all_data_in_batches(user, expenses):
+    """
+    Test that purging deletes every row of the user without touching other users.
+    """
+    other = User.objects.create_user(username='other', password='password123')
+    progress = []
+
+    purge_user(user.pk, batch_size=2, progress=lambda label, count: progress.append((label, count)))
+
+    assert not User.objects.filter(pk=user.pk).exists()
+    assert not Expense.objects.exists()
+    assert not Category.objects.filter(user_id=user.pk).exists()
+    assert not BudgetHistory.objects.filter(user_id=user.pk).exists()
+    assert not AccountBudget.objects.filter(user_id=user.pk).exists()
+    assert not Change.objects.filter(user_id=user.pk).exists()
+    assert AccountBudget.objects.filter(user=other).exists()
+    assert ('category.Expense', 2) in progress
+    assert ('category.Expense', 5) in progress
+
+
+@pytest.mark.django_db
+def test_account_deletion_deactivates_and_queues_purge(api_request_factory, user):
+    """
+    Test that deleting the account deactivates it and queues a single purge job.
+    """
+    view = AccountDeletionViewSet.as_view({'delete': 'destroy'})
+    for _ in range(2):
+        request = api_request_factory.delete('/account/')
+        force_authenticate(request, user=user)
+        response = view(request)
+
+    assert response.status_code == 202
+    user.refresh_from_db()
+    assert not user.is_active
+    assert Job.objects.filter(task='account.purge_user', payload={'user_id': user.pk}).count() == 1
+
+
+@pytest.mark.django_db
+def test_purge_users_command_purges_inactive_users(user, expenses):
+    """
+    Test that `purge_users --inactive` purges deactivated users.
+    """
+    User.objects.filter(pk=user.pk).update(is_active=False)
+
+    call_command('purge_users', '--inactive', '--batch-size', '2')
+
+    assert not User.objects.filter(pk=user.pk).exists()
+    assert not Expense.objects.exists()
+
+
+@pytest.mark.django_db
+def test_prune_history_folds_old_rows_into_monthly_summaries(user, category):
+    """
+    Test that pruning keeps per-month and per-category totals and is resumable.
+    """
+    rows = [
+        BudgetHistory(user=user, change_type=BudgetHistory.EXPENSE, amount=Decimal('5.00'),
+                      date=date(2020, 1, day), category=category)
+        for day in range(1, 8)
+    ] + [
+        BudgetHistory(user=user, change_type=BudgetHistory.INCOME, amount=Decimal('100.00'), date=date(2020, 2, 3)),
+    ]
+    BudgetHistory.objects.bulk_create(rows)
+    old = BudgetHistory.objects.filter(date__lt=date(2021, 1, 1))
+    totals = list(old.values('change_type', 'category').annotate(total=Sum('amount')).order_by('change_type'))
+
+    call_command('prune_history', '--older-than', '30', '--batch-size', '3')
+    call_command('prune_history', '--older-than', '30', '--batch-size', '3')
+
+    assert list(old.values_list('summary', flat=True).distinct()) == [True]
+    assert old.count() == 2
+    assert list(old.values('change_type', 'category').annotate(total=Sum('amount')).order_by('change_type')) == totals
+    assert old.get(change_type=BudgetHistory.EXPENSE).date == date(2020, 1, 1)
+    assert BudgetHistory.objects.filter(summary=False, description='Initial budget allocation').exists()
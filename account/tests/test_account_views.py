@@ -1,6 +1,8 @@
 import pytest
+from decimal import Decimal
 from account.views import AccountBudgetViewSet, RegisterView
 from account.models import BudgetHistory
+from category.models import Expense
 from rest_framework.test import force_authenticate
 
 
@@ -91,4 +93,33 @@ def test_account_budget_update_invalid(api_request_factory, user, account_budget
     force_authenticate(request, user=user)
     response = view(request, pk=account_budget.id)
     assert response.status_code == 400
-    assert response.data['error'] == "'budget_increase' must be greater than zero."
\ No newline at end of file
+    assert response.data['error'] == "'budget_increase' must be greater than zero."
+
+
+@pytest.mark.django_db
+def test_account_budget_update_with_if_match(api_request_factory, user, account_budget, category):
+    """
+    Test that a budget increase with a stale ETag is refused once an expense changed the budget.
+    """
+    view = AccountBudgetViewSet.as_view({'get': 'retrieve', 'put': 'update'})
+
+    request = api_request_factory.get('/budget/')
+    force_authenticate(request, user=user)
+    read_etag = view(request)['ETag']
+
+    request = api_request_factory.put('/budget/', {'budget_increase': 50}, format='json', HTTP_IF_MATCH=read_etag)
+    force_authenticate(request, user=user)
+    response = view(request)
+    assert response.status_code == 200
+    assert response.data['budget'] == '1050.00'
+    current_etag = response['ETag']
+    assert current_etag != read_etag
+
+    Expense.objects.create(user=user, category=category, amount=Decimal('25.00'), description='Concurrent')
+    request = api_request_factory.put('/budget/', {'budget_increase': 50}, format='json', HTTP_IF_MATCH=current_etag)
+    force_authenticate(request, user=user)
+    assert view(request).status_code == 412
+
+    account_budget.refresh_from_db()
+    assert account_budget.budget == Decimal('1025.00')
+
@@ -1,11 +1,13 @@
 from django.urls import path
 from .views import (
     RegisterView,
+    AccountDeletionViewSet,
     AccountBudgetViewSet
 )
 
 
 account_urls = [
     path('register/', RegisterView.as_view({'post': 'create'}), name='register'),
+    path('account/', AccountDeletionViewSet.as_view({'delete': 'destroy'}), name='account'),
     path('budget/', AccountBudgetViewSet.as_view({'get': 'retrieve', 'put': 'update'}), name='account_budget'),
 ]
\ No newline at end of file
@@ -14,7 +14,16 @@ from rest_framework.response import Response
 from decimal import Decimal, InvalidOperation
 from rest_framework import status
 from django.contrib.auth.models import User
+from django.db import transaction
 from drf_spectacular.utils import extend_schema
+from core.jobs import enqueue
+from core.versioning import (
+    IF_MATCH_PARAMETER,
+    VERSION_CONFLICT_RESPONSE,
+    check_version,
+    etag,
+    expected_version
+)
 from .contrib.unique_none import get_unique_or_none
 from .serializers import (
     UserSerializer,
@@ -28,6 +37,31 @@ class RegisterView(CreateModelMixin, GenericViewSet):
     serializer_class = UserSerializer
     permission_classes = [AllowAny, ]
 
+class AccountDeletionViewSet(GenericViewSet):
+    """
+    Deletes the authenticated user's account.
+
+    The account is deactivated right away; its data is purged in the
+    background by the `account.purge_user` job.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        description=(
+            'Delete the account of the authenticated user. The account is deactivated immediately '
+            'and all of its data is removed in the background.'
+        ),
+        request=None,
+        responses={202: None},
+    )
+    def destroy(self, request, *args, **kwargs):
+        user = request.user
+        with transaction.atomic():
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+            enqueue('account.purge_user', {'user_id': user.pk}, idempotency_key=f'purge-user:{user.pk}')
+        return Response(status=status.HTTP_202_ACCEPTED)
+
 class AccountBudgetViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
     """
     A GenericViewSet for retrieving and updating the user's account budget.
@@ -48,10 +82,15 @@ class AccountBudgetViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet)
         description='Retrieve the budget for the authenticated user.',
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        budget = self.get_object()
+        return Response(self.get_serializer(budget).data, headers={'ETag': etag(budget)})
 
     @extend_schema(
-        description='Increase the budget for the authenticated user.',
+        description=(
+            'Increase the budget for the authenticated user. With `If-Match` set to the ETag '
+            'of a previous response the increase is only applied if the budget has not changed since.'
+        ),
+        parameters=[IF_MATCH_PARAMETER],
         request={
             'application/json': {
                 'type': 'object',
@@ -67,10 +106,12 @@ class AccountBudgetViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet)
         },
         responses={
             200: AccountBudgetSerializer,
+            412: VERSION_CONFLICT_RESPONSE,
         }
     )
     def update(self, request, *args, **kwargs):
         budget = self.get_object()
+        check_version(budget, expected_version(request))
 
         budget_increase = request.data.get('budget_increase')
 
@@ -85,15 +126,16 @@ class AccountBudgetViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet)
         if budget_increase <= 0:
             return Response({'error': "'budget_increase' must be greater than zero."}, status=status.HTTP_400_BAD_REQUEST)
 
-        budget.budget += budget_increase
-        budget.save()
+        with transaction.atomic():
+            budget.budget += budget_increase
+            budget.save()
 
-        BudgetHistory.objects.create(
-            user=request.user,
-            change_type=BudgetHistory.INCOME,
-            amount=budget_increase,
-            description='Manual budget increase'
-        )
+            BudgetHistory.objects.create(
+                user=request.user,
+                change_type=BudgetHistory.INCOME,
+                amount=budget_increase,
+                description='Manual budget increase'
+            )
 
         serializer = self.get_serializer(budget)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers={'ETag': etag(budget)})
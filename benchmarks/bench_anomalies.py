@@ -0,0 +1,107 @@
+"""
+Benchmark of the anomaly detection job (`manage.py detect_anomalies`).
+
+Usage (from the project root, with migrations applied to the configured
+database):
+    python3 benchmarks/bench_anomalies.py --users 100 --per-user 10000 --processes 1 2 4
+
+The script first times the rolling statistics alone (`anomaly_flags`) on
+in-memory arrays. It then gives `--users` scratch users
+`--per-user` expenses each and runs the whole job (streaming, statistics
+and flag writes) with every `--processes` value. Throughput is printed in
+expenses per minute. The scratch users are deleted afterwards.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+USERNAME = 'anomalies-bench'
+CATEGORIES_PER_USER = 20
+
+
+def per_minute(rows, seconds):
+    return f'{rows / seconds * 60 / 1e6:6.2f} M expenses/min'
+
+
+def create_users(args):
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+    from category.models import Category, Expense
+
+    random.seed(42)
+    sql = (
+        f'INSERT INTO {Expense._meta.db_table} (user_id, category_id, amount, description, date, is_anomaly, version) '
+        'VALUES (%s, %s, %s, %s, %s, FALSE, 1)'
+    )
+    start = date.today() - timedelta(days=3650)
+    for index in range(args.users):
+        user = User.objects.create(username=f'{USERNAME}-{index}')
+        with transaction.atomic():
+            category_ids = [
+                category.id for category in Category.objects.bulk_create(
+                    Category(name=f'{USERNAME}-{index}-{number}', user=user) for number in range(CATEGORIES_PER_USER)
+                )
+            ]
+            norms = {category_id: random.randint(5_00, 200_00) for category_id in category_ids}
+            rows = []
+            for _ in range(args.per_user):
+                category_id = random.choice(category_ids)
+                amount = max(1, int(random.gauss(norms[category_id], norms[category_id] * 0.2)))
+                if random.random() < 0.001:
+                    amount *= 10
+                rows.append((user.id, category_id, amount, 'Benchmark', start + timedelta(random.randrange(3650))))
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--per-user', type=int, default=10000)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2])
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from io import StringIO
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from account.services import purge_user
+    from category import anomalies
+
+    size = 1_000_000
+    random.seed(42)
+    categories = sorted(random.randrange(CATEGORIES_PER_USER) for _ in range(size))
+    amounts = [random.randint(5_00, 200_00) for _ in range(size)]
+    gc.collect()
+    started = time.perf_counter()
+    anomalies.anomaly_flags(categories, amounts)
+    print(f'statistics         {per_minute(size, time.perf_counter() - started)}')
+
+    for stale in User.objects.filter(username__startswith=USERNAME):
+        purge_user(stale.id)
+    create_users(args)
+    try:
+        for processes in args.processes:
+            started = time.perf_counter()
+            out = StringIO()
+            call_command('detect_anomalies', '--processes', str(processes), stdout=out)
+            seconds = time.perf_counter() - started
+            print(f'job {processes} process(es) {per_minute(args.users * args.per_user, seconds)}')
+            print(f'  {out.getvalue().splitlines()[-1]}')
+    finally:
+        for user in User.objects.filter(username__startswith=USERNAME):
+            purge_user(user.id, batch_size=10000)
+
+
+if __name__ == '__main__':
+    main()
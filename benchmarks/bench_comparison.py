@@ -0,0 +1,131 @@
+"""
+Benchmark of the `comparison` aggregation on large expense histories.
+
+Usage (from the project root, with migrations applied to the configured
+database):
+    python3 benchmarks/bench_comparison.py --years 10 --categories 50 --per-month 200
+
+The script gives a scratch user `--years` years of expenses spread over
+`--categories` categories and times, for several `--periods` values:
+- `window`: the `comparison` aggregation (one query with `LAG`),
+- `per-month`: one `categories` aggregation per month joined in Python,
+  which is what clients did before.
+The scratch user and its data are deleted afterwards.
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+USERNAME = 'comparison-bench'
+
+
+def timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def create_history(user, args):
+    from django.db import connection
+    from category.models import Category, Expense
+
+    categories = Category.objects.bulk_create(
+        Category(name=f'{USERNAME}-{index}', user=user) for index in range(args.categories)
+    )
+    category_ids = [category.id for category in categories]
+
+    # `Expense.date` is set on creation by the ORM, so rows are inserted directly.
+    random.seed(42)
+    today = date.today()
+    table = Expense._meta.db_table
+    sql = (
+        f'INSERT INTO {table} (user_id, category_id, amount, description, date, is_anomaly, version) '
+        'VALUES (%s, %s, %s, %s, %s, FALSE, 1)'
+    )
+    rows = 0
+    with connection.cursor() as cursor:
+        for months_ago in range(args.years * 12):
+            index = today.year * 12 + today.month - 1 - months_ago
+            batch = [
+                (
+                    user.id, random.choice(category_ids), random.randint(1, 500_00), 'Benchmark',
+                    date(index // 12, index % 12 + 1, random.randint(1, 28)),
+                )
+                for _ in range(args.per_month)
+            ]
+            cursor.executemany(sql, batch)
+            rows += len(batch)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--per-month', type=int, default=200)
+    parser.add_argument('--periods', type=int, nargs='+', default=[2, 12, 36])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from django.db import connection, transaction
+    from account.services import purge_user
+    from category.aggregations import (
+        build_aggregation_filters,
+        comparison_periods,
+        comparison_queryset,
+        expenses_by_categories_queryset,
+        format_comparison
+    )
+
+    for stale in User.objects.filter(username=USERNAME):
+        purge_user(stale.id)
+    user = User.objects.create(username=USERNAME)
+    try:
+        with transaction.atomic():
+            rows = create_history(user, args)
+        print(f'{rows} expenses over {args.years} years in {args.categories} categories ({connection.vendor})')
+
+        for periods in args.periods:
+            query_params = {'periods': str(periods)}
+            months = comparison_periods(query_params)
+
+            def window():
+                return format_comparison(comparison_queryset(query_params, user, months), months)
+
+            def per_month():
+                totals = {}
+                for month in months:
+                    filters = build_aggregation_filters({'year': month.year, 'month': month.month}, user)
+                    for row in expenses_by_categories_queryset(filters):
+                        totals.setdefault(row['category__name'], {})[month] = row['total_expenses']
+                return totals
+
+            window_seconds = timed(window, args.repeat)
+            per_month_seconds = timed(per_month, args.repeat)
+            print(
+                f'periods {periods:3}   window {window_seconds * 1000:8.1f} ms   '
+                f'per-month {per_month_seconds * 1000:8.1f} ms ({periods} queries)'
+            )
+    finally:
+        purge_user(user.id, batch_size=10000)
+
+
+if __name__ == '__main__':
+    main()
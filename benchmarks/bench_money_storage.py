@@ -0,0 +1,118 @@
+"""
+Benchmark comparing NUMERIC money columns with integer cents (`MoneyField`).
+
+Usage (from the project root, against the configured database):
+    python3 benchmarks/bench_money_storage.py --rows 200000 --repeat 5
+
+The script creates two scratch tables with the same amounts, one as
+NUMERIC(14, 2) and one as BIGINT cents, and times:
+- `SUM`/`AVG` aggregation per category in the database,
+- loading every amount through the model field converters,
+- serializing the loaded amounts with the DRF decimal field.
+The scratch tables are dropped afterwards.
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+TABLES = {
+    'numeric': 'bench_money_numeric',
+    'cents': 'bench_money_cents',
+}
+
+
+def timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--database', default='default')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from django.db import connections, models
+    from django.db.models.expressions import Col
+    from rest_framework import serializers
+    from core.fields import MoneyField
+
+    connection = connections[args.database]
+    decimal_field = models.DecimalField(max_digits=14, decimal_places=2)
+    money_field = MoneyField()
+    representation = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+    random.seed(42)
+    cents = [random.randint(1, 5_000_00) for _ in range(args.rows)]
+    categories = [random.randint(1, 20) for _ in range(args.rows)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {TABLES['numeric']} (category integer, amount numeric(14, 2))")
+        cursor.execute(f"CREATE TABLE {TABLES['cents']} (category integer, amount bigint)")
+    try:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {TABLES['numeric']} (category, amount) VALUES (%s, %s)",
+                [(category, Decimal(value) / 100) for category, value in zip(categories, cents)]
+            )
+            cursor.executemany(
+                f"INSERT INTO {TABLES['cents']} (category, amount) VALUES (%s, %s)",
+                list(zip(categories, cents))
+            )
+
+        fields = {'numeric': decimal_field, 'cents': money_field}
+        for kind, table in TABLES.items():
+            # The same converters the ORM applies when loading the column.
+            column = Col(table, fields[kind])
+            converters = connection.ops.get_db_converters(column) + column.get_db_converters(connection)
+
+            def convert(value):
+                for converter in converters:
+                    value = converter(value, column, connection)
+                return value
+
+            def aggregate():
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SELECT category, SUM(amount), AVG(amount) FROM {table} GROUP BY category')
+                    cursor.fetchall()
+
+            def load():
+                with connection.cursor() as cursor:
+                    cursor.execute(f'SELECT amount FROM {table}')
+                    return [convert(value) for (value,) in cursor.fetchall()]
+
+            amounts = load()
+            aggregate_seconds = timed(aggregate, args.repeat)
+            load_seconds = timed(load, args.repeat)
+            serialize_seconds = timed(lambda: [representation.to_representation(a) for a in amounts], args.repeat)
+            print(
+                f'{kind:8} SUM/AVG {aggregate_seconds * 1000:8.1f} ms   '
+                f'load {load_seconds * 1000:8.1f} ms   '
+                f'serialize {serialize_seconds * 1000:8.1f} ms'
+            )
+    finally:
+        with connection.cursor() as cursor:
+            for table in TABLES.values():
+                cursor.execute(f'DROP TABLE {table}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark of the `pivot` aggregation for users with many categories.
+
+Usage (from the project root, with migrations applied to the configured
+database):
+    python3 benchmarks/bench_pivot.py --categories 100 500 --per-category 100
+
+For each `--categories` value the script gives a scratch user a year of
+expenses spread over that many categories and compares, through the API
+views:
+- `pivot`: one `type=pivot` request,
+- `categories`: twelve `type=categories&month=<m>` requests, which is what
+  the yearly report made before.
+It prints the median time and the size of the JSON payloads. The scratch
+user and its data are deleted afterwards.
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+USERNAME = 'pivot-bench'
+YEAR = 2025
+
+
+def timed(func, repeat):
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), result
+
+
+def create_year(user, categories, per_category):
+    from django.db import connection
+    from category.models import Category, Expense
+
+    category_ids = [
+        category.id for category in Category.objects.bulk_create(
+            Category(name=f'{USERNAME}-{user.id}-{index}', user=user) for index in range(categories)
+        )
+    ]
+    # `Expense.date` is set on creation by the ORM, so rows are inserted directly.
+    random.seed(42)
+    sql = (
+        f'INSERT INTO {Expense._meta.db_table} (user_id, category_id, amount, description, date, is_anomaly, version) '
+        'VALUES (%s, %s, %s, %s, %s, FALSE, 1)'
+    )
+    with connection.cursor() as cursor:
+        for category_id in category_ids:
+            cursor.executemany(sql, [
+                (
+                    user.id, category_id, random.randint(1, 500_00), 'Benchmark',
+                    date(YEAR, random.randint(1, 12), random.randint(1, 28)),
+                )
+                for _ in range(per_category)
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--categories', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--per-category', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from account.services import purge_user
+    from category.views import AggregationView
+
+    factory = APIRequestFactory()
+    # Without throttling, which would refuse most of the measured requests.
+    view = AggregationView.as_view(throttle_classes=[])
+
+    def get(user, query):
+        request = factory.get(f'/api/aggregations/?{query}')
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        return len(response.content)
+
+    for stale in User.objects.filter(username__startswith=USERNAME):
+        purge_user(stale.id)
+
+    for categories in args.categories:
+        user = User.objects.create(username=f'{USERNAME}-{categories}')
+        try:
+            with transaction.atomic():
+                create_year(user, categories, args.per_category)
+
+            pivot_seconds, pivot_bytes = timed(lambda: get(user, f'type=pivot&year={YEAR}'), args.repeat)
+            monthly_seconds, monthly_bytes = timed(
+                lambda: sum(get(user, f'type=categories&year={YEAR}&month={month}') for month in range(1, 13)),
+                args.repeat
+            )
+            print(
+                f'{categories:4} categories   pivot {pivot_seconds * 1000:7.1f} ms {pivot_bytes / 1024:7.1f} KiB   '
+                f'12 x categories {monthly_seconds * 1000:7.1f} ms {monthly_bytes / 1024:7.1f} KiB'
+            )
+        finally:
+            purge_user(user.id, batch_size=10000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark of worker start-up with and without `core.warmup`.
+
+Usage (from the project root, with migrations applied to the configured
+database):
+    python3 benchmarks/bench_startup.py --repeat 5 --path /api/expenses/
+
+Every run starts a fresh interpreter that imports `core.wsgi` (timing the
+import, which includes the warm-up when enabled) and then calls the WSGI
+application directly for two authenticated requests to `--path`. Medians
+are printed for warm-up off and on; the gap between the first and second
+request is the cold-start cost the warm-up is meant to remove.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+
+def token():
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, _ = User.objects.get_or_create(username='startup-bench')
+    return str(AccessToken.for_user(user))
+
+
+def child(path, access_token):
+    """
+    Runs in the measured interpreter; prints the timings as JSON.
+    """
+    from io import BytesIO
+    from wsgiref.util import setup_testing_defaults
+
+    start = time.perf_counter()
+    from core.wsgi import application
+    import_seconds = time.perf_counter() - start
+
+    def request():
+        environ = {
+            'PATH_INFO': path,
+            'HTTP_AUTHORIZATION': f'Bearer {access_token}',
+            'wsgi.input': BytesIO(),
+        }
+        setup_testing_defaults(environ)
+        statuses = []
+        start = time.perf_counter()
+        body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+        elapsed = time.perf_counter() - start
+        if not statuses[0].startswith('200'):
+            raise SystemExit(f'{path} returned {statuses[0]}: {body[:200]!r}')
+        return elapsed
+
+    print(json.dumps({
+        'import': import_seconds,
+        'first': request(),
+        'second': request(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--path', default='/api/expenses/')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.path, os.environ['BENCH_ACCESS_TOKEN'])
+
+    env = {**os.environ, 'BENCH_ACCESS_TOKEN': token()}
+    for enabled in ('False', 'True'):
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run(
+                [sys.executable, __file__, '--child', '--path', args.path],
+                env={**env, 'DJANGO_WARMUP_ENABLED': enabled},
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        medians = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+        print(
+            f"warm-up {'on ' if enabled == 'True' else 'off'}  "
+            f"import {medians['import']:7.1f} ms   "
+            f"first request {medians['first']:7.1f} ms   "
+            f"second request {medians['second']:7.1f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
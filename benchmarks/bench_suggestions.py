@@ -0,0 +1,162 @@
+"""
+Benchmark of category suggestions (`GET /api/categories/suggest/`).
+
+Usage (from the project root, with migrations applied to the configured
+database):
+    python3 benchmarks/bench_suggestions.py --expenses 10000 100000 --categories 30
+
+For each `--expenses` value the script gives a scratch user that many
+expenses with descriptions drawn from a small vocabulary, counts their
+tokens (as the migration backfill does) and measures:
+- `load`: building the user's index from `CategoryToken` (a cache miss),
+- `suggest`: `suggest_categories()` served from the cache,
+- `view`: the whole API view with a forced login, including dispatch and
+  rendering,
+- `scan`: the same ranking computed by scanning the user's expenses, for
+  comparison.
+Times are medians. The scratch user and its data are deleted afterwards.
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+USERNAME = 'suggestions-bench'
+WORDS = [
+    'supermarket', 'snacks', 'fruit', 'bakery', 'bread', 'cinema', 'tickets', 'fuel', 'station', 'parking',
+    'pharmacy', 'vitamins', 'restaurant', 'dinner', 'lunch', 'coffee', 'train', 'bus', 'taxi', 'rent',
+    'electricity', 'water', 'internet', 'phone', 'gym', 'books', 'shoes', 'jacket', 'gift', 'flowers',
+]
+QUERY = 'Supermarket snacks and coffee'
+
+
+def timed(func, repeat, number=1):
+    """
+    Median seconds per call over `repeat` samples of `number` calls.
+    """
+    durations = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        durations.append((time.perf_counter() - start) / number)
+    return statistics.median(durations)
+
+
+def create_expenses(user, categories, expenses):
+    from django.db import connection
+    from category.models import Category, CategoryToken, Expense
+    from category.suggestions import tokenize
+
+    category_ids = [
+        category.id for category in Category.objects.bulk_create(
+            Category(name=f'{USERNAME}-{user.id}-{index}', user=user) for index in range(categories)
+        )
+    ]
+    # Every category favours a few words, so the ranking is meaningful.
+    random.seed(42)
+    favourites = {category_id: random.sample(WORDS, 4) for category_id in category_ids}
+    rows = []
+    counts = Counter()
+    for _ in range(expenses):
+        category_id = random.choice(category_ids)
+        words = random.sample(favourites[category_id], 2) + [random.choice(WORDS)]
+        description = ' '.join(words).capitalize()
+        rows.append((user.id, category_id, random.randint(1, 500_00), description))
+        for token in tokenize(description):
+            counts[(category_id, token)] += 1
+    sql = (
+        f'INSERT INTO {Expense._meta.db_table} (user_id, category_id, amount, description, date, is_anomaly, version) '
+        'VALUES (%s, %s, %s, %s, CURRENT_DATE, FALSE, 1)'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+    CategoryToken.objects.bulk_create(
+        [
+            CategoryToken(user=user, category_id=category_id, token=token, count=count)
+            for (category_id, token), count in counts.items()
+        ],
+        batch_size=1000
+    )
+
+
+def scan(user_id, description):
+    """
+    Rank by scanning the user's expenses, i.e. without the token index.
+    """
+    from category.models import Expense
+    from category.suggestions import tokenize
+
+    tokens = set(tokenize(description))
+    counts = defaultdict(Counter)
+    for category_id, text in Expense.objects.filter(user_id=user_id).values_list('category_id', 'description'):
+        for token in tokens.intersection(tokenize(text)):
+            counts[token][category_id] += 1
+    scores = Counter()
+    for by_category in counts.values():
+        total = sum(by_category.values())
+        for category_id, count in by_category.items():
+            scores[category_id] += count / total
+    return scores.most_common(3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--expenses', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--categories', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from account.services import purge_user
+    from category.suggestions import get_cache, load_index, suggest_categories
+    from category.views import CategoryViewSet
+
+    factory = APIRequestFactory()
+    view = CategoryViewSet.as_view({'get': 'suggest'}, throttle_classes=[])
+
+    def get(user):
+        request = factory.get('/api/categories/suggest/', {'description': QUERY})
+        force_authenticate(request, user=user)
+        view(request).render()
+
+    for stale in User.objects.filter(username__startswith=USERNAME):
+        purge_user(stale.id, batch_size=10000)
+
+    for expenses in args.expenses:
+        user = User.objects.create(username=f'{USERNAME}-{expenses}')
+        try:
+            with transaction.atomic():
+                create_expenses(user, args.categories, expenses)
+
+            load_seconds = timed(lambda: load_index(user.id), args.repeat)
+            get_cache().clear()
+            suggest_categories(user.id, QUERY)
+            suggest_seconds = timed(lambda: suggest_categories(user.id, QUERY), args.repeat, number=1000)
+            view_seconds = timed(lambda: get(user), args.repeat, number=100)
+            scan_seconds = timed(lambda: scan(user.id, QUERY), 3)
+            print(
+                f'{expenses:7} expenses   load {load_seconds * 1000:7.2f} ms   '
+                f'suggest {suggest_seconds * 1e6:6.1f} us   view {view_seconds * 1000:6.2f} ms   '
+                f'scan {scan_seconds * 1000:8.1f} ms'
+            )
+        finally:
+            purge_user(user.id, batch_size=10000)
+
+
+if __name__ == '__main__':
+    main()
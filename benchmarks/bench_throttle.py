@@ -0,0 +1,81 @@
+"""
+Benchmark of the per-request overhead of `core.throttling`.
+
+Usage (from the project root):
+    python3 benchmarks/bench_throttle.py --requests 100000 --clients 1000
+
+For the `memory` and `sqlite` stores the script runs both default
+throttles (per user and per IP) against `--requests` requests spread over
+`--clients` users/IPs and prints the median cost per request of several
+runs. The target is under 50 µs per request.
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+
+class FakeUser:
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = pk
+
+
+class FakeRequest:
+    def __init__(self, index):
+        self.user = FakeUser(index)
+        self.META = {'REMOTE_ADDR': f'10.0.{index // 256 % 256}.{index % 256}'}
+
+
+class FakeView:
+    throttle_cost = 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from core import throttling
+
+    random.seed(42)
+    requests = [FakeRequest(random.randrange(args.clients)) for _ in range(args.requests)]
+    view = FakeView()
+
+    with tempfile.TemporaryDirectory() as directory:
+        stores = {
+            'memory': throttling.MemoryRateStore(),
+            'sqlite': throttling.SqliteRateStore(os.path.join(directory, 'throttle.sqlite3')),
+        }
+        for name, store in stores.items():
+            throttling._store = store
+            throttles = [throttling.UserSlidingWindowThrottle(), throttling.IPSlidingWindowThrottle()]
+            durations = []
+            for _ in range(args.repeat):
+                store.reset()
+                gc.collect()
+                start = time.perf_counter()
+                for request in requests:
+                    for throttle in throttles:
+                        throttle.allow_request(request, view)
+                durations.append(time.perf_counter() - start)
+            per_request = statistics.median(durations) / args.requests * 1e6
+            print(f'{name:8} {per_request:7.2f} µs per request (user + IP throttle)')
+
+
+if __name__ == '__main__':
+    main()
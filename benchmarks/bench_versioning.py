@@ -0,0 +1,115 @@
+"""
+Benchmark of conditional (`If-Match`) updates against unguarded ones.
+
+Usage (from the project root, with migrations applied to the configured
+database):
+    python3 benchmarks/bench_versioning.py --requests 2000
+
+Through the API views, a scratch user repeatedly updates:
+- `expense`: one expense with `PATCH /api/expenses/<id>/`,
+- `budget`: the budget with `PUT /api/account/budget/`,
+once without `If-Match` (the unguarded path) and once sending the ETag of
+the previous response, which makes the save a conditional
+`UPDATE ... WHERE version = %s`. It prints the median throughput over
+`--rounds` alternating runs and the queries per request of both. The
+scratch user is deleted afterwards.
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+USERNAME = 'versioning-bench'
+
+
+def run(send, requests, guarded):
+    """
+    Returns:
+        Tuple of (requests per second, queries per request).
+    """
+    from django.db import connection
+
+    queries = 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    etag = send(None)['ETag']
+    gc.collect()
+    with connection.execute_wrapper(count):
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = send(etag if guarded else None)
+            assert response.status_code == 200, response.data
+            etag = response['ETag']
+        seconds = time.perf_counter() - started
+    return requests / seconds, queries / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from decimal import Decimal
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from account.services import purge_user
+    from account.views import AccountBudgetViewSet
+    from category.models import Category, Expense
+    from category.views import ExpenseViewSet
+
+    factory = APIRequestFactory()
+    expense_view = ExpenseViewSet.as_view({'patch': 'partial_update'}, throttle_classes=[])
+    budget_view = AccountBudgetViewSet.as_view({'put': 'update'}, throttle_classes=[])
+
+    for stale in User.objects.filter(username__startswith=USERNAME):
+        purge_user(stale.id)
+    user = User.objects.create(username=USERNAME)
+    try:
+        category = Category.objects.create(name=USERNAME, user=user)
+        expense = Expense.objects.create(user=user, category=category, amount=Decimal('10.00'), description='Bench')
+        amounts = iter(range(1, 10 ** 9))
+
+        def patch_expense(etag):
+            headers = {'HTTP_IF_MATCH': etag} if etag else {}
+            request = factory.patch(
+                f'/api/expenses/{expense.pk}/', {'amount': f'{next(amounts) % 1000 + 1}.00'}, format='json', **headers
+            )
+            force_authenticate(request, user=user)
+            return expense_view(request, pk=expense.pk)
+
+        def put_budget(etag):
+            headers = {'HTTP_IF_MATCH': etag} if etag else {}
+            request = factory.put('/api/account/budget/', {'budget_increase': 1}, format='json', **headers)
+            force_authenticate(request, user=user)
+            return budget_view(request)
+
+        for name, send in (('expense', patch_expense), ('budget', put_budget)):
+            # Alternate the two paths so warm-up and file system noise hit both.
+            results = {False: [], True: []}
+            for _ in range(args.rounds):
+                for guarded in (False, True):
+                    results[guarded].append(run(send, args.requests, guarded))
+            for guarded, runs in results.items():
+                rate = statistics.median(rate for rate, _ in runs)
+                label = 'If-Match  ' if guarded else 'unguarded '
+                print(f'{name:8} {label} {rate:8.0f} requests/s   {runs[0][1]:5.1f} queries/request')
+    finally:
+        purge_user(user.id, batch_size=10000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Load test comparing the sync WSGI aggregation endpoints with their async ASGI
+counterparts, both served by uvicorn.
+
+Usage (from the project root, against the configured database):
+    python3 benchmarks/load_async_aggregations.py --clients 32 --requests 2000
+
+The script seeds a `loadtest` user with expenses, starts uvicorn once with
+`core.wsgi:application` (`--interface wsgi`) and once with
+`core.asgi:application`, then hammers the equivalent endpoints from a pool
+of concurrent clients and reports throughput and latency percentiles.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+SCENARIOS = [
+    ('wsgi', 'core.wsgi:application', '/api/aggregations/?type=total'),
+    ('asgi', 'core.asgi:application', '/api/async/aggregations/?type=total'),
+    ('wsgi', 'core.wsgi:application', '/api/aggregations/?type=categories'),
+    ('asgi', 'core.asgi:application', '/api/async/aggregations/?type=categories'),
+    ('asgi', 'core.asgi:application', '/api/async/aggregations/?type=total,categories,average'),
+    ('wsgi', 'core.wsgi:application', '/api/expenses/'),
+    ('asgi', 'core.asgi:application', '/api/async/expenses/'),
+]
+
+
+def seed(expenses):
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+    from category.models import Category, Expense
+
+    user, created = User.objects.get_or_create(username='loadtest')
+    if created:
+        user.set_password('loadtest!pwd')
+        user.save()
+    missing = expenses - Expense.objects.filter(user=user).count()
+    if missing > 0:
+        categories = [
+            Category.objects.get_or_create(name=f'loadtest-{i}', user=user)[0]
+            for i in range(10)
+        ]
+        for i in range(missing):
+            Expense.objects.create(
+                user=user,
+                category=categories[i % len(categories)],
+                amount=Decimal(i % 97 + 1),
+                description=f'Load test expense {i}'
+            )
+    return str(AccessToken.for_user(user))
+
+
+def wait_for_server(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/', timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    raise RuntimeError('uvicorn did not start in time')
+
+
+def run_scenario(interface, app, path, token, args):
+    cmd = [
+        sys.executable, '-m', 'uvicorn', app,
+        '--port', str(args.port), '--workers', str(args.workers), '--log-level', 'warning',
+    ]
+    if interface == 'wsgi':
+        cmd += ['--interface', 'wsgi']
+    server = subprocess.Popen(cmd, cwd=BASE_DIR)
+    try:
+        wait_for_server(args.port)
+        url = f'http://127.0.0.1:{args.port}{path}'
+        headers = {'Authorization': f'Bearer {token}'}
+        session = requests.Session()
+
+        def hit(_):
+            started = time.perf_counter()
+            response = session.get(url, headers=headers)
+            response.raise_for_status()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = sorted(pool.map(hit, range(args.requests)))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f'{interface:5} {path:55} {args.requests / elapsed:8.1f} req/s  '
+        f'p50 {statistics.median(latencies) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--expenses', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    token = seed(args.expenses)
+    for interface, app, path in SCENARIOS:
+        run_scenario(interface, app, path, token, args)
+
+
+if __name__ == '__main__':
+    main()
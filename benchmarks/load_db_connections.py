@@ -0,0 +1,157 @@
+"""
+Load test comparing plain PostgreSQL connections with the pooled backend.
+
+Usage (from the project root, with the Postgres settings from backend.env
+exported and migrations applied):
+    python3 benchmarks/load_db_connections.py --clients 32 --requests 3000
+
+For each engine the script starts uvicorn with `core.wsgi:application`,
+hits `/api/budget/` from concurrent clients and meanwhile samples
+`pg_stat_activity` to count distinct backend PIDs (connection churn) and the
+peak number of open connections. For the pooled engine it also prints the
+pool metrics exposed at `/api/metrics/db-pool/`.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import psycopg2
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+ENGINES = [
+    'django.db.backends.postgresql',
+    'core.db.backends.pooled_postgresql',
+]
+
+
+def tokens():
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, _ = User.objects.get_or_create(username='loadtest')
+    staff, _ = User.objects.get_or_create(username='loadtest-staff', defaults={'is_staff': True})
+    return str(AccessToken.for_user(user)), str(AccessToken.for_user(staff))
+
+
+class ActivitySampler(threading.Thread):
+    """
+    Poll pg_stat_activity for backends of the benchmark database.
+    """
+
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.pids = set()
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.connection = psycopg2.connect(
+            dbname=os.environ['DJANGO_DB_NAME'],
+            user=os.environ['DJANGO_DB_USER'],
+            password=os.environ['DJANGO_DB_PASSWORD'],
+            host=os.environ['DJANGO_DB_HOST'],
+            port=os.environ.get('DJANGO_DB_PORT') or 5432,
+        )
+        self.connection.autocommit = True
+        self.own_pid = self.connection.get_backend_pid()
+
+    def run(self):
+        with self.connection.cursor() as cursor:
+            while not self.stopped.is_set():
+                cursor.execute(
+                    'SELECT pid FROM pg_stat_activity WHERE datname = %s AND pid <> %s',
+                    [os.environ['DJANGO_DB_NAME'], self.own_pid]
+                )
+                pids = {row[0] for row in cursor.fetchall()}
+                self.pids |= pids
+                self.peak = max(self.peak, len(pids))
+                time.sleep(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.connection.close()
+
+
+def run_engine(engine, token, staff_token, args):
+    env = dict(os.environ, DJANGO_DB_ENGINE=engine)
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'uvicorn', 'core.wsgi:application', '--interface', 'wsgi',
+            '--port', str(args.port), '--log-level', 'warning',
+        ],
+        cwd=BASE_DIR, env=env,
+    )
+    base_url = f'http://127.0.0.1:{args.port}'
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                requests.get(f'{base_url}/api/', timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+        headers = {'Authorization': f'Bearer {token}'}
+        session = requests.Session()
+
+        def hit(_):
+            started = time.perf_counter()
+            session.get(f'{base_url}/api/budget/', headers=headers).raise_for_status()
+            return time.perf_counter() - started
+
+        sampler = ActivitySampler()
+        sampler.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = sorted(pool.map(hit, range(args.requests)))
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+
+        pool_metrics = None
+        if engine.startswith('core.'):
+            pool_metrics = session.get(
+                f'{base_url}/api/metrics/db-pool/',
+                headers={'Authorization': f'Bearer {staff_token}'}
+            ).json()
+    finally:
+        server.terminate()
+        server.wait()
+
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f'{engine:40} {args.requests / elapsed:8.1f} req/s  '
+        f'p50 {statistics.median(latencies) * 1000:6.2f} ms  p95 {p95 * 1000:6.2f} ms  '
+        f'backends seen {len(sampler.pids):5}  peak open {sampler.peak:3}'
+    )
+    if pool_metrics is not None:
+        print(f'{"":40} pool: {pool_metrics}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    token, staff_token = tokens()
+    for engine in ENGINES:
+        run_engine(engine, token, staff_token, args)
+
+
+if __name__ == '__main__':
+    main()
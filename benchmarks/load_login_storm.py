@@ -0,0 +1,128 @@
+"""
+Load test: latency of other endpoints during a login storm.
+
+Usage (from the project root, with migrations applied to the configured
+database):
+    python3 benchmarks/load_login_storm.py --logins 64 --duration 10
+
+For inline hashing (`DJANGO_PASSWORD_HASHING_WORKERS=0`) and for the
+hashing pool the script starts uvicorn with `core.wsgi:application`,
+measures `/api/budget/` latency on its own, then again while `--logins`
+clients keep posting to `/api/login/`. It prints the budget p50/p95 for
+both phases and the login status codes (200, or 429/503 when the pool
+sheds load).
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+USERNAME = 'login-storm'
+PASSWORD = 'login-storm-password'
+WORKER_SETTINGS = ('0', '2')
+
+
+def token():
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, _ = User.objects.get_or_create(username=USERNAME)
+    user.set_password(PASSWORD)
+    user.save()
+    return str(AccessToken.for_user(user))
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    return f'p50 {statistics.median(latencies) * 1000:7.2f} ms  p95 {p95 * 1000:7.2f} ms'
+
+
+def run(workers, access_token, args):
+    env = dict(os.environ, DJANGO_PASSWORD_HASHING_WORKERS=workers)
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'uvicorn', 'core.wsgi:application', '--interface', 'wsgi',
+            '--port', str(args.port), '--log-level', 'warning',
+        ],
+        cwd=BASE_DIR, env=env,
+    )
+    base_url = f'http://127.0.0.1:{args.port}'
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                requests.get(f'{base_url}/api/', timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+        session = requests.Session()
+        headers = {'Authorization': f'Bearer {access_token}'}
+
+        def budget_latencies(seconds):
+            latencies = []
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                started = time.perf_counter()
+                session.get(f'{base_url}/api/budget/', headers=headers).raise_for_status()
+                latencies.append(time.perf_counter() - started)
+            return latencies
+
+        baseline = budget_latencies(args.duration / 2)
+
+        statuses = Counter()
+        stop = threading.Event()
+
+        def login_client(_):
+            client = requests.Session()
+            while not stop.is_set():
+                response = client.post(f'{base_url}/api/login/', data={'username': USERNAME, 'password': PASSWORD})
+                statuses[response.status_code] += 1
+
+        with ThreadPoolExecutor(max_workers=args.logins) as pool:
+            storm = [pool.submit(login_client, index) for index in range(args.logins)]
+            time.sleep(0.5)
+            during_storm = budget_latencies(args.duration)
+            stop.set()
+            for future in storm:
+                future.result()
+    finally:
+        server.terminate()
+        server.wait()
+
+    label = 'inline hashing' if workers == '0' else f'pool of {workers}'
+    print(f'{label:16} budget alone       {percentiles(baseline)}')
+    print(f'{"":16} budget under storm {percentiles(during_storm)}  logins {dict(sorted(statuses.items()))}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=64, help='Concurrent login clients.')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds to measure under the storm.')
+    parser.add_argument('--port', type=int, default=8767)
+    args = parser.parse_args()
+
+    access_token = token()
+    for workers in WORKER_SETTINGS:
+        run(workers, access_token, args)
+
+
+if __name__ == '__main__':
+    main()
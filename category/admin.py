@@ -1,10 +1,14 @@
 from django.contrib import admin
 from .models import (
     Category,
+    CategoryLimit,
+    CategoryLimitEvent,
+    CategorySpend,
+    CategoryToken,
     Expense
 )
 
 
 admin.site.register([
-    Category, Expense
+    Category, Expense, CategoryLimit, CategorySpend, CategoryLimitEvent, CategoryToken
 ])
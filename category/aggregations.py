@@ -0,0 +1,340 @@
+from datetime import date
+
+from django.db.models import (
+    F,
+    Q,
+    Sum,
+    Avg,
+    Window
+)
+from django.db.models.functions import ExtractMonth, Lag, RowNumber, TruncMonth
+
+from account.models import BudgetHistory
+from core.fields import MoneyField
+
+from .models import Expense
+
+AGGREGATION_TYPES = ('total', 'categories', 'average', 'comparison', 'top', 'pivot')
+
+INVALID_TYPE_ERROR = (
+    'Invalid type parameter. Use "total", "categories", "average", "comparison", "top", or "pivot".'
+)
+
+DEFAULT_COMPARISON_PERIODS = 2
+MAX_COMPARISON_PERIODS = 36
+
+DEFAULT_TOP_EXPENSES = 3
+MAX_TOP_EXPENSES = 50
+
+PIVOT_DIMENSIONS = ('category', 'month')
+
+
+def build_aggregation_filters(query_params, user):
+    """
+    Build the Q filter shared by every aggregation type.
+
+    Args:
+        query_params: Request query parameters (year, month, date, categories).
+        user: Authenticated user whose data is aggregated.
+
+    Returns:
+        Q object restricting rows to the user and the requested period/categories.
+
+    Raises:
+        ValueError: If `categories` contains non-integer IDs.
+    """
+    year = query_params.get('year')
+    month = query_params.get('month')
+    date = query_params.get('date')
+    categories = query_params.get('categories')
+
+    if categories:
+        try:
+            categories = list(map(int, categories.split(',')))
+        except ValueError:
+            raise ValueError('Invalid category IDs. Must be integers.')
+
+    filters = Q(user=user)
+    if year:
+        filters &= Q(date__year=year)
+    if month:
+        filters &= Q(date__month=month)
+    if date:
+        filters &= Q(date=date)
+    if categories:
+        filters &= Q(category_id__in=categories)
+    return filters
+
+
+def total_queryset(filters):
+    """
+    BudgetHistory rows feeding the `total` aggregation.
+    """
+    budget_filters = filters & ~Q(category_id__in=[])
+    return BudgetHistory.objects.filter(budget_filters)
+
+
+TOTAL_AGGREGATES = {
+    'total_earned': Sum('amount', filter=Q(change_type='income')),
+    'total_spent': Sum('amount', filter=Q(change_type='expense')),
+}
+
+
+def format_total(earnings):
+    """
+    Turn the raw `TOTAL_AGGREGATES` result into the `total` response payload.
+    """
+    total_earnings = (earnings['total_earned'] or 0) - (earnings['total_spent'] or 0)
+    if total_earnings < 0:
+        total_earnings = 0
+    return {
+        'total_earned': earnings['total_earned'] or 0,
+        'total_spent': earnings['total_spent'] or 0,
+        'net_earnings': total_earnings
+    }
+
+
+def expenses_by_categories_queryset(filters):
+    """
+    Expenses grouped by category with their summed amount.
+    """
+    return Expense.objects.filter(filters).values('category__name').annotate(
+        total_expenses=Sum('amount')
+    ).order_by('-total_expenses')
+
+
+def average_expenses_queryset(filters):
+    """
+    Expenses grouped by category with their average amount.
+    """
+    return Expense.objects.filter(filters).values('category__name').annotate(
+        average_expense=Avg('amount', output_field=MoneyField())
+    ).order_by('-average_expense')
+
+
+def shift_month(day, months):
+    """
+    First day of the month `months` months after the month of `day`.
+    """
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def comparison_periods(query_params, today=None):
+    """
+    Months compared by the `comparison` aggregation.
+
+    Args:
+        query_params: Request query parameters (periods, year, month).
+        today: Date whose month is the last period when `year`/`month` are
+            not given. Defaults to the current date.
+
+    Returns:
+        First days of `periods` consecutive months, oldest first.
+
+    Raises:
+        ValueError: If `periods`, `year` or `month` is invalid.
+    """
+    try:
+        periods = int(query_params.get('periods') or DEFAULT_COMPARISON_PERIODS)
+    except ValueError:
+        periods = 0
+    if not 1 <= periods <= MAX_COMPARISON_PERIODS:
+        raise ValueError(
+            f'Invalid periods parameter. Must be an integer between 1 and {MAX_COMPARISON_PERIODS}.'
+        )
+
+    today = today or date.today()
+    try:
+        last = date(int(query_params.get('year') or today.year), int(query_params.get('month') or today.month), 1)
+    except ValueError:
+        raise ValueError('Invalid year or month parameter.')
+    return [shift_month(last, offset) for offset in range(1 - periods, 1)]
+
+
+def comparison_queryset(query_params, user, periods):
+    """
+    Monthly expense totals per category, each row with the total and month
+    of the category's previous row (`LAG` over the monthly GROUP BY).
+
+    The month before the first period is included so its total is the
+    previous one of the first period.
+    """
+    window = {'partition_by': [F('category_id')], 'order_by': F('period').asc()}
+    filters = build_aggregation_filters({'categories': query_params.get('categories')}, user)
+    return Expense.objects.filter(
+        filters,
+        date__gte=shift_month(periods[0], -1),
+        date__lt=shift_month(periods[-1], 1),
+    ).annotate(
+        period=TruncMonth('date')
+    ).values('category_id', 'category__name', 'period').annotate(
+        total=Sum('amount')
+    ).annotate(
+        previous_total=Window(Lag('total'), **window),
+        previous_period=Window(Lag('period'), **window),
+    ).order_by('category__name', 'category_id', 'period')
+
+
+def format_comparison(rows, periods):
+    """
+    Turn `comparison_queryset` rows into the `comparison` response payload:
+    every category with expenses in the compared months, with its total,
+    change and percent change for each month. Months without expenses
+    count as 0.
+    """
+    categories = {}
+    for row in rows:
+        categories.setdefault(row['category_id'], {})[row['period']] = row
+
+    comparison = []
+    for months in categories.values():
+        if not any(period in months for period in periods):
+            continue
+        results = []
+        for period in periods:
+            previous_month = shift_month(period, -1)
+            row = months.get(period)
+            if row is not None:
+                total = row['total']
+                # LAG returns the category's previous month *with expenses*.
+                previous = row['previous_total'] if row['previous_period'] == previous_month else 0
+            else:
+                total = 0
+                previous = months[previous_month]['total'] if previous_month in months else 0
+            change = total - previous
+            results.append({
+                'period': period.strftime('%Y-%m'),
+                'total': total,
+                'change': change,
+                'percent_change': round(float(change / previous * 100), 2) if previous else None,
+            })
+        name = next(iter(months.values()))['category__name']
+        comparison.append({'category__name': name, 'periods': results})
+
+    return {
+        'periods': [period.strftime('%Y-%m') for period in periods],
+        'comparison': comparison,
+    }
+
+
+def top_expenses_limit(query_params):
+    """
+    Number of expenses per category returned by the `top` aggregation.
+
+    Raises:
+        ValueError: If `n` is not an integer between 1 and `MAX_TOP_EXPENSES`.
+    """
+    try:
+        n = int(query_params.get('n') or DEFAULT_TOP_EXPENSES)
+    except ValueError:
+        n = 0
+    if not 1 <= n <= MAX_TOP_EXPENSES:
+        raise ValueError(f'Invalid n parameter. Must be an integer between 1 and {MAX_TOP_EXPENSES}.')
+    return n
+
+
+def top_expenses_queryset(filters, n):
+    """
+    The `n` largest expenses of every category, ranked with `ROW_NUMBER()`
+    per category (ties broken by the newest expense).
+    """
+    return Expense.objects.filter(filters).annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F('category_id')],
+            order_by=[F('amount').desc(), F('id').desc()],
+        )
+    ).filter(
+        rank__lte=n
+    ).values(
+        'id', 'category_id', 'category__name', 'amount', 'description', 'date', 'rank'
+    ).order_by('category__name', 'category_id', 'rank')
+
+
+def format_top_expenses(rows):
+    """
+    Group `top_expenses_queryset` rows into the `top` response payload.
+    """
+    categories = {}
+    for row in rows:
+        category = categories.get(row['category_id'])
+        if category is None:
+            category = categories[row['category_id']] = {'category__name': row['category__name'], 'expenses': []}
+        category['expenses'].append({
+            'id': row['id'],
+            'amount': row['amount'],
+            'description': row['description'],
+            'date': row['date'],
+        })
+    return {'top_expenses': list(categories.values())}
+
+
+def pivot_options(query_params, today=None):
+    """
+    Layout and year of the `pivot` aggregation.
+
+    Args:
+        query_params: Request query parameters (rows, cols, year).
+        today: Date whose year is used when `year` is not given. Defaults
+            to the current date.
+
+    Returns:
+        Tuple of (row dimension, column dimension, year).
+
+    Raises:
+        ValueError: If `rows`/`cols` are not one each of `PIVOT_DIMENSIONS`
+            or `year` is not an integer.
+    """
+    rows = query_params.get('rows') or 'category'
+    cols = query_params.get('cols') or 'month'
+    if {rows, cols} != set(PIVOT_DIMENSIONS):
+        raise ValueError('Invalid rows or cols parameter. Use "category" and "month".')
+    try:
+        year = int(query_params.get('year') or (today or date.today()).year)
+    except ValueError:
+        raise ValueError('Invalid year parameter. Must be an integer.')
+    return rows, cols, year
+
+
+def pivot_queryset(query_params, user, year):
+    """
+    Expense totals of `year` grouped by category and month.
+    """
+    params = {name: query_params.get(name) for name in ('month', 'date', 'categories')}
+    filters = build_aggregation_filters(dict(params, year=year), user)
+    return Expense.objects.filter(filters).annotate(
+        month=ExtractMonth('date')
+    ).values('category_id', 'category__name', 'month').annotate(
+        total=Sum('amount')
+    ).order_by()
+
+
+def format_pivot(rows, row_dimension, year):
+    """
+    Turn `pivot_queryset` rows into the `pivot` response payload: the
+    labels of both dimensions and a flat row-major array with a value per
+    cell, 0 where there were no expenses.
+
+    Categories with expenses are sorted by name; months run from January
+    to December.
+    """
+    categories = {}
+    for row in rows:
+        categories.setdefault((row['category__name'], row['category_id']), []).append(row)
+    category_keys = sorted(categories)
+
+    category_labels = [name for name, _ in category_keys]
+    month_labels = [f'{year}-{month:02d}' for month in range(1, 13)]
+    values = [0] * (len(category_labels) * 12)
+    for category_index, key in enumerate(category_keys):
+        for row in categories[key]:
+            month_index = row['month'] - 1
+            if row_dimension == 'category':
+                values[category_index * 12 + month_index] = row['total']
+            else:
+                values[month_index * len(category_labels) + category_index] = row['total']
+
+    if row_dimension == 'category':
+        return {'rows': category_labels, 'cols': month_labels, 'values': values}
+    return {'rows': month_labels, 'cols': category_labels, 'values': values}
@@ -0,0 +1,133 @@
+"""
+Spending anomaly detection.
+
+An expense is an anomaly when its amount is more than `threshold` standard
+deviations above the mean of the `window` expenses before it in the same
+category, i.e. above the user's norm for that category. Nothing is flagged
+until a category has `min_history` earlier expenses, nor when those
+expenses are all (nearly) the same amount.
+
+`detect_anomalies()` streams a database's expenses ordered by user,
+category and date as plain integers (cents, skipping the `MoneyField`
+converters) and evaluates one user at a time. The rolling statistics of
+a user are computed vectorized with NumPy from cumulative sums. Only flags
+that changed are written, with bulk UPDATEs once the read is done.
+"""
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+from django.db.models import BigIntegerField, ExpressionWrapper, F
+from django.db.models.functions import Mod
+
+from .models import Expense
+
+DEFAULT_WINDOW = 50
+DEFAULT_MIN_HISTORY = 10
+DEFAULT_THRESHOLD = 3.0
+# Windows with a smaller standard deviation (in cents) are treated as constant.
+MIN_STD = 0.5
+UPDATE_BATCH_SIZE = 500
+
+
+def anomaly_flags(categories, amounts, window=DEFAULT_WINDOW, min_history=DEFAULT_MIN_HISTORY,
+                  threshold=DEFAULT_THRESHOLD):
+    """
+    Flag the anomalies among one user's expenses.
+
+    Args:
+        categories: Category ID of every expense.
+        amounts: Amount of every expense in cents.
+            Both sorted by category, then chronologically within a category.
+
+    Returns:
+        NumPy array of booleans, one per expense.
+    """
+    categories = np.asarray(categories)
+    amounts = np.asarray(amounts, dtype=np.int64)
+    position = np.arange(len(amounts))
+    first = np.ones(len(amounts), dtype=bool)
+    first[1:] = categories[1:] != categories[:-1]
+    category_start = np.maximum.accumulate(np.where(first, position, 0))
+    start = np.maximum(category_start, position - window)
+    count = position - start
+
+    # Integer running sums of the amounts relative to the first of their
+    # category: differences of them are exact (even if a sum wraps around),
+    # so windows of equal amounts get a variance of exactly 0.
+    values = amounts - amounts[category_start]
+    sums = np.concatenate(([0], np.cumsum(values)))
+    squares = np.concatenate(([0], np.cumsum(values * values)))
+    total = (sums[position] - sums[start]).astype(np.float64)
+    total_squares = (squares[position] - squares[start]).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(total_squares / count - mean * mean, 0))
+        return (count >= min_history) & (std >= MIN_STD) & (values - mean > threshold * std)
+
+
+def _flag_changes(ids, current, flags):
+    ids, current = np.asarray(ids), np.asarray(current, dtype=bool)
+    return ids[flags & ~current].tolist(), ids[~flags & current].tolist()
+
+
+def _iter_users(using, processes, index, chunk_size):
+    queryset = Expense.objects.using(using)
+    if processes > 1:
+        queryset = queryset.annotate(partition=Mod('user_id', processes)).filter(partition=index)
+    rows = queryset.annotate(
+        cents=ExpressionWrapper(F('amount'), output_field=BigIntegerField())
+    ).order_by(
+        'user_id', 'category_id', 'date', 'id'
+    ).values_list(
+        'user_id', 'id', 'category_id', 'cents', 'is_anomaly'
+    ).iterator(chunk_size=chunk_size)
+    for user_id, user_rows in groupby(rows, key=itemgetter(0)):
+        _, ids, categories, amounts, current = zip(*user_rows)
+        yield user_id, ids, categories, amounts, current
+
+
+def _write_flags(ids, value, using):
+    # Flags are not part of the expense representation, so `version` is left as is.
+    for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+        Expense.objects.using(using).filter(pk__in=ids[start:start + UPDATE_BATCH_SIZE]).update(is_anomaly=value)
+
+
+def detect_anomalies(using='default', processes=1, index=0, window=DEFAULT_WINDOW,
+                     min_history=DEFAULT_MIN_HISTORY, threshold=DEFAULT_THRESHOLD, chunk_size=10000):
+    """
+    Recompute the anomaly flags of the expenses in one database.
+
+    Args:
+        using: Database alias (e.g. one shard).
+        processes, index: Only users whose ID modulo `processes` is `index`
+            are processed, so `processes` workers can split a database.
+        chunk_size: Rows fetched per round trip.
+
+    Returns:
+        Dict with the number of users and expenses processed and of
+        expenses newly flagged and cleared.
+    """
+    stats = {'users': 0, 'expenses': 0, 'flagged': 0, 'cleared': 0}
+    flagged, cleared = [], []
+    for _, ids, categories, amounts, current in _iter_users(using, processes, index, chunk_size):
+        flags = anomaly_flags(categories, amounts, window, min_history, threshold)
+        user_flagged, user_cleared = _flag_changes(ids, current, flags)
+        flagged += user_flagged
+        cleared += user_cleared
+        stats['users'] += 1
+        stats['expenses'] += len(ids)
+
+    _write_flags(flagged, True, using)
+    _write_flags(cleared, False, using)
+    stats['flagged'], stats['cleared'] = len(flagged), len(cleared)
+    return stats
+
+
+def detect_partition(task):
+    """
+    Run `detect_anomalies` for one (database, partition) task in a worker
+    process.
+    """
+    using, processes, index, options = task
+    return using, detect_anomalies(using, processes, index, **options)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CategoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'category'
+
+    def ready(self):
+        # Connects the category spend counter and suggestion token signals.
+        from . import limits, suggestions  # noqa: F401
@@ -0,0 +1,252 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import (
+    APIException,
+    Throttled
+)
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import (
+    remove_query_param,
+    replace_query_param
+)
+
+from .aggregations import (
+    AGGREGATION_TYPES,
+    INVALID_TYPE_ERROR,
+    TOTAL_AGGREGATES,
+    build_aggregation_filters,
+    total_queryset,
+    format_total,
+    expenses_by_categories_queryset,
+    average_expenses_queryset,
+    comparison_periods,
+    comparison_queryset,
+    format_comparison,
+    top_expenses_limit,
+    top_expenses_queryset,
+    format_top_expenses,
+    pivot_options,
+    pivot_queryset,
+    format_pivot
+)
+from .expense_pagination import ExpensePagination
+from .fieldsets import parse_fieldset
+from .views import AggregationView, ExpenseViewSet
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder)
+
+
+@sync_to_async
+def _authenticate(request):
+    """
+    Run the authentication classes used by the DRF views and return the user.
+
+    DRF views are synchronous, so the async views authenticate the same way
+    but outside of APIView; with sharding this also selects the user's
+    shard. Returns None if no valid token was supplied.
+    """
+    drf_request = Request(
+        request, authenticators=[authentication() for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    user = drf_request.user
+    if not user or not user.is_authenticated:
+        return None
+    return user
+
+
+@sync_to_async
+def _check_throttles(request, view):
+    """
+    Run the throttle classes used by the DRF views.
+
+    Throttle stores may block (the SQLite store writes to disk), so this
+    runs in a worker thread instead of on the event loop. Returns the
+    Throttled exception of the first throttle that rejects the request,
+    or None.
+    """
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            return Throttled(wait=throttle.wait())
+    return None
+
+
+class AsyncAPIView(View):
+    """
+    Base class for async views authenticated with the JWT Bearer token.
+
+    Subclasses implement `aget` and receive the authenticated user.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            user = await _authenticate(request)
+        except APIException as e:
+            # Invalid tokens, or a user being moved to another shard.
+            return _json({'detail': str(e.detail)}, status=e.status_code)
+        if user is None:
+            return _json(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401
+            )
+
+        request.user = user
+        exc = await _check_throttles(request, self)
+        if exc is not None:
+            response = _json({'detail': str(exc.detail)}, status=exc.status_code)
+            if exc.wait is not None:
+                response['Retry-After'] = str(exc.wait)
+            return response
+        return await self.aget(request, user, *args, **kwargs)
+
+
+class AsyncAggregationView(AsyncAPIView):
+    """
+    Async counterpart of `AggregationView`.
+
+    `type` accepts a comma-separated list (e.g. `?type=total,categories`);
+    the requested sub-aggregations are awaited together and merged into a
+    single response. With one type the payload matches `AggregationView`.
+    """
+    throttle_cost = AggregationView.throttle_cost
+
+    async def aget(self, request, user, *args, **kwargs):
+        agg_types = [t for t in request.GET.get('type', '').split(',') if t]
+        if not agg_types or any(t not in AGGREGATION_TYPES for t in agg_types):
+            return _json({'error': INVALID_TYPE_ERROR}, status=400)
+
+        try:
+            filters = build_aggregation_filters(request.GET, user)
+            periods = comparison_periods(request.GET) if 'comparison' in agg_types else None
+            n = top_expenses_limit(request.GET) if 'top' in agg_types else None
+            pivot = pivot_options(request.GET) if 'pivot' in agg_types else None
+        except ValueError as e:
+            return _json({'error': str(e)}, status=400)
+
+        handlers = {
+            'total': self.get_total,
+            'categories': self.get_expenses_by_categories,
+            'average': self.get_average_expenses,
+            'comparison': lambda filters: self.get_comparison(request.GET, user, periods),
+            'top': lambda filters: self.get_top_expenses(filters, n),
+            'pivot': lambda filters: self.get_pivot(request.GET, user, pivot),
+        }
+        results = await asyncio.gather(*(
+            handlers[agg_type](filters) for agg_type in dict.fromkeys(agg_types)
+        ))
+
+        data = {}
+        for result in results:
+            data.update(result)
+        return _json(data)
+
+    async def get_total(self, filters):
+        earnings = await total_queryset(filters).aaggregate(**TOTAL_AGGREGATES)
+        return format_total(earnings)
+
+    async def get_expenses_by_categories(self, filters):
+        return {
+            'expenses_by_category': [
+                row async for row in expenses_by_categories_queryset(filters)
+            ]
+        }
+
+    async def get_average_expenses(self, filters):
+        return {
+            'average_expenses': [
+                row async for row in average_expenses_queryset(filters)
+            ]
+        }
+
+    async def get_comparison(self, query_params, user, periods):
+        rows = [row async for row in comparison_queryset(query_params, user, periods)]
+        return format_comparison(rows, periods)
+
+    async def get_top_expenses(self, filters, n):
+        return format_top_expenses([row async for row in top_expenses_queryset(filters, n)])
+
+    async def get_pivot(self, query_params, user, pivot):
+        rows, _, year = pivot
+        totals = [row async for row in pivot_queryset(query_params, user, year)]
+        return format_pivot(totals, rows, year)
+
+
+class AsyncExpenseListView(AsyncAPIView):
+    """
+    Async counterpart of `ExpenseViewSet.list`.
+
+    Filtering, search and ordering are delegated to `ExpenseViewSet` so both
+    endpoints accept the same query parameters; the page and the total count
+    are then fetched concurrently with the async ORM.
+    """
+    pagination_class = ExpensePagination
+
+    async def aget(self, request, user, *args, **kwargs):
+        drf_request = Request(request)
+        drf_request.user = user
+        viewset = ExpenseViewSet(
+            request=drf_request, action='list', format_kwarg=None, args=args, kwargs=kwargs
+        )
+
+        pagination = self.pagination_class()
+        try:
+            viewset.sparse_fields, viewset.expand = parse_fieldset(request.GET)
+            queryset = viewset.get_ordered_queryset(
+                viewset.filter_queryset(viewset.get_queryset()),
+                '-date'
+            )
+            page_number = int(request.GET.get(pagination.page_query_param, 1))
+            count_mode = pagination.get_count_mode(drf_request)
+        except (APIException, ValueError) as e:
+            return _json({'error': str(e)}, status=400)
+
+        page_size = pagination.page_size
+        if page_number < 1:
+            return _json({'detail': 'Invalid page.'}, status=404)
+        offset = (page_number - 1) * page_size
+
+        if count_mode == 'none':
+            page = await self.fetch_page(queryset[offset:offset + page_size + 1])
+            has_next = len(page) > page_size
+            page, count, total_pages = page[:page_size], None, None
+        else:
+            count, page = await asyncio.gather(
+                self.fetch_count(pagination, queryset, drf_request, count_mode),
+                self.fetch_page(queryset[offset:offset + page_size])
+            )
+            total_pages = max(1, -(-count // page_size))
+            if page_number > total_pages:
+                return _json({'detail': 'Invalid page.'}, status=404)
+            has_next = page_number < total_pages
+
+        serializer = viewset.get_serializer(page, many=True)
+        return _json({
+            'next': self.get_link(request, page_number + 1) if has_next else None,
+            'previous': self.get_link(request, page_number - 1) if page_number > 1 else None,
+            'count': count,
+            'total_pages': total_pages,
+            'current': page_number,
+            'results': serializer.data
+        })
+
+    async def fetch_count(self, pagination, queryset, request, count_mode):
+        if count_mode == 'exact':
+            return await queryset.acount()
+        return await sync_to_async(pagination.get_estimated_count)(queryset, request)
+
+    async def fetch_page(self, queryset):
+        return [expense async for expense in queryset]
+
+    def get_link(self, request, page_number):
+        url = request.build_absolute_uri()
+        param = self.pagination_class.page_query_param
+        if page_number == 1:
+            return remove_query_param(url, param)
+        return replace_query_param(url, param, page_number)
@@ -1,16 +1,133 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from account.models import AccountBudget
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator that uses a known `count` instead of running COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            self.count = count
 
 
 class ExpensePagination(PageNumberPagination):
+    """
+    Page number pagination with a choice of how `count` is obtained.
+
+    `?count=` selects the mode:
+    - `estimated` (default): the user's expense counter for unfiltered lists,
+      otherwise a count cached for `count_cache_timeout` seconds per filter.
+    - `exact`: a COUNT(*) over the filtered expenses.
+    - `none`: no count; `count` and `total_pages` are null.
+    """
     page_size = 5
+    count_query_param = 'count'
+    count_modes = ('estimated', 'exact', 'none')
+    count_cache_timeout = 30
+    # Query parameters that do not change which expenses are listed.
+    non_filter_params = ('page', 'ordering', 'fields', 'expand', 'count')
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, 'estimated')
+        if mode not in self.count_modes:
+            raise ValueError(f"Invalid count parameter. Use {', '.join(map(repr, self.count_modes))}.")
+        return mode
+
+    def get_filter_params(self, request):
+        return sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            if key not in self.non_filter_params
+            for value in values
+        )
+
+    def get_estimated_count(self, queryset, request):
+        """
+        Count from the expense counter or the cache; None if unknown.
+        """
+        filter_params = self.get_filter_params(request)
+        if not filter_params:
+            return (
+                AccountBudget.objects.filter(user=request.user)
+                .values_list('expense_count', flat=True)
+                .first()
+            )
+
+        digest = hashlib.sha1(repr(filter_params).encode()).hexdigest()
+        key = f'expense-count:{request.user.pk}:{digest}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout=self.count_cache_timeout)
+        return count
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == 'none':
+            return self.paginate_without_count(queryset, request)
+
+        count = self.get_estimated_count(queryset, request) if self.count_mode == 'estimated' else None
+        self.django_paginator_class = lambda object_list, per_page: CountedPaginator(object_list, per_page, count)
+        return super().paginate_queryset(queryset, request, view)
+
+    def paginate_without_count(self, queryset, request):
+        """
+        Fetch one extra row to know whether a next page exists.
+        """
+        self.request = request
+        self.page = None
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.page_number, message=''))
+
+        offset = (self.page_number - 1) * self.page_size
+        rows = list(queryset[offset:offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        return rows[:self.page_size]
+
+    def get_next_link(self):
+        if self.page is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page is not None:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
 
     def get_paginated_response(self, data):
+        if self.page is None:
+            count, total_pages, current = None, None, self.page_number
+        else:
+            count = self.page.paginator.count
+            total_pages = self.page.paginator.num_pages
+            current = self.page.number
         return Response({
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
-            'count': self.page.paginator.count,
-            'total_pages': self.page.paginator.num_pages,
-            'current': self.page.number,
+            'count': count,
+            'total_pages': total_pages,
+            'current': current,
             'results': data
-        })
\ No newline at end of file
+        })
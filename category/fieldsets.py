@@ -0,0 +1,55 @@
+"""
+Sparse fieldsets and related-object expansion for expense responses.
+
+`?fields=id,amount` limits both the serialized fields and the selected
+columns; `?expand=category` inlines the category object, fetched with a
+join instead of a second request to `/api/categories/`.
+"""
+EXPENSE_FIELDS = ('id', 'amount', 'description', 'date', 'category', 'user')
+
+# Related fields that can be expanded, with the columns needed to serialize them.
+EXPANDABLE_FIELDS = {
+    'category': ('category__id', 'category__name', 'category__user'),
+}
+
+
+def _parse_list(value, allowed, param):
+    if value is None:
+        return None
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    invalid = [name for name in names if name not in allowed]
+    if invalid:
+        raise ValueError(
+            f"Invalid {param} parameter: {', '.join(invalid)}. Allowed values: {', '.join(allowed)}."
+        )
+    return names
+
+
+def parse_fieldset(query_params):
+    """
+    Read the `fields` and `expand` query parameters.
+
+    Returns:
+        Tuple of (field names or None for all fields, expanded field names).
+
+    Raises:
+        ValueError: If a parameter names an unknown field.
+    """
+    fields = _parse_list(query_params.get('fields'), EXPENSE_FIELDS, 'fields')
+    expand = _parse_list(query_params.get('expand'), tuple(EXPANDABLE_FIELDS), 'expand') or []
+    return fields, expand
+
+
+def apply_fieldset(queryset, fields=None, expand=()):
+    """
+    Restrict an expense queryset to the columns a fieldset serializes.
+    """
+    expand = [name for name in expand if fields is None or name in fields]
+    for name in expand:
+        queryset = queryset.select_related(name)
+    if fields is None:
+        return queryset
+    columns = list(fields)
+    for name in expand:
+        columns += EXPANDABLE_FIELDS[name]
+    return queryset.only(*columns)
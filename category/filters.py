@@ -8,10 +8,11 @@ class ExpenseFilter(filters.FilterSet):
     end_date = filters.DateFilter(field_name='date', lookup_expr='lte')
     date = filters.DateFilter(field_name='date')
     category = filters.CharFilter(method='filter_category')
+    is_anomaly = filters.BooleanFilter()
 
     class Meta:
         model = Expense
-        fields = ['min_price', 'max_price', 'date', 'start_date', 'end_date', 'category', ]
+        fields = ['min_price', 'max_price', 'date', 'start_date', 'end_date', 'category', 'is_anomaly', ]
     
     def filter_category(self, queryset, name, value):
         """
@@ -0,0 +1,221 @@
+"""
+Per-category monthly limits.
+
+`CategorySpend` holds the month-to-date total of every (user, category,
+month). The expense signals below, and the bulk services in
+`category.services`, adjust it with atomic `F()` updates, so checking a
+limit or listing remaining balances is a lookup by key instead of a sum
+over the month's expenses. Crossing a threshold of a limit records a
+`CategoryLimitEvent` once.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.exceptions import ValidationError
+
+from core.fields import MoneyField
+from .models import CategoryLimit, CategoryLimitEvent, CategorySpend, Expense
+
+
+def month_of(day):
+    return day.replace(day=1)
+
+
+def add_spend(user_id, category_id, month, amount, using=None, create=True):
+    """
+    Atomically add `amount` (negative to subtract) to a spend counter.
+
+    Subtractions pass `create=False`: a missing counter then means the
+    category is being deleted and there is nothing left to adjust. They
+    never take a counter below zero, and as they cannot cross a limit
+    threshold the counter is not read back.
+
+    Returns:
+        Tuple of the counter value before and after the change, or None
+        with `create=False`.
+    """
+    using = using or router.db_for_write(CategorySpend)
+    spends = CategorySpend.objects.using(using).filter(user_id=user_id, category_id=category_id, month=month)
+    new_amount = F('amount') + Value(amount, output_field=MoneyField())
+    if amount < 0:
+        new_amount = Greatest(new_amount, Value(0, output_field=MoneyField()))
+    updated = spends.update(amount=new_amount)
+    if not create:
+        return None
+    if not updated:
+        try:
+            with transaction.atomic(using=using):
+                CategorySpend.objects.using(using).create(
+                    user_id=user_id, category_id=category_id, month=month, amount=amount
+                )
+        except IntegrityError:
+            spends.update(amount=new_amount)
+    after = spends.values_list('amount', flat=True).get()
+    return after - amount, after
+
+
+def record_limit_events(user_id, category_id, month, before, after, using=None):
+    """
+    Record the limit thresholds crossed by moving from `before` to `after`.
+
+    The unique constraint on events makes each threshold fire only once per
+    month, even if spending drops below it and rises again.
+    """
+    if after <= before:
+        return []
+    using = using or router.db_for_write(CategoryLimitEvent)
+    limit = CategoryLimit.objects.using(using).filter(user_id=user_id, category_id=category_id).first()
+    if limit is None:
+        return []
+    events = [
+        CategoryLimitEvent(
+            user_id=user_id,
+            category_id=category_id,
+            month=month,
+            threshold=threshold,
+            spent=after,
+            monthly_limit=limit.monthly_limit
+        )
+        for threshold in CategoryLimitEvent.THRESHOLDS
+        if before < limit.monthly_limit * threshold / 100 <= after
+    ]
+    return CategoryLimitEvent.objects.using(using).bulk_create(events, ignore_conflicts=True)
+
+
+def adjust_spends(user_id, rows, sign=1, using=None):
+    """
+    Apply many expense rows to the counters with one update per
+    (category, month). Rows are dicts with `category_id`, `date` and `amount`.
+    """
+    totals = defaultdict(Decimal)
+    for row in rows:
+        totals[(row['category_id'], month_of(row['date']))] += row['amount']
+    for (category_id, month), amount in totals.items():
+        if sign < 0:
+            add_spend(user_id, category_id, month, -amount, using=using, create=False)
+            continue
+        before, after = add_spend(user_id, category_id, month, amount, using=using)
+        record_limit_events(user_id, category_id, month, before, after, using=using)
+
+
+def check_limit(user, category, day, amount, previous=None):
+    """
+    Check an expense against the user's limit on its category.
+
+    Args:
+        user: Owner of the expense.
+        category: Category the expense is booked on.
+        day: Date of the expense.
+        amount: New expense amount.
+        previous: The expense before an update, whose amount is already
+            counted when it stays in the same category and month.
+
+    Returns:
+        A warning message if a `warn` limit would be exceeded, otherwise None.
+
+    Raises:
+        ValidationError: If a `block` limit would be exceeded.
+    """
+    limit = CategoryLimit.objects.filter(user=user, category=category).first()
+    if limit is None:
+        return None
+    month = month_of(day)
+    spent = (
+        CategorySpend.objects.select_for_update()
+        .filter(user=user, category=category, month=month)
+        .values_list('amount', flat=True)
+        .first()
+    ) or Decimal('0')
+    if previous is not None and previous.category_id == category.pk and month_of(previous.date) == month:
+        spent -= previous.amount
+    if spent + amount <= limit.monthly_limit:
+        return None
+    message = (
+        f'Expense exceeds the monthly limit of {limit.monthly_limit} for category '
+        f'{category.name} ({limit.monthly_limit - spent} remaining).'
+    )
+    if limit.action == CategoryLimit.BLOCK:
+        raise ValidationError({'error': message})
+    return message
+
+
+def check_block_limits(user_id, old_rows, new_rows, using=None):
+    """
+    Check a set-based change of many expenses against the user's `block`
+    limits, before the counters are adjusted. Rows are dicts with
+    `category_id`, `date` and `amount`: `old_rows` leave their counters and
+    `new_rows` are added to theirs. Only counters that grow are checked.
+
+    Raises:
+        ValidationError: If a grown counter would exceed a `block` limit.
+    """
+    deltas = defaultdict(Decimal)
+    for sign, rows in ((-1, old_rows), (1, new_rows)):
+        for row in rows:
+            deltas[(row['category_id'], month_of(row['date']))] += sign * row['amount']
+    grown = {key: delta for key, delta in deltas.items() if delta > 0}
+    if not grown:
+        return
+
+    using = using or router.db_for_write(CategoryLimit)
+    limits = {
+        limit.category_id: limit
+        for limit in CategoryLimit.objects.using(using).select_related('category').filter(
+            user_id=user_id, action=CategoryLimit.BLOCK, category_id__in={category_id for category_id, _ in grown}
+        )
+    }
+    if not limits:
+        return
+    spends = {
+        (category_id, month): amount
+        for category_id, month, amount in CategorySpend.objects.using(using).select_for_update().filter(
+            user_id=user_id, category_id__in=limits, month__in={month for _, month in grown}
+        ).values_list('category_id', 'month', 'amount')
+    }
+    for (category_id, month), delta in sorted(grown.items()):
+        limit = limits.get(category_id)
+        if limit is None:
+            continue
+        spent = spends.get((category_id, month), Decimal('0'))
+        if spent + delta > limit.monthly_limit:
+            raise ValidationError({
+                'error': (
+                    f'Expenses exceed the monthly limit of {limit.monthly_limit} for category '
+                    f'{limit.category.name} in {month:%Y-%m} ({limit.monthly_limit - spent} remaining).'
+                )
+            })
+
+
+@receiver(post_save, sender=Expense)
+def update_category_spend_on_save(instance, created, raw=False, **kwargs):
+    """
+    Move the expense amount between spend counters when it is created or updated.
+    """
+    if raw:
+        return
+    month = month_of(instance.date)
+    amount = instance.amount
+    previous = None if created else getattr(instance, '_previous_state', None)
+    if previous is not None:
+        if previous.category_id == instance.category_id and month_of(previous.date) == month:
+            amount -= previous.amount
+        else:
+            add_spend(instance.user_id, previous.category_id, month_of(previous.date), -previous.amount, create=False)
+    if amount < 0:
+        add_spend(instance.user_id, instance.category_id, month, amount, create=False)
+    elif amount > 0:
+        before, after = add_spend(instance.user_id, instance.category_id, month, amount)
+        record_limit_events(instance.user_id, instance.category_id, month, before, after)
+
+
+@receiver(post_delete, sender=Expense)
+def update_category_spend_on_delete(instance, **kwargs):
+    """
+    Remove the expense amount from its spend counter when it is deleted.
+    """
+    add_spend(instance.user_id, instance.category_id, month_of(instance.date), -instance.amount, create=False)
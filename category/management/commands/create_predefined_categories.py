@@ -1,5 +1,9 @@
 from django.core.management.base import BaseCommand
 from category.models import Category
+from core.db.sharding import (
+    replicate_to_shards,
+    sharding_enabled
+)
 
 PREDEFINED_CATEGORIES = [
     'Food & Groceries',
@@ -13,9 +17,15 @@ class Command(BaseCommand):
     help = 'Create predefined categories'
 
     def handle(self, *args, **kwargs):
+        categories = []
         for category_name in PREDEFINED_CATEGORIES:
             category, created = Category.objects.get_or_create(name=category_name, user=None)
+            categories.append(category)
             if created:
                 self.stdout.write(self.style.SUCCESS(f'Created category: {category_name}'))
             else:
-                self.stdout.write(self.style.WARNING(f'Category already exists: {category_name}'))
\ No newline at end of file
+                self.stdout.write(self.style.WARNING(f'Category already exists: {category_name}'))
+
+        if sharding_enabled():
+            replicate_to_shards(Category, categories)
+            self.stdout.write(self.style.SUCCESS('Replicated predefined categories to every shard.'))
\ No newline at end of file
@@ -0,0 +1,81 @@
+import multiprocessing
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from category import anomalies
+from core.db.sharding import DIRECTORY_DATABASE
+
+
+class Command(BaseCommand):
+    help = (
+        'Flag expenses far above the usual amount of their category for the user. '
+        'Flags are recomputed from scratch, so the job can run as often as needed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window', type=int, default=anomalies.DEFAULT_WINDOW,
+            help='Number of previous expenses in the category forming the norm.'
+        )
+        parser.add_argument(
+            '--min-history', type=int, default=anomalies.DEFAULT_MIN_HISTORY,
+            help='Previous expenses a category needs before anything is flagged.'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=anomalies.DEFAULT_THRESHOLD,
+            help='Standard deviations above the mean that make an anomaly.'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Worker processes; every database is split among them by user.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows fetched per round trip.')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['min_history'] <= options['window']:
+            raise CommandError('--min-history must be between 1 and --window.')
+        if options['processes'] < 1:
+            raise CommandError('--processes must be at least 1.')
+
+        processes = options['processes']
+        detect_options = {
+            'window': options['window'],
+            'min_history': options['min_history'],
+            'threshold': options['threshold'],
+            'chunk_size': options['chunk_size'],
+        }
+        # Users created before sharding was enabled stay on the directory database.
+        databases = list(dict.fromkeys([DIRECTORY_DATABASE, *settings.SHARD_DATABASES]))
+        tasks = [(using, processes, index, detect_options) for using in databases for index in range(processes)]
+
+        self.stdout.write(f'Detecting anomalies in {", ".join(databases)} with {processes} process(es).')
+
+        if processes == 1:
+            results = map(anomalies.detect_partition, tasks)
+        else:
+            # Connections must not be shared with the forked workers.
+            connections.close_all()
+            pool = multiprocessing.Pool(processes, initializer=django.setup)
+            results = pool.imap_unordered(anomalies.detect_partition, tasks)
+
+        totals = {'users': 0, 'expenses': 0, 'flagged': 0, 'cleared': 0}
+        try:
+            for using, stats in results:
+                for key, value in stats.items():
+                    totals[key] += value
+                self.stdout.write(
+                    f'  {using}: {stats["expenses"]} expenses of {stats["users"]} users, '
+                    f'{stats["flagged"]} flagged, {stats["cleared"]} cleared'
+                )
+        finally:
+            if processes > 1:
+                pool.close()
+                pool.join()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {totals["expenses"]} expenses of {totals["users"]} users: '
+            f'{totals["flagged"]} newly flagged, {totals["cleared"]} cleared.'
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 18:50
+
+import core.fields
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Round
+
+
+def scale(factor, precision):
+    def scale_amounts(apps, schema_editor):
+        Expense = apps.get_model('category', 'Expense')
+        Expense.objects.using(schema_editor.connection.alias).update(amount=Round(F('amount') * factor, precision))
+    return scale_amounts
+
+
+class Migration(migrations.Migration):
+    """
+    Store expense amounts as integer cents: widen the decimal column,
+    multiply the values by 100 in place, then switch the column to BIGINT.
+    """
+
+    dependencies = [
+        ('category', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expense',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+        migrations.RunPython(scale(100, 0), scale(Decimal('0.01'), 2)),
+        migrations.AlterField(
+            model_name='expense',
+            name='amount',
+            field=core.fields.MoneyField(),
+        ),
+    ]
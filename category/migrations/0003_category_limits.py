@@ -0,0 +1,79 @@
+# Generated by Django 4.2 on 2026-10-19 18:06
+
+import core.fields
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_spends(apps, schema_editor):
+    Expense = apps.get_model('category', 'Expense')
+    CategorySpend = apps.get_model('category', 'CategorySpend')
+    using = schema_editor.connection.alias
+    totals = (
+        Expense.objects.using(using)
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'category_id', 'month')
+        .annotate(amount=Sum('amount'))
+        .order_by()
+    )
+    CategorySpend.objects.using(using).bulk_create(
+        [CategorySpend(**total) for total in totals.iterator()],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('category', '0002_expense_amount_minor_units'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategorySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('amount', core.fields.MoneyField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spends', to='category.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_spends', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'category', 'month')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryLimitEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('threshold', models.PositiveSmallIntegerField()),
+                ('spent', core.fields.MoneyField()),
+                ('monthly_limit', core.fields.MoneyField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='limit_events', to='category.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_limit_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'category', 'month', 'threshold')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryLimit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monthly_limit', core.fields.MoneyField()),
+                ('action', models.CharField(choices=[('warn', 'Warn'), ('block', 'Block')], default='warn', max_length=10)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='limits', to='category.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_limits', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill_spends, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0004_expense_user_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'category', 'amount'], name='category_expense_user_cat_amt'),
+        ),
+    ]
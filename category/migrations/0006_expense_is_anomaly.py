@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0005_expense_user_category_amount_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='is_anomaly',
+            field=models.BooleanField(default=False),
+        ),
+    ]
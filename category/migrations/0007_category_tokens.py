@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-19 18:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import re
+from collections import Counter
+
+# Frozen copy of `category.suggestions.tokenize` as of this migration, so
+# later changes to the tokenizer do not change what this backfill counts.
+TOKEN_RE = re.compile(r'[^\W\d_]{2,}')
+MAX_TOKENS = 20
+MAX_TOKEN_LENGTH = 50
+
+
+def tokenize(description):
+    words = TOKEN_RE.findall((description or '').lower())
+    return list(dict.fromkeys(word[:MAX_TOKEN_LENGTH] for word in words))[:MAX_TOKENS]
+
+
+def backfill_tokens(apps, schema_editor):
+    Expense = apps.get_model('category', 'Expense')
+    CategoryToken = apps.get_model('category', 'CategoryToken')
+    using = schema_editor.connection.alias
+    counts = Counter()
+    rows = Expense.objects.using(using).values_list('user_id', 'category_id', 'description')
+    for user_id, category_id, description in rows.iterator():
+        for token in tokenize(description):
+            counts[(user_id, category_id, token)] += 1
+    CategoryToken.objects.using(using).bulk_create(
+        [
+            CategoryToken(user_id=user_id, category_id=category_id, token=token, count=count)
+            for (user_id, category_id, token), count in counts.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('category', '0006_expense_is_anomaly'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to='category.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'token', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill_tokens, migrations.RunPython.noop),
+    ]
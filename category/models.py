@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
 from django.db.models.signals import (
     post_save,
@@ -8,6 +10,8 @@ from django.db.models.signals import (
 from django.dispatch import receiver
 from account.contrib.unique_none import get_unique_or_none
 from account.models import AccountBudget, BudgetHistory
+from core.fields import MoneyField
+from core.models import VersionedModel
 
 
 class Category(models.Model):
@@ -21,16 +25,108 @@ class Category(models.Model):
         return self.name
 
 
-class Expense(models.Model):
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
+class Expense(VersionedModel):
+    amount = MoneyField()
     description = models.TextField(blank=True, null=True)
     date = models.DateField(auto_now_add=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='expenses')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='expenses')
+    # Set by the `detect_anomalies` command (see `category.anomalies`).
+    is_anomaly = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            # Date ranges of one user's expenses (month-over-month comparison).
+            models.Index(fields=['user', 'date'], name='category_expense_user_date'),
+            # Largest expenses of one user per category (top-N aggregation).
+            models.Index(fields=['user', 'category', 'amount'], name='category_expense_user_cat_amt'),
+        ]
 
     def __str__(self):
         return f'{self.amount} - {self.category.name}'
-    
+
+
+class CategoryLimit(models.Model):
+    """
+    Monthly spending limit a user sets on a category.
+    """
+    WARN = 'warn'
+    BLOCK = 'block'
+    ACTIONS = [
+        (WARN, 'Warn'),
+        (BLOCK, 'Block'),
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_limits')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='limits')
+    monthly_limit = MoneyField()
+    action = models.CharField(max_length=10, choices=ACTIONS, default=WARN)
+
+    class Meta:
+        unique_together = ('user', 'category')
+
+    def __str__(self):
+        return f'{self.user_id} - {self.category_id}: {self.monthly_limit} ({self.action})'
+
+
+class CategorySpend(models.Model):
+    """
+    Month-to-date spending of a user in a category, kept current by the
+    expense signals so limit checks never have to sum expenses.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_spends')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='spends')
+    month = models.DateField()
+    amount = MoneyField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'category', 'month')
+
+    def __str__(self):
+        return f'{self.user_id} - {self.category_id} {self.month:%Y-%m}: {self.amount}'
+
+
+class CategoryLimitEvent(models.Model):
+    """
+    Recorded once when a user's monthly spending in a category crosses a
+    threshold (a percentage) of its limit.
+    """
+    THRESHOLDS = (80, 100)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_limit_events')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='limit_events')
+    month = models.DateField()
+    threshold = models.PositiveSmallIntegerField()
+    spent = MoneyField()
+    monthly_limit = MoneyField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'category', 'month', 'threshold')
+
+    def __str__(self):
+        return f'{self.user_id} - {self.category_id} {self.month:%Y-%m}: {self.threshold}%'
+
+
+class CategoryToken(models.Model):
+    """
+    How many of a user's expenses in a category have a word (token) in
+    their description. Kept current by the expense signals; category
+    suggestions rank categories by these counts.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_tokens')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='tokens')
+    token = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'token', 'category')
+
+    def __str__(self):
+        return f'{self.user_id} - {self.token} -> {self.category_id}: {self.count}'
+
+
+def _adjust_expense_count(budget, value):
+    # Applied in SQL, so concurrent signals never overwrite each other's count.
+    AccountBudget.objects.using(budget._state.db).filter(pk=budget.pk).update(expense_count=value)
 
 
 @receiver(pre_save, sender=Expense)
@@ -56,7 +152,8 @@ def update_budget_on_save(instance, created, **kwargs):
 
     if created:
         budget.budget -= instance.amount
-        budget.save()
+        budget.save(update_fields=['budget'])
+        _adjust_expense_count(budget, F('expense_count') + 1)
 
         BudgetHistory.objects.create(
             user=instance.user,
@@ -96,7 +193,7 @@ def update_budget_on_save(instance, created, **kwargs):
                     category=instance.category
                 )
 
-        budget.save()
+        budget.save(update_fields=['budget'])
 
 @receiver(post_delete, sender=Expense)
 def update_budget_on_delete(instance, **kwargs):
@@ -107,7 +204,8 @@ def update_budget_on_delete(instance, **kwargs):
     if budget is None:
         raise ValueError(f'AccountBudget not found for user {instance.user}')
     budget.budget += instance.amount
-    budget.save()
+    budget.save(update_fields=['budget'])
+    _adjust_expense_count(budget, Greatest(F('expense_count') - 1, 0))
 
     BudgetHistory.objects.create(
         user=instance.user,
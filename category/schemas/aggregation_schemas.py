@@ -46,6 +46,66 @@ average_response_schema = inline_serializer(
     },
 )
 
+comparison_response_schema = inline_serializer(
+    name='ComparisonResponse',
+    fields={
+        'periods': serializers.ListField(child=serializers.CharField()),
+        'comparison': serializers.ListField(
+            child=inline_serializer(
+                name='CategoryComparison',
+                fields={
+                    'category__name': serializers.CharField(),
+                    'periods': serializers.ListField(
+                        child=inline_serializer(
+                            name='CategoryPeriodChange',
+                            fields={
+                                'period': serializers.CharField(),
+                                'total': serializers.DecimalField(max_digits=10, decimal_places=2),
+                                'change': serializers.DecimalField(max_digits=10, decimal_places=2),
+                                'percent_change': serializers.FloatField(allow_null=True),
+                            },
+                        )
+                    ),
+                },
+            )
+        ),
+    },
+)
+
+top_response_schema = inline_serializer(
+    name='TopExpensesResponse',
+    fields={
+        'top_expenses': serializers.ListField(
+            child=inline_serializer(
+                name='CategoryTopExpenses',
+                fields={
+                    'category__name': serializers.CharField(),
+                    'expenses': serializers.ListField(
+                        child=inline_serializer(
+                            name='TopExpense',
+                            fields={
+                                'id': serializers.IntegerField(),
+                                'amount': serializers.DecimalField(max_digits=10, decimal_places=2),
+                                'description': serializers.CharField(allow_null=True),
+                                'date': serializers.DateField(),
+                            },
+                        )
+                    ),
+                },
+            )
+        ),
+    },
+)
+
+pivot_response_schema = inline_serializer(
+    name='PivotResponse',
+    fields={
+        'rows': serializers.ListField(child=serializers.CharField()),
+        'cols': serializers.ListField(child=serializers.CharField()),
+        'values': serializers.ListField(child=serializers.DecimalField(max_digits=10, decimal_places=2)),
+    },
+)
+
 error_response_schema = inline_serializer(
     name='ErrorResponse',
     fields={
@@ -63,14 +123,27 @@ aggregation_schema = extend_schema(
         '  - `total`: Returns total earned, total spent, and net earnings.\n'
         '  - `categories`: Returns expenses grouped by categories.\n'
         '  - `average`: Returns average expenses grouped by categories.\n'
+        '  - `comparison`: Returns per-category totals of consecutive months with '
+        'the change and percent change against the previous month.\n'
+        '  - `top`: Returns the largest expenses of every category.\n'
+        '  - `pivot`: Returns a category by month table of a year as row labels, column labels '
+        'and a flat row-major array of totals.\n'
         '- `year` (optional): Filter data by a specific year.\n'
         '- `month` (optional): Filter data by a specific month.\n'
         '- `date` (optional): Filter data by a specific date.\n'
-        '- `categories` (optional): A list of category IDs to filter expenses.\n\n'
+        '- `categories` (optional): A list of category IDs to filter expenses.\n'
+        '- `periods` (optional): Number of months compared by `comparison` (default 2). '
+        'The last one is the month given by `year`/`month`, or the current month.\n'
+        '- `n` (optional): Number of expenses per category returned by `top` (default 3).\n'
+        '- `rows`, `cols` (optional): Dimensions of the `pivot` table, `category` and `month` '
+        '(default) or `month` and `category`.\n\n'
         '**Examples**:\n'
         '- `?type=total&year=2025`: Get total earnings and expenses for the year 2025.\n'
         '- `?type=categories&month=4`: Get expenses grouped by categories for April.\n'
-        '- `?type=average&categories=1,2`: Get average expenses for categories 1 and 2.'
+        '- `?type=average&categories=1,2`: Get average expenses for categories 1 and 2.\n'
+        '- `?type=comparison&periods=2`: Compare this month with last month per category.\n'
+        '- `?type=top&n=3`: Get the 3 largest expenses of every category.\n'
+        '- `?type=pivot&rows=category&cols=month&year=2025`: Get the 2025 expenses per category and month.'
     ),
     parameters=[
         OpenApiParameter(
@@ -80,7 +153,10 @@ aggregation_schema = extend_schema(
                 'The type of aggregation to perform. Options are:\n'
                 '- `total`: Total earned, total spent, and net earnings.\n'
                 '- `categories`: Expenses grouped by categories.\n'
-                '- `average`: Average expenses grouped by categories.'
+                '- `average`: Average expenses grouped by categories.\n'
+                '- `comparison`: Month-over-month totals and changes per category.\n'
+                '- `top`: Largest expenses of every category.\n'
+                '- `pivot`: Category by month table of expense totals.'
             ),
             required=True
         ),
@@ -111,6 +187,32 @@ aggregation_schema = extend_schema(
             ),
             required=False
         ),
+        OpenApiParameter(
+            name='periods',
+            type=OpenApiTypes.INT,
+            description='Number of consecutive months compared by `comparison` (1-36, default 2).',
+            required=False
+        ),
+        OpenApiParameter(
+            name='n',
+            type=OpenApiTypes.INT,
+            description='Number of expenses per category returned by `top` (1-50, default 3).',
+            required=False
+        ),
+        OpenApiParameter(
+            name='rows',
+            type=OpenApiTypes.STR,
+            enum=['category', 'month'],
+            description='Row dimension of the `pivot` table (default `category`).',
+            required=False
+        ),
+        OpenApiParameter(
+            name='cols',
+            type=OpenApiTypes.STR,
+            enum=['category', 'month'],
+            description='Column dimension of the `pivot` table (default `month`).',
+            required=False
+        ),
     ],
     responses={
         200: OpenApiResponse(
@@ -125,6 +227,18 @@ aggregation_schema = extend_schema(
             response=average_response_schema,
             description="Response for the 'average' aggregation type."
         ),
+        200: OpenApiResponse(
+            response=comparison_response_schema,
+            description="Response for the 'comparison' aggregation type."
+        ),
+        200: OpenApiResponse(
+            response=top_response_schema,
+            description="Response for the 'top' aggregation type."
+        ),
+        200: OpenApiResponse(
+            response=pivot_response_schema,
+            description="Response for the 'pivot' aggregation type."
+        ),
         400: OpenApiResponse(
             response=error_response_schema,
             description="Error response for invalid query parameters."
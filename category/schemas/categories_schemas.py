@@ -1,16 +1,33 @@
 from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
+    OpenApiParameter,
+)
+from drf_spectacular.types import OpenApiTypes
+from category.serializers import (
+    CategorySerializer,
+    CategoryLimitSerializer,
+    CategorySuggestionsSerializer,
+    CategoryWithLimitSerializer,
 )
-from category.serializers import CategorySerializer
 
 categories_schemas = extend_schema_view(
     list=extend_schema(
         description=(
             'Retrieve a list of categories. This includes both user-specific categories '
-            'and predefined categories (shared across all users).'
+            'and predefined categories (shared across all users).\n\n'
+            'With `with_limits=1` every category also includes the amount spent on it '
+            'this month and the user\'s monthly limit on it, if any.'
         ),
-        responses={200: CategorySerializer(many=True)},
+        parameters=[
+            OpenApiParameter(
+                name='with_limits',
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description='Include current-month spending and limits.',
+            ),
+        ],
+        responses={200: CategoryWithLimitSerializer(many=True)},
     ),
     create=extend_schema(
         description=(
@@ -30,8 +47,60 @@ categories_schemas = extend_schema_view(
     destroy=extend_schema(
         description=(
             'Delete an existing category. Predefined categories (shared across all users) '
-            'cannot be deleted.'
+            'cannot be deleted.\n\n'
+            'Its expenses are deleted and their total is returned to the budget, unless '
+            '`reassign_to` is given, in which case they are moved to that category.'
         ),
+        parameters=[
+            OpenApiParameter(
+                name='reassign_to',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='ID of the category that receives the expenses instead of deleting them.',
+            ),
+        ],
         responses={204: None},
     ),
-)
\ No newline at end of file
+    limit=[
+        extend_schema(
+            methods=['PUT'],
+            description=(
+                'Set the monthly limit on a category. Crossing 80% and 100% of the limit '
+                'is recorded once per month; with `action=block` expenses that would '
+                'exceed it are rejected, with `action=warn` they are saved and the '
+                'response carries an `X-Category-Limit-Warning` header.'
+            ),
+            request=CategoryLimitSerializer,
+            responses={200: CategoryLimitSerializer},
+        ),
+        extend_schema(
+            methods=['DELETE'],
+            description='Remove the monthly limit on a category.',
+            request=None,
+            responses={204: None},
+        ),
+    ],
+    suggest=extend_schema(
+        description=(
+            'Suggest categories for an expense description, ranked by how often the words '
+            'of the description appeared in the user\'s past expenses of each category. '
+            'Scores are between 0 and 1; descriptions without known words get no suggestions.'
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='description',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Description of the expense being entered.',
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description='Maximum number of suggestions (1-10, default 3).',
+            ),
+        ],
+        responses={200: CategorySuggestionsSerializer},
+    ),
+)
@@ -2,7 +2,18 @@ from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
 )
-from category.serializers import ExpenseSerializer
+from core.versioning import IF_MATCH_PARAMETER, VERSION_CONFLICT_RESPONSE
+from category.serializers import (
+    ExpenseSerializer,
+    ExpenseBulkSerializer,
+    ExpenseBulkUpdateSerializer,
+    ExpenseBulkResultSerializer
+)
+
+BULK_SELECTION_DESCRIPTION = (
+    'Select expenses either with `ids` in the request body or with the same filter and search '
+    'query parameters as the list endpoint. At least one of them is required.\n\n'
+)
 
 
 expense_schema = extend_schema_view(
@@ -21,7 +32,12 @@ expense_schema = extend_schema_view(
             '**Ordering**:\n'
             '- `ordering`: Order results by a field. Prefix with "-" for descending order. Available fields: `date`, `amount`, `category__name`.\n\n'
             '**Pagination**:\n'
-            '- `page`: Page number for pagination.'
+            '- `page`: Page number for pagination.\n'
+            '- `count`: How `count` is computed: `estimated` (default, from counters or a short-lived cache), '
+            '`exact`, or `none` to omit it.\n\n'
+            '**Fields**:\n'
+            '- `fields`: Comma-separated fields to return (`id`, `amount`, `description`, `date`, `category`, `user`).\n'
+            '- `expand`: Set to `category` to return the category as an object instead of its ID.'
         ),
         responses={200: ExpenseSerializer(many=True)},
     ),
@@ -40,10 +56,22 @@ expense_schema = extend_schema_view(
     ),
     update=extend_schema(
         description=(
-            'Update an existing expense. The `user` field cannot be modified.'
+            'Update an existing expense. The `user` field cannot be modified.\n\n'
+            'Send the `ETag` of the expense as read (from retrieving, creating or updating it) '
+            'in `If-Match` to apply the update only if nobody changed the expense since; '
+            'otherwise it is refused with 412.'
         ),
+        parameters=[IF_MATCH_PARAMETER],
         request=ExpenseSerializer,
-        responses={200: ExpenseSerializer},
+        responses={200: ExpenseSerializer, 412: VERSION_CONFLICT_RESPONSE},
+    ),
+    partial_update=extend_schema(
+        description=(
+            'Update some fields of an existing expense. `If-Match` works as for a full update.'
+        ),
+        parameters=[IF_MATCH_PARAMETER],
+        request=ExpenseSerializer,
+        responses={200: ExpenseSerializer, 412: VERSION_CONFLICT_RESPONSE},
     ),
     destroy=extend_schema(
         description=(
@@ -51,4 +79,30 @@ expense_schema = extend_schema_view(
         ),
         responses={204: None},
     ),
+    bulk=[
+        extend_schema(
+            methods=['PATCH'],
+            description=(
+                'Update many expenses at once.\n\n'
+                + BULK_SELECTION_DESCRIPTION +
+                '**Request Body**:\n'
+                '- `amount`, `description`, `category` (at least one): New values for every selected expense.\n\n'
+                '**Response**:\n'
+                'The number of updated expenses and the resulting budget.'
+            ),
+            request=ExpenseBulkUpdateSerializer,
+            responses={200: ExpenseBulkResultSerializer},
+        ),
+        extend_schema(
+            methods=['DELETE'],
+            description=(
+                'Delete many expenses at once and return their amounts to the budget.\n\n'
+                + BULK_SELECTION_DESCRIPTION +
+                '**Response**:\n'
+                'The number of deleted expenses and the resulting budget.'
+            ),
+            request=ExpenseBulkSerializer,
+            responses={200: ExpenseBulkResultSerializer},
+        ),
+    ],
 )
\ No newline at end of file
@@ -1,6 +1,11 @@
+from decimal import Decimal
+
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from .models import (
     Category,
+    CategoryLimit,
+    CategoryLimitEvent,
     Expense
 )
 
@@ -11,8 +16,122 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['user']
 
 
+class CategoryLimitSerializer(serializers.ModelSerializer):
+    monthly_limit = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0.01)
+
+    class Meta:
+        model = CategoryLimit
+        fields = ['monthly_limit', 'action']
+
+
+class CategoryLimitStatusSerializer(CategoryLimitSerializer):
+    remaining = serializers.DecimalField(max_digits=10, decimal_places=2)
+    thresholds_crossed = serializers.ListField(child=serializers.IntegerField())
+
+    class Meta(CategoryLimitSerializer.Meta):
+        fields = CategoryLimitSerializer.Meta.fields + ['remaining', 'thresholds_crossed']
+
+
+class CategoryWithLimitSerializer(CategorySerializer):
+    """
+    Category with its current-month spending and limit. Expects the user's
+    limits (`limits`, by category id) and spend counters (`spends`, amount by
+    category id) in the serializer context, so listing needs no per-category
+    queries.
+    """
+    spent = serializers.SerializerMethodField()
+    limit = serializers.SerializerMethodField()
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['spent', 'limit']
+
+    def _spent(self, category):
+        return self.context['spends'].get(category.pk, Decimal('0'))
+
+    @extend_schema_field(serializers.DecimalField(max_digits=10, decimal_places=2))
+    def get_spent(self, category):
+        return f'{self._spent(category):.2f}'
+
+    @extend_schema_field(CategoryLimitStatusSerializer(allow_null=True))
+    def get_limit(self, category):
+        limit = self.context['limits'].get(category.pk)
+        if limit is None:
+            return None
+        spent = self._spent(category)
+        return CategoryLimitStatusSerializer({
+            'monthly_limit': limit.monthly_limit,
+            'action': limit.action,
+            'remaining': limit.monthly_limit - spent,
+            'thresholds_crossed': [
+                threshold for threshold in CategoryLimitEvent.THRESHOLDS
+                if spent >= limit.monthly_limit * threshold / 100
+            ],
+        }).data
+
+
+class CategorySuggestionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    score = serializers.FloatField()
+
+
+class CategorySuggestionsSerializer(serializers.Serializer):
+    suggestions = CategorySuggestionSerializer(many=True)
+
+
 class ExpenseSerializer(serializers.ModelSerializer):
+    """
+    Accepts optional `fields` (names to keep) and `expand` (related fields
+    to inline as objects) keyword arguments.
+    """
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    expandable_serializers = {
+        'category': CategorySerializer,
+    }
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in expand:
+            if name in self.fields:
+                self.fields[name] = self.expandable_serializers[name](read_only=True)
+
     class Meta:
         model = Expense
         fields = ['id', 'amount', 'description', 'date', 'category', 'user']
-        read_only_fields = ['user', 'date']
\ No newline at end of file
+        read_only_fields = ['user', 'date']
+
+class ExpenseBulkSerializer(serializers.Serializer):
+    """
+    Selects the expenses of a bulk operation by id. Without `ids` the
+    operation applies to the expenses matched by the query parameters.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False
+    )
+
+
+class ExpenseBulkUpdateSerializer(ExpenseBulkSerializer):
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), required=False)
+
+    def validate_category(self, category):
+        user = self.context['request'].user
+        if category.user_id not in (None, user.pk):
+            raise serializers.ValidationError('Invalid category.')
+        return category
+
+    def validate(self, attrs):
+        if not set(attrs) - {'ids'}:
+            raise serializers.ValidationError('Provide at least one of `amount`, `description` or `category`.')
+        return attrs
+
+
+class ExpenseBulkResultSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    budget = serializers.DecimalField(max_digits=10, decimal_places=2)
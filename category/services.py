@@ -0,0 +1,224 @@
+"""
+Set-based write operations on expenses.
+
+The per-row signal receivers in `category.models` read and save the budget
+and insert one history row for every expense they touch. The helpers here
+change many expenses with one UPDATE or DELETE instead, apply the net
+budget effect with a single `F()` update and write history in bulk, all in
+one transaction. They bypass model signals, so they also record the
+matching change feed entries themselves.
+"""
+from collections import defaultdict
+
+from django.db import router, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from decimal import Decimal
+
+from account.models import AccountBudget, BudgetHistory
+from core.changes import record_changes
+from core.fields import MoneyField
+from core.models import Change
+from .limits import adjust_spends, check_block_limits
+from .models import Category, Expense
+from .suggestions import adjust_tokens
+
+ROW_FIELDS = ('pk', 'amount', 'date', 'description', 'category_id')
+
+
+def _apply_to_budget(using, user, net, removed=0):
+    """
+    Add `net` to the user's budget in one UPDATE and return the budget.
+
+    `removed` expenses are also subtracted from the budget's expense count.
+    """
+    budgets = AccountBudget.objects.using(using).filter(user=user)
+    changes = {}
+    if net:
+        changes['budget'] = F('budget') + Value(net, output_field=MoneyField())
+    if removed:
+        changes['expense_count'] = Greatest(F('expense_count') - removed, 0)
+    if changes:
+        budgets.update(**changes, version=F('version') + 1)
+    budget = budgets.get()
+    record_changes(AccountBudget, [budget], Change.UPDATE)
+    return budget
+
+
+def _raw_delete_expenses(using, expenses):
+    """
+    Delete `expenses` with one DELETE, detaching their history rows first.
+    """
+    BudgetHistory.objects.using(using).filter(expense__in=expenses).update(expense=None)
+    expenses._raw_delete(using)
+
+
+def bulk_update_expenses(queryset, user, changes):
+    """
+    Apply the same field changes to every expense in `queryset`.
+
+    Args:
+        queryset: Expenses of `user` to update.
+        user: Owner of the expenses and the budget.
+        changes: Mapping of field name to new value (`amount`, `category`,
+            `description`).
+
+    Returns:
+        Tuple of (number of updated expenses, updated AccountBudget).
+    """
+    using = router.db_for_write(Expense)
+    queryset = queryset.using(using).order_by()
+
+    with transaction.atomic(using=using):
+        rows = list(queryset.select_for_update().values(*ROW_FIELDS))
+        if not rows:
+            return 0, AccountBudget.objects.using(using).get(user=user)
+        ids = [row['pk'] for row in rows]
+        selected = Expense.objects.using(using).filter(pk__in=ids)
+
+        if 'amount' in changes or 'category' in changes:
+            new_rows = [
+                {
+                    **row,
+                    'amount': changes.get('amount', row['amount']),
+                    'category_id': changes['category'].pk if 'category' in changes else row['category_id'],
+                }
+                for row in rows
+            ]
+            check_block_limits(user.pk, rows, new_rows, using=using)
+
+        net = Decimal('0')
+        history = []
+        amount = changes.get('amount')
+        if amount is not None:
+            totals = selected.aggregate(total=Coalesce(Sum('amount'), 0), count=Count('pk'))
+            net = totals['total'] - amount * totals['count']
+            category = changes.get('category')
+            for row in rows:
+                difference = row['amount'] - amount
+                if not difference:
+                    continue
+                description = changes.get('description', row['description'])
+                history.append(BudgetHistory(
+                    user=user,
+                    change_type=BudgetHistory.INCOME if difference > 0 else BudgetHistory.EXPENSE,
+                    amount=abs(difference),
+                    date=row['date'],
+                    description=f'Expense bulk updated: {description}',
+                    expense_id=row['pk'],
+                    category_id=category.pk if category else row['category_id']
+                ))
+
+        updated = selected.update(**changes, version=F('version') + 1)
+        if 'amount' in changes or 'category' in changes:
+            adjust_spends(user.pk, rows, sign=-1, using=using)
+            adjust_spends(user.pk, new_rows, using=using)
+        if 'description' in changes or 'category' in changes:
+            new_rows = [
+                {
+                    'description': changes.get('description', row['description']),
+                    'category_id': changes['category'].pk if 'category' in changes else row['category_id'],
+                }
+                for row in rows
+            ]
+            adjust_tokens(user.pk, rows, sign=-1, using=using)
+            adjust_tokens(user.pk, new_rows, using=using)
+        BudgetHistory.objects.using(using).bulk_create(history)
+        record_changes(Expense, [Expense(pk=pk, user_id=user.pk) for pk in ids], Change.UPDATE)
+        budget = _apply_to_budget(using, user, net)
+    return updated, budget
+
+
+def bulk_delete_expenses(queryset, user):
+    """
+    Delete every expense in `queryset` and return the amounts to the budget.
+
+    Args:
+        queryset: Expenses of `user` to delete.
+        user: Owner of the expenses and the budget.
+
+    Returns:
+        Tuple of (number of deleted expenses, updated AccountBudget).
+    """
+    using = router.db_for_write(Expense)
+    queryset = queryset.using(using).order_by()
+
+    with transaction.atomic(using=using):
+        rows = list(queryset.select_for_update().values(*ROW_FIELDS))
+        if not rows:
+            return 0, AccountBudget.objects.using(using).get(user=user)
+        ids = [row['pk'] for row in rows]
+        selected = Expense.objects.using(using).filter(pk__in=ids)
+        net = sum(row['amount'] for row in rows)
+
+        _raw_delete_expenses(using, selected)
+        adjust_spends(user.pk, rows, sign=-1, using=using)
+        adjust_tokens(user.pk, rows, sign=-1, using=using)
+        BudgetHistory.objects.using(using).bulk_create([
+            BudgetHistory(
+                user=user,
+                change_type=BudgetHistory.INCOME,
+                amount=row['amount'],
+                date=row['date'],
+                description=f"Expense deleted: {row['description']}",
+                category_id=row['category_id']
+            )
+            for row in rows
+        ])
+        record_changes(Expense, [Expense(pk=pk, user_id=user.pk) for pk in ids], Change.DELETE)
+        budget = _apply_to_budget(using, user, net, removed=len(ids))
+    return len(ids), budget
+
+
+def delete_category(category, user, reassign_to=None):
+    """
+    Delete a user category together with its expenses.
+
+    Instead of cascading to every expense, the refunded total of each
+    expense owner is summed from one read of the rows, added to their budget
+    with one UPDATE and recorded as a single summarized history row. With
+    `reassign_to` the expenses of `user` are moved to that category with one
+    UPDATE and the budget is left as is; expenses other users filed under
+    the category are still deleted and refunded to them.
+
+    Returns:
+        Number of expenses deleted or reassigned.
+    """
+    using = router.db_for_write(Category)
+
+    with transaction.atomic(using=using):
+        expenses = Expense.objects.using(using).filter(category=category)
+        rows = list(expenses.values(*ROW_FIELDS, 'user_id'))
+        deleted = rows
+
+        # The category's own spend counters and tokens go with it; the target's are updated.
+        if reassign_to is not None:
+            moved = [{**row, 'category_id': reassign_to.pk} for row in rows if row['user_id'] == user.pk]
+            deleted = [row for row in rows if row['user_id'] != user.pk]
+            check_block_limits(user.pk, [], moved, using=using)
+            expenses.filter(user=user).update(category=reassign_to, version=F('version') + 1)
+            BudgetHistory.objects.using(using).filter(category=category, user=user).update(category=reassign_to)
+            adjust_spends(user.pk, moved, using=using)
+            adjust_tokens(user.pk, moved, using=using)
+            record_changes(Expense, [Expense(pk=row['pk'], user_id=user.pk) for row in moved], Change.UPDATE)
+
+        if deleted:
+            _raw_delete_expenses(using, expenses.filter(pk__in=[row['pk'] for row in deleted]))
+            by_owner = defaultdict(list)
+            for row in deleted:
+                by_owner[row['user_id']].append(row)
+            for owner_id, owner_rows in by_owner.items():
+                total = sum(row['amount'] for row in owner_rows)
+                BudgetHistory.objects.using(using).create(
+                    user_id=owner_id,
+                    change_type=BudgetHistory.INCOME,
+                    amount=total,
+                    description=f'Category deleted: {category.name} ({len(owner_rows)} expenses)'
+                )
+                record_changes(
+                    Expense, [Expense(pk=row['pk'], user_id=owner_id) for row in owner_rows], Change.DELETE
+                )
+                _apply_to_budget(using, owner_id, total, removed=len(owner_rows))
+
+        category.delete(using=using)
+    return len(rows)
@@ -0,0 +1,267 @@
+"""
+Category suggestions from expense descriptions.
+
+`CategoryToken` counts, per user, how many expenses of each category have a
+word in their description. The expense signals below, and the bulk
+services in `category.services`, keep the counts current with set-based
+updates, so suggesting never scans expenses.
+
+Suggestions are ranked from a per-process LRU cache of compact indexes
+(token -> ((category id, share of the token's expenses), ...)), which makes
+a suggestion a few dict lookups. Writes in this process drop the user's
+entry; entries older than `SUGGESTION_CACHE_TTL` are reloaded, which picks
+up writes made by other processes.
+"""
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, CategoryToken, Expense
+
+TOKEN_RE = re.compile(r'[^\W\d_]{2,}')
+MAX_TOKENS = 20
+MAX_TOKEN_LENGTH = 50
+DEFAULT_SUGGESTIONS = 3
+MAX_SUGGESTIONS = 10
+
+
+def tokenize(description):
+    """
+    Distinct lower-case words of a description, without numbers and
+    one-letter words.
+    """
+    words = TOKEN_RE.findall((description or '').lower())
+    return list(dict.fromkeys(word[:MAX_TOKEN_LENGTH] for word in words))[:MAX_TOKENS]
+
+
+class SuggestionIndexCache:
+    """
+    Thread-safe LRU cache of suggestion indexes by user id.
+    """
+
+    def __init__(self, ttl, size):
+        self.ttl = ttl
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        # Bumped by every `forget`, so an index loaded before a write is not stored after it.
+        self.generation = 0
+
+    def get(self, user_id, load):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and now - entry[0] < self.ttl:
+                self.entries.move_to_end(user_id)
+                return entry[1]
+            generation = self.generation
+
+        index = load(user_id)
+        with self.lock:
+            if generation == self.generation:
+                self.entries[user_id] = (now, index)
+                self.entries.move_to_end(user_id)
+                while len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+        return index
+
+    def forget(self, user_id):
+        with self.lock:
+            self.generation += 1
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SuggestionIndexCache(settings.SUGGESTION_CACHE_TTL, settings.SUGGESTION_CACHE_SIZE)
+    return _cache
+
+
+def forget_user(user_id, using=None):
+    """
+    Drop a user's cached index now and again once the current transaction
+    commits, so no request caches the counts from before the write.
+    """
+    cache = get_cache()
+    cache.forget(user_id)
+    transaction.on_commit(partial(cache.forget, user_id), using=using)
+
+
+def load_index(user_id):
+    """
+    Returns:
+        Tuple of (token -> tuple of (category id, weight), category names by
+        id). A token's weights are the shares of its expenses in each
+        category and add up to 1.
+    """
+    counts = defaultdict(list)
+    names = {}
+    rows = CategoryToken.objects.filter(user_id=user_id, count__gt=0).values_list(
+        'token', 'category_id', 'category__name', 'count'
+    )
+    for token, category_id, name, count in rows:
+        counts[token].append((category_id, count))
+        names[category_id] = name
+
+    index = {}
+    for token, categories in counts.items():
+        total = sum(count for _, count in categories)
+        index[token] = tuple((category_id, count / total) for category_id, count in categories)
+    return index, names
+
+
+def suggest_categories(user_id, description, limit=DEFAULT_SUGGESTIONS):
+    """
+    Rank the user's categories for an expense description.
+
+    Every word of the description votes for the categories of the user's
+    past expenses containing it, in proportion to how often it appeared in
+    each. Scores are averaged over the words, so they fall between 0 and 1.
+
+    Returns:
+        List of up to `limit` dicts with `id`, `name` and `score`, best first.
+    """
+    tokens = tokenize(description)
+    if not tokens:
+        return []
+    index, names = get_cache().get(user_id, load_index)
+
+    scores = defaultdict(float)
+    for token in tokens:
+        for category_id, weight in index.get(token, ()):
+            scores[category_id] += weight
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], names[item[0]]))
+    return [
+        {'id': category_id, 'name': names[category_id], 'score': round(score / len(tokens), 3)}
+        for category_id, score in ranked[:limit]
+    ]
+
+
+def adjust_tokens(user_id, rows, sign=1, using=None):
+    """
+    Count the description tokens of many expense rows (`sign=-1` to
+    uncount them), with one UPDATE per (category, change) plus one INSERT
+    for tokens seen for the first time. Rows are dicts with `category_id`
+    and `description`.
+
+    Counts that drop to zero keep their row, saving a DELETE per write;
+    the index skips them and the token reuses the row when it is seen again.
+    A token another writer inserted first is added to that writer's row.
+    """
+    changes = Counter()
+    for row in rows:
+        for token in tokenize(row['description']):
+            changes[(row['category_id'], token)] += sign
+    if not changes:
+        return
+
+    using = using or router.db_for_write(CategoryToken)
+    tokens = CategoryToken.objects.using(using).filter(user_id=user_id)
+    new = set()
+    if sign > 0:
+        existing = set(
+            tokens.filter(token__in={token for _, token in changes}).values_list('category_id', 'token')
+        )
+        new = changes.keys() - existing
+
+    groups = defaultdict(list)
+    for key, change in changes.items():
+        if key not in new:
+            groups[(key[0], change)].append(key[1])
+    for (category_id, change), group in groups.items():
+        tokens.filter(category_id=category_id, token__in=group).update(
+            count=Greatest(F('count') + change, Value(0))
+        )
+    if new:
+        try:
+            with transaction.atomic(using=using):
+                CategoryToken.objects.using(using).bulk_create(
+                    [
+                        CategoryToken(
+                            user_id=user_id, category_id=category_id, token=token, count=changes[category_id, token]
+                        )
+                        for category_id, token in sorted(new)
+                    ]
+                )
+        except IntegrityError:
+            # Another writer counted some of the tokens first; add to its rows one by one.
+            for category_id, token in sorted(new):
+                _add_token(tokens, user_id, category_id, token, changes[category_id, token], using)
+    forget_user(user_id, using=using)
+
+
+def _add_token(tokens, user_id, category_id, token, change, using):
+    """
+    Add `change` to one token count, inserting its row if there is none.
+    """
+    row = tokens.filter(category_id=category_id, token=token)
+    if row.update(count=F('count') + change):
+        return
+    try:
+        with transaction.atomic(using=using):
+            tokens.create(user_id=user_id, category_id=category_id, token=token, count=change)
+    except IntegrityError:
+        row.update(count=F('count') + change)
+
+
+@receiver(post_save, sender=Expense)
+def update_tokens_on_save(instance, created, raw=False, **kwargs):
+    """
+    Move the description tokens between categories when an expense is
+    created or its description or category changes.
+    """
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_previous_state', None)
+    if previous is not None:
+        if previous.category_id == instance.category_id and previous.description == instance.description:
+            return
+        adjust_tokens(
+            instance.user_id,
+            [{'category_id': previous.category_id, 'description': previous.description}],
+            sign=-1
+        )
+    adjust_tokens(instance.user_id, [{'category_id': instance.category_id, 'description': instance.description}])
+
+
+@receiver(post_delete, sender=Expense)
+def update_tokens_on_delete(instance, **kwargs):
+    """
+    Uncount the description tokens of a deleted expense.
+    """
+    adjust_tokens(
+        instance.user_id,
+        [{'category_id': instance.category_id, 'description': instance.description}],
+        sign=-1
+    )
+
+
+@receiver(post_delete, sender=Category)
+def forget_deleted_category(instance, **kwargs):
+    """
+    A deleted category's counts go with it; drop the cached index that
+    still ranks it.
+    """
+    if instance.user_id is not None:
+        forget_user(instance.user_id)
@@ -1,9 +1,25 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIRequestFactory
 from django.contrib.auth.models import User
 from decimal import Decimal
 from account.models import AccountBudget
 from category.models import Category, Expense
+from category.suggestions import get_cache as get_suggestion_cache
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Fixture to start every test with an empty cache.
+    """
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def clear_suggestion_cache():
+    """
+    Fixture to start every test with no cached suggestion indexes.
+    """
+    get_suggestion_cache().clear()
 
 @pytest.fixture
 def api_request_factory():
@@ -0,0 +1,152 @@
+import math
+import numpy as np
+import pytest
+from collections import deque
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.test import force_authenticate
+from category import anomalies
+from category.models import Category, Expense
+from category.views import ExpenseViewSet
+
+HISTORY = [100, 102, 98, 101, 99, 100, 103, 97, 100, 101]
+
+
+def create_expenses(user, category, amounts):
+    return [
+        Expense.objects.create(user=user, category=category, amount=Decimal(amount), description='Groceries')
+        for amount in amounts
+    ]
+
+
+def loop_flags(categories, amounts, window, min_history, threshold):
+    """
+    Reference implementation of `anomaly_flags` keeping each window in a deque.
+    """
+    flags = []
+    history = deque()
+    total = squares = 0
+    previous_category = None
+    for category, amount in zip(categories, amounts):
+        if category != previous_category:
+            history.clear()
+            total = squares = 0
+            previous_category = category
+
+        count = len(history)
+        flag = False
+        if count >= min_history:
+            mean = total / count
+            std = math.sqrt(max(count * squares - total * total, 0)) / count
+            flag = std >= anomalies.MIN_STD and amount - mean > threshold * std
+        flags.append(flag)
+
+        history.append(amount)
+        total += amount
+        squares += amount * amount
+        if len(history) > window:
+            oldest = history.popleft()
+            total -= oldest
+            squares -= oldest * oldest
+    return flags
+
+
+def test_anomaly_flags():
+    """
+    Test that only amounts far above the category's previous expenses are flagged.
+    """
+    categories = [1] * 12 + [2] * 3
+    amounts = HISTORY + [500, 101] + [100, 100, 10000]
+
+    flags = list(anomalies.anomaly_flags(categories, amounts, window=50, min_history=10))
+
+    assert [index for index, flag in enumerate(flags) if flag] == [10]
+
+
+def test_anomaly_flags_constant_history():
+    """
+    Test that a category whose history is one repeated amount is not flagged.
+    """
+    flags = list(anomalies.anomaly_flags([1] * 12, [100] * 11 + [100], min_history=10))
+
+    assert not any(flags)
+
+
+def test_anomaly_flags_match_rolling_loop():
+    """
+    Test that the vectorized statistics flag the same expenses as a loop over each window.
+    """
+    rng = np.random.default_rng(42)
+    categories = np.sort(rng.integers(0, 20, 5000))
+    amounts = rng.integers(1000, 1100, 5000)
+    amounts[rng.integers(0, 5000, 50)] *= 5
+
+    vectorized = anomalies.anomaly_flags(categories, amounts, 50, 10, 3.0).tolist()
+    loop = loop_flags(categories.tolist(), amounts.tolist(), 50, 10, 3.0)
+
+    assert vectorized == loop
+
+
+@pytest.mark.django_db
+def test_detect_anomalies(user, category):
+    """
+    Test that flags are written, then kept or cleared on later runs.
+    """
+    *_, spike, normal = create_expenses(user, category, HISTORY + [500, 101])
+
+    stats = anomalies.detect_anomalies()
+
+    assert stats == {'users': 1, 'expenses': 12, 'flagged': 1, 'cleared': 0}
+    assert list(Expense.objects.filter(is_anomaly=True)) == [spike]
+
+    assert anomalies.detect_anomalies()['flagged'] == 0
+    assert anomalies.detect_anomalies(threshold=1000)['cleared'] == 1
+    assert not Expense.objects.filter(is_anomaly=True).exists()
+
+
+@pytest.mark.django_db
+def test_detect_anomalies_partitions(user, category):
+    """
+    Test that the partitions of several processes cover every user once.
+    """
+    other_user = User.objects.create_user(username='otheruser', password='password123')
+    other_category = Category.objects.create(name='OtherCategory', user=other_user)
+    create_expenses(user, category, HISTORY + [500])
+    create_expenses(other_user, other_category, HISTORY + [400])
+
+    results = [anomalies.detect_anomalies(processes=2, index=index) for index in range(2)]
+
+    assert [stats['users'] for stats in results] == [1, 1]
+    assert sum(stats['flagged'] for stats in results) == 2
+
+
+@pytest.mark.django_db
+def test_detect_anomalies_command(user, category):
+    """
+    Test the detect_anomalies management command.
+    """
+    create_expenses(user, category, HISTORY + [500])
+    out = StringIO()
+
+    call_command('detect_anomalies', '--min-history', '5', stdout=out)
+
+    assert 'Processed 11 expenses of 1 users: 1 newly flagged, 0 cleared.' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_expense_viewset_filter_by_anomaly(api_request_factory, user, category):
+    """
+    Test filtering the expense list by the anomaly flag.
+    """
+    *_, spike = create_expenses(user, category, HISTORY + [500])
+    anomalies.detect_anomalies()
+    view = ExpenseViewSet.as_view({'get': 'list'})
+
+    request = api_request_factory.get('/expenses/?is_anomaly=true')
+    force_authenticate(request, user=user)
+    response = view(request)
+
+    assert response.status_code == 200
+    assert [result['id'] for result in response.data['results']] == [spike.id]
@@ -0,0 +1,148 @@
+import json
+import pytest
+from decimal import Decimal
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from category.async_views import (
+    AsyncAggregationView,
+    AsyncExpenseListView
+)
+from category.models import Expense
+
+
+@pytest.fixture
+def auth_headers(user):
+    """
+    Fixture to build a Bearer Authorization header for the test user.
+    """
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+def call_async_view(view_class, path, headers):
+    request = RequestFactory().get(path, **headers)
+    response = async_to_sync(view_class.as_view())(request)
+    return response.status_code, json.loads(response.content)
+
+
+@pytest.mark.django_db
+def test_async_aggregation_requires_authentication():
+    """
+    Test that AsyncAggregationView rejects unauthenticated requests.
+    """
+    status_code, data = call_async_view(AsyncAggregationView, '/async/aggregations/?type=total', {})
+
+    assert status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_aggregation_total(user, expense, auth_headers):
+    """
+    Test the total aggregation in AsyncAggregationView.
+    """
+    status_code, data = call_async_view(AsyncAggregationView, '/async/aggregations/?type=total', auth_headers)
+
+    assert status_code == 200
+    assert Decimal(data['total_spent']) == Decimal('50.00')
+    assert Decimal(data['total_earned']) == Decimal('1000.00')
+    assert Decimal(data['net_earnings']) == Decimal('950.00')
+
+
+@pytest.mark.django_db
+def test_async_aggregation_combined_types(user, expense, auth_headers):
+    """
+    Test that several aggregation types are merged into one response.
+    """
+    status_code, data = call_async_view(
+        AsyncAggregationView, '/async/aggregations/?type=total,categories,average', auth_headers
+    )
+
+    assert status_code == 200
+    assert Decimal(data['total_spent']) == Decimal('50.00')
+    assert data['expenses_by_category'][0]['category__name'] == 'TestCategory'
+    assert Decimal(data['expenses_by_category'][0]['total_expenses']) == Decimal('50.00')
+    assert Decimal(data['average_expenses'][0]['average_expense']) == Decimal('50.00')
+
+
+@pytest.mark.django_db
+def test_async_aggregation_comparison(user, expense, auth_headers):
+    """
+    Test the comparison aggregation in AsyncAggregationView next to another type.
+    """
+    status_code, data = call_async_view(
+        AsyncAggregationView, '/async/aggregations/?type=total,comparison&periods=2', auth_headers
+    )
+
+    assert status_code == 200
+    assert Decimal(data['total_spent']) == Decimal('50.00')
+    assert len(data['periods']) == 2
+    assert data['comparison'][0]['category__name'] == 'TestCategory'
+    assert Decimal(data['comparison'][0]['periods'][1]['total']) == Decimal('50.00')
+
+
+@pytest.mark.django_db
+def test_async_aggregation_top(user, expense, auth_headers):
+    """
+    Test the top aggregation in AsyncAggregationView.
+    """
+    status_code, data = call_async_view(AsyncAggregationView, '/async/aggregations/?type=top&n=1', auth_headers)
+
+    assert status_code == 200
+    assert data['top_expenses'][0]['category__name'] == 'TestCategory'
+    assert Decimal(data['top_expenses'][0]['expenses'][0]['amount']) == Decimal('50.00')
+
+
+@pytest.mark.django_db
+def test_async_aggregation_pivot(user, expense, auth_headers):
+    """
+    Test the pivot aggregation in AsyncAggregationView.
+    """
+    year = expense.date.year
+    status_code, data = call_async_view(
+        AsyncAggregationView, f'/async/aggregations/?type=pivot&year={year}', auth_headers
+    )
+
+    assert status_code == 200
+    assert data['rows'] == ['TestCategory']
+    assert Decimal(data['values'][expense.date.month - 1]) == Decimal('50.00')
+
+
+@pytest.mark.django_db
+def test_async_aggregation_invalid_type(user, auth_headers):
+    """
+    Test AsyncAggregationView with an invalid aggregation type.
+    """
+    status_code, data = call_async_view(AsyncAggregationView, '/async/aggregations/?type=total,invalid', auth_headers)
+
+    assert status_code == 400
+    assert data['error'] == 'Invalid type parameter. Use "total", "categories", "average", "comparison", "top", or "pivot".'
+
+
+@pytest.mark.django_db
+def test_async_expense_list_pagination(user, category, auth_headers):
+    """
+    Test that AsyncExpenseListView paginates like ExpenseViewSet.list.
+    """
+    for i in range(7):
+        Expense.objects.create(user=user, category=category, amount=Decimal(i + 1), description=f'Expense {i}')
+
+    status_code, data = call_async_view(AsyncExpenseListView, '/async/expenses/?ordering=amount&page=2', auth_headers)
+
+    assert status_code == 200
+    assert data['count'] == 7
+    assert data['total_pages'] == 2
+    assert data['current'] == 2
+    assert data['next'] is None
+    assert [item['amount'] for item in data['results']] == ['6.00', '7.00']
+
+
+@pytest.mark.django_db
+def test_async_expense_list_filter_by_category(user, expense, category, auth_headers):
+    """
+    Test filtering expenses by category in AsyncExpenseListView.
+    """
+    status_code, data = call_async_view(AsyncExpenseListView, f'/async/expenses/?category={category.id}', auth_headers)
+
+    assert status_code == 200
+    assert len(data['results']) == 1
+    assert data['results'][0]['category'] == category.id
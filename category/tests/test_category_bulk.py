@@ -0,0 +1,199 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from account.models import AccountBudget, BudgetHistory
+from category.models import Category, Expense
+from category.views import CategoryViewSet, ExpenseViewSet
+from core.models import Change
+
+
+def bulk_request(api_request_factory, user, method, data=None, query=''):
+    view = ExpenseViewSet.as_view({'patch': 'bulk', 'delete': 'bulk'})
+    request = getattr(api_request_factory, method)(f'/expenses/bulk/{query}', data or {}, format='json')
+    force_authenticate(request, user=user)
+    return view(request)
+
+
+@pytest.fixture
+def expenses(user, category):
+    """
+    Fixture to create three expenses of 10, 20 and 30.
+    """
+    return [
+        Expense.objects.create(user=user, category=category, amount=Decimal(amount), description=f'Bulk {amount}')
+        for amount in ('10.00', '20.00', '30.00')
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_delete_by_ids_restores_budget(api_request_factory, user, expenses):
+    """
+    Test that deleting by ids returns the amounts to the budget with bulk history.
+    """
+    ids = [expenses[0].pk, expenses[2].pk]
+
+    response = bulk_request(api_request_factory, user, 'delete', {'ids': ids})
+
+    assert response.status_code == 200
+    assert response.data['count'] == 2
+    assert response.data['budget'] == '980.00'
+    assert not Expense.objects.filter(pk__in=ids).exists()
+    assert AccountBudget.objects.get(user=user).budget == Decimal('980.00')
+    assert BudgetHistory.objects.filter(user=user, description__startswith='Expense deleted').count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_delete_by_filter_runs_constant_queries(api_request_factory, user, category, expenses):
+    """
+    Test that filtered deletes do not issue per-row queries.
+    """
+    more = [Expense(user=user, category=category, amount=Decimal('5.00')) for _ in range(20)]
+    Expense.objects.bulk_create(more)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = bulk_request(api_request_factory, user, 'delete', query='?max_price=10')
+
+    assert response.data['count'] == 21
+    assert len(queries) <= 12
+    assert list(Expense.objects.values_list('amount', flat=True).order_by('amount')) == [
+        Decimal('20.00'), Decimal('30.00')
+    ]
+    assert AccountBudget.objects.get(user=user).budget == Decimal('1050.00')
+
+
+@pytest.mark.django_db
+def test_bulk_update_recategorizes_and_sets_amount(api_request_factory, user, expenses):
+    """
+    Test that a bulk PATCH updates every selected expense and the net budget.
+    """
+    target = Category.objects.create(name='Target', user=user)
+
+    response = bulk_request(
+        api_request_factory, user, 'patch',
+        {'ids': [expense.pk for expense in expenses], 'category': target.pk, 'amount': '15.00'}
+    )
+
+    assert response.status_code == 200
+    assert response.data['count'] == 3
+    assert set(Expense.objects.values_list('category', 'amount')) == {(target.pk, Decimal('15.00'))}
+    assert AccountBudget.objects.get(user=user).budget == Decimal('955.00')
+    assert BudgetHistory.objects.filter(user=user, description__startswith='Expense bulk updated').count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_requires_a_selection(api_request_factory, user, expenses):
+    """
+    Test that a bulk request without ids or filters is rejected.
+    """
+    response = bulk_request(api_request_factory, user, 'delete')
+
+    assert response.status_code == 400
+    assert Expense.objects.count() == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query', ['?search=', '?search=%20', '?min_price=', '?search=&min_price='])
+def test_bulk_rejects_empty_filters(api_request_factory, user, expenses, query):
+    """
+    Test that filters without a value do not count as a selection.
+    """
+    response = bulk_request(api_request_factory, user, 'delete', query=query)
+
+    assert response.status_code == 400
+    assert Expense.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_ignores_other_users_expenses(api_request_factory, user, expenses, django_user_model):
+    """
+    Test that ids of another user's expenses are not touched.
+    """
+    other = django_user_model.objects.create_user(username='other', password='password123')
+
+    response = bulk_request(api_request_factory, other, 'delete', {'ids': [expenses[0].pk]})
+
+    assert response.data['count'] == 0
+    assert Expense.objects.count() == 3
+
+
+def delete_category_request(api_request_factory, user, category, query=''):
+    view = CategoryViewSet.as_view({'delete': 'destroy'})
+    request = api_request_factory.delete(f'/categories/{category.pk}/{query}')
+    force_authenticate(request, user=user)
+    return view(request, pk=category.pk)
+
+
+@pytest.mark.django_db
+def test_category_delete_refunds_expenses_with_one_history_row(api_request_factory, user, category, expenses):
+    """
+    Test that deleting a category refunds its expenses in a single summarized history row.
+    """
+    more = [Expense(user=user, category=category, amount=Decimal('1.00')) for _ in range(50)]
+    Expense.objects.bulk_create(more)
+    history_count = BudgetHistory.objects.count()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = delete_category_request(api_request_factory, user, category)
+
+    assert response.status_code == 204
+    assert len(queries) <= 20
+    assert not Category.objects.filter(pk=category.pk).exists()
+    assert not Expense.objects.exists()
+    assert AccountBudget.objects.get(user=user).budget == Decimal('1050.00')
+    assert BudgetHistory.objects.count() == history_count + 1
+    summary = BudgetHistory.objects.latest('pk')
+    assert summary.amount == Decimal('110.00')
+    assert summary.description == 'Category deleted: TestCategory (53 expenses)'
+
+
+@pytest.mark.django_db
+def test_category_delete_reassigns_expenses(api_request_factory, user, category, expenses):
+    """
+    Test that `reassign_to` moves the expenses and keeps the budget unchanged.
+    """
+    target = Category.objects.create(name='Target', user=user)
+
+    response = delete_category_request(api_request_factory, user, category, f'?reassign_to={target.pk}')
+
+    assert response.status_code == 204
+    assert not Category.objects.filter(pk=category.pk).exists()
+    assert Expense.objects.filter(category=target).count() == 3
+    assert AccountBudget.objects.get(user=user).budget == Decimal('940.00')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('reassign', [False, True])
+def test_category_delete_refunds_other_users_expenses(
+    api_request_factory, user, category, expenses, django_user_model, reassign
+):
+    """
+    Test that expenses another user filed under the category are refunded to and tombstoned for that user.
+    """
+    other_user = django_user_model.objects.create_user(username='otheruser', password='password123')
+    foreign = Expense.objects.create(user=other_user, category=category, amount=Decimal('15.00'))
+    target = Category.objects.create(name='Target', user=user)
+
+    response = delete_category_request(
+        api_request_factory, user, category, f'?reassign_to={target.pk}' if reassign else ''
+    )
+
+    assert response.status_code == 204
+    assert not Expense.objects.filter(user=other_user).exists()
+    assert AccountBudget.objects.get(user=other_user).budget == Decimal('1000.00')
+    assert AccountBudget.objects.get(user=other_user).expense_count == 0
+    assert AccountBudget.objects.get(user=user).budget == Decimal('940.00' if reassign else '1000.00')
+    assert Change.objects.filter(user=other_user, model='expense', object_id=foreign.pk, action=Change.DELETE).exists()
+    assert not Change.objects.filter(user=user, model='expense', object_id=foreign.pk).exists()
+
+
+@pytest.mark.django_db
+def test_category_delete_rejects_invalid_reassign_target(api_request_factory, user, category, expenses):
+    """
+    Test that reassigning to the deleted category itself is rejected.
+    """
+    response = delete_category_request(api_request_factory, user, category, f'?reassign_to={category.pk}')
+
+    assert response.status_code == 400
+    assert Expense.objects.count() == 3
@@ -0,0 +1,104 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from category.aggregations import comparison_periods
+from category.models import Category, Expense
+from category.views import AggregationView
+
+
+@pytest.fixture
+def monthly_expenses(user, category):
+    """
+    Fixture to create expenses in two categories over several months,
+    leaving March 2025 without expenses in `category`.
+    """
+    other = Category.objects.create(name='Other', user=user)
+    for day, amount, expense_category in [
+        (date(2025, 1, 10), '40.00', category),
+        (date(2025, 2, 5), '20.00', category),
+        (date(2025, 2, 20), '30.00', category),
+        (date(2025, 4, 1), '25.00', category),
+        (date(2025, 4, 15), '10.00', other),
+    ]:
+        expense = Expense.objects.create(
+            user=user, category=expense_category, amount=Decimal(amount), description='Monthly'
+        )
+        # `date` is set on creation, so move the expense to its month afterwards.
+        Expense.objects.filter(pk=expense.pk).update(date=day)
+    return other
+
+
+def get_comparison(api_request_factory, user, query):
+    request = api_request_factory.get(f'/aggregation/?type=comparison&{query}')
+    force_authenticate(request, user=user)
+    return AggregationView.as_view()(request)
+
+
+def test_comparison_periods_end_at_the_requested_month():
+    """
+    Test that the compared months end at `year`/`month` and span year boundaries.
+    """
+    periods = comparison_periods({'periods': '3', 'year': '2025', 'month': '2'})
+
+    assert periods == [date(2024, 12, 1), date(2025, 1, 1), date(2025, 2, 1)]
+    assert comparison_periods({}, today=date(2025, 7, 19)) == [date(2025, 6, 1), date(2025, 7, 1)]
+
+
+@pytest.mark.parametrize('periods', ['0', '-1', 'abc', '37'])
+def test_comparison_periods_invalid(periods):
+    """
+    Test that invalid `periods` values are rejected.
+    """
+    with pytest.raises(ValueError):
+        comparison_periods({'periods': periods})
+
+
+@pytest.mark.django_db
+def test_aggregation_view_comparison(api_request_factory, user, category, monthly_expenses):
+    """
+    Test the month-over-month totals and changes of every category, computed in one query.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = get_comparison(api_request_factory, user, 'periods=3&year=2025&month=4')
+
+    assert response.status_code == 200
+    assert len(queries) == 1
+    assert 'LAG' in queries[0]['sql']
+    assert response.data['periods'] == ['2025-02', '2025-03', '2025-04']
+
+    other, test_category = response.data['comparison']
+    assert other['category__name'] == 'Other'
+    assert [p['total'] for p in other['periods']] == [0, 0, Decimal('10.00')]
+    assert other['periods'][2]['percent_change'] is None
+
+    assert test_category['category__name'] == 'TestCategory'
+    assert test_category['periods'] == [
+        {'period': '2025-02', 'total': Decimal('50.00'), 'change': Decimal('10.00'), 'percent_change': 25.0},
+        {'period': '2025-03', 'total': 0, 'change': Decimal('-50.00'), 'percent_change': -100.0},
+        {'period': '2025-04', 'total': Decimal('25.00'), 'change': Decimal('25.00'), 'percent_change': None},
+    ]
+
+
+@pytest.mark.django_db
+def test_aggregation_view_comparison_filter_by_categories(api_request_factory, user, category, monthly_expenses):
+    """
+    Test that the comparison only includes the requested categories.
+    """
+    response = get_comparison(api_request_factory, user, f'periods=2&year=2025&month=4&categories={category.id}')
+
+    assert response.status_code == 200
+    assert [c['category__name'] for c in response.data['comparison']] == ['TestCategory']
+
+
+@pytest.mark.django_db
+def test_aggregation_view_comparison_invalid_periods(api_request_factory, user):
+    """
+    Test AggregationView comparison with an invalid number of periods.
+    """
+    response = get_comparison(api_request_factory, user, 'periods=abc')
+
+    assert response.status_code == 400
+    assert response.data['error'] == 'Invalid periods parameter. Must be an integer between 1 and 36.'
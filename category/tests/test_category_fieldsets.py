@@ -0,0 +1,90 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from category.models import Category, Expense
+from category.views import ExpenseViewSet
+
+
+def list_expenses(api_request_factory, user, query=''):
+    view = ExpenseViewSet.as_view({'get': 'list'})
+    request = api_request_factory.get(f'/expenses/{query}')
+    force_authenticate(request, user=user)
+    with CaptureQueriesContext(connection) as queries:
+        response = view(request)
+    return response, queries
+
+
+def page_query(queries):
+    """
+    The SELECT fetching the page of expenses.
+    """
+    return next(
+        query['sql'] for query in queries
+        if 'FROM "category_expense"' in query['sql'] and 'LIMIT' in query['sql']
+    )
+
+
+@pytest.fixture
+def expenses(user):
+    """
+    Fixture to create expenses spread over several categories.
+    """
+    categories = [Category.objects.create(name=f'Category {i}', user=user) for i in range(3)]
+    return [
+        Expense.objects.create(user=user, category=category, amount=Decimal('10.00'), description='Sparse')
+        for category in categories
+    ]
+
+
+@pytest.mark.django_db
+def test_fields_restricts_payload_and_columns(api_request_factory, user, expenses):
+    """
+    Test that `fields` limits both the serialized fields and the selected columns.
+    """
+    response, queries = list_expenses(api_request_factory, user, '?fields=id,amount')
+
+    assert response.status_code == 200
+    assert set(response.data['results'][0]) == {'id', 'amount'}
+    select = page_query(queries).split(' FROM ')[0]
+    assert '"amount"' in select
+    assert '"description"' not in select
+    assert '"category_id"' not in select
+
+
+@pytest.mark.django_db
+def test_expand_category_inlines_objects_without_extra_queries(api_request_factory, user, expenses):
+    """
+    Test that `expand=category` joins the categories instead of querying them per row.
+    """
+    response, queries = list_expenses(api_request_factory, user, '?fields=id,category&expand=category')
+
+    assert response.status_code == 200
+    assert len(queries) == 2
+    assert 'JOIN "category_category"' in page_query(queries)
+    assert {expense['category']['name'] for expense in response.data['results']} == {
+        'Category 0', 'Category 1', 'Category 2'
+    }
+
+
+@pytest.mark.django_db
+def test_default_response_is_unchanged(api_request_factory, user, expenses):
+    """
+    Test that responses without `fields` or `expand` keep every field.
+    """
+    response, _ = list_expenses(api_request_factory, user)
+
+    assert set(response.data['results'][0]) == {'id', 'amount', 'description', 'date', 'category', 'user'}
+    assert isinstance(response.data['results'][0]['category'], int)
+
+
+@pytest.mark.django_db
+def test_unknown_field_is_rejected(api_request_factory, user, expenses):
+    """
+    Test that requesting an unknown field returns 400.
+    """
+    response, _ = list_expenses(api_request_factory, user, '?fields=id,secret')
+
+    assert response.status_code == 400
+    assert 'secret' in response.data['error']
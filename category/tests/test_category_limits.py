@@ -0,0 +1,192 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import force_authenticate
+from category.models import Category, CategoryLimit, CategoryLimitEvent, CategorySpend, Expense
+from category.limits import month_of
+from category.services import bulk_delete_expenses, bulk_update_expenses, delete_category
+from category.views import CategoryViewSet, ExpenseViewSet
+
+
+def spent(user, category):
+    spend = CategorySpend.objects.filter(user=user, category=category, month=month_of(date.today())).first()
+    return spend.amount if spend else Decimal('0')
+
+
+def create_expense(api_request_factory, user, category, amount):
+    view = ExpenseViewSet.as_view({'post': 'create'})
+    request = api_request_factory.post('/expenses/', {'amount': amount, 'category': category.pk}, format='json')
+    force_authenticate(request, user=user)
+    return view(request)
+
+
+@pytest.fixture
+def limit(user, category):
+    """
+    Fixture to create a warning limit of 100 on the test category.
+    """
+    return CategoryLimit.objects.create(user=user, category=category, monthly_limit=Decimal('100.00'))
+
+
+@pytest.mark.django_db
+def test_spend_counter_follows_expense_changes(user, category, expense):
+    """
+    Test that creating, updating, moving and deleting expenses keeps the counter in sync.
+    """
+    other = Category.objects.create(name='Other', user=user)
+    assert spent(user, category) == Decimal('50.00')
+
+    expense.amount = Decimal('20.00')
+    expense.save()
+    assert spent(user, category) == Decimal('20.00')
+
+    expense.category = other
+    expense.save()
+    assert spent(user, category) == Decimal('0.00')
+    assert spent(user, other) == Decimal('20.00')
+
+    expense.delete()
+    assert spent(user, other) == Decimal('0.00')
+
+
+@pytest.mark.django_db
+def test_threshold_events_are_recorded_once(user, category, limit):
+    """
+    Test that crossing 80% and 100% records one event each, even when crossed again.
+    """
+    first = Expense.objects.create(user=user, category=category, amount=Decimal('85.00'))
+    assert list(CategoryLimitEvent.objects.values_list('threshold', flat=True)) == [80]
+
+    Expense.objects.create(user=user, category=category, amount=Decimal('20.00'))
+    first.delete()
+    Expense.objects.create(user=user, category=category, amount=Decimal('90.00'))
+
+    assert sorted(CategoryLimitEvent.objects.values_list('threshold', flat=True)) == [80, 100]
+
+
+@pytest.mark.django_db
+def test_blocking_limit_rejects_expense(api_request_factory, user, category, limit):
+    """
+    Test that a blocking limit refuses expenses over it and a warning limit only warns.
+    """
+    limit.action = CategoryLimit.BLOCK
+    limit.save()
+
+    assert create_expense(api_request_factory, user, category, '60.00').status_code == 201
+    response = create_expense(api_request_factory, user, category, '50.00')
+
+    assert response.status_code == 400
+    assert '40.00 remaining' in response.data['error']
+    assert spent(user, category) == Decimal('60.00')
+
+    limit.action = CategoryLimit.WARN
+    limit.save()
+    response = create_expense(api_request_factory, user, category, '50.00')
+
+    assert response.status_code == 201
+    assert 'X-Category-Limit-Warning' in response
+    assert spent(user, category) == Decimal('110.00')
+
+
+@pytest.mark.django_db
+def test_bulk_operations_update_counters(user, category):
+    """
+    Test that bulk updates, bulk deletes and reassignment adjust the counters.
+    """
+    other = Category.objects.create(name='Other', user=user)
+    target = Category.objects.create(name='Target', user=user)
+    for amount in ('10.00', '20.00'):
+        Expense.objects.create(user=user, category=category, amount=Decimal(amount))
+
+    bulk_update_expenses(Expense.objects.filter(user=user), user, {'amount': Decimal('5.00'), 'category': other})
+    assert spent(user, category) == Decimal('0.00')
+    assert spent(user, other) == Decimal('10.00')
+
+    delete_category(other, user, reassign_to=target)
+    assert spent(user, target) == Decimal('10.00')
+
+    bulk_delete_expenses(Expense.objects.filter(user=user), user)
+    assert spent(user, target) == Decimal('0.00')
+
+
+@pytest.mark.django_db
+def test_bulk_operations_respect_block_limits(api_request_factory, user, category, limit):
+    """
+    Test that bulk updates and reassignment are refused when they push a counter past a block limit.
+    """
+    limit.action = CategoryLimit.BLOCK
+    limit.save()
+    other = Category.objects.create(name='Other', user=user)
+    for amount in ('30.00', '40.00'):
+        Expense.objects.create(user=user, category=category, amount=Decimal(amount))
+        Expense.objects.create(user=user, category=other, amount=Decimal(amount))
+
+    view = ExpenseViewSet.as_view({'patch': 'bulk'})
+    request = api_request_factory.patch(
+        f'/expenses/bulk/?category={category.pk}', {'amount': '60.00'}, format='json'
+    )
+    force_authenticate(request, user=user)
+    response = view(request)
+
+    assert response.status_code == 400
+    assert response.data['error'].startswith('Expenses exceed the monthly limit of 100.00')
+    assert sorted(Expense.objects.filter(category=category).values_list('amount', flat=True)) == [30, 40]
+    assert spent(user, category) == Decimal('70.00')
+
+    with pytest.raises(ValidationError):
+        delete_category(other, user, reassign_to=category)
+    assert Expense.objects.filter(category=other).count() == 2
+    assert spent(user, category) == Decimal('70.00')
+
+    bulk_update_expenses(Expense.objects.filter(category=category), user, {'amount': Decimal('50.00')})
+    assert spent(user, category) == Decimal('100.00')
+
+
+@pytest.mark.django_db
+def test_list_with_limits_runs_constant_queries(api_request_factory, user, category, limit, expense):
+    """
+    Test that listing categories with limits reads the counters without per-category queries.
+    """
+    for index in range(5):
+        Category.objects.create(name=f'Extra {index}', user=user)
+    view = CategoryViewSet.as_view({'get': 'list'})
+    request = api_request_factory.get('/categories/?with_limits=1')
+    force_authenticate(request, user=user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = view(request)
+
+    assert response.status_code == 200
+    assert len(queries) == 3
+    data = {item['id']: item for item in response.data}
+    assert data[category.pk]['spent'] == '50.00'
+    assert data[category.pk]['limit'] == {
+        'monthly_limit': '100.00', 'action': 'warn', 'remaining': '50.00', 'thresholds_crossed': []
+    }
+    assert all(item['limit'] is None for pk, item in data.items() if pk != category.pk)
+
+
+@pytest.mark.django_db
+def test_set_and_remove_limit(api_request_factory, user, category):
+    """
+    Test that PUT sets or replaces the limit and DELETE removes it.
+    """
+    view = CategoryViewSet.as_view({'put': 'limit', 'delete': 'limit'})
+
+    for value in ('100.00', '150.00'):
+        request = api_request_factory.put(
+            f'/categories/{category.pk}/limit/', {'monthly_limit': value, 'action': 'block'}, format='json'
+        )
+        force_authenticate(request, user=user)
+        response = view(request, pk=category.pk)
+        assert response.status_code == 200
+
+    assert CategoryLimit.objects.get(user=user, category=category).monthly_limit == Decimal('150.00')
+
+    request = api_request_factory.delete(f'/categories/{category.pk}/limit/')
+    force_authenticate(request, user=user)
+    assert view(request, pk=category.pk).status_code == 204
+    assert not CategoryLimit.objects.exists()
@@ -0,0 +1,128 @@
+import pytest
+from unittest import mock
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from account.models import AccountBudget
+from category.models import Expense
+from category.views import ExpenseViewSet
+
+
+def list_expenses(api_request_factory, user, query=''):
+    view = ExpenseViewSet.as_view({'get': 'list'})
+    request = api_request_factory.get(f'/expenses/{query}')
+    force_authenticate(request, user=user)
+    with CaptureQueriesContext(connection) as queries:
+        response = view(request)
+    return response, [query['sql'] for query in queries]
+
+
+def count_queries(queries):
+    return [sql for sql in queries if 'COUNT(*)' in sql]
+
+
+@pytest.fixture
+def expenses(user, category):
+    """
+    Fixture to create seven expenses.
+    """
+    return [
+        Expense.objects.create(user=user, category=category, amount=Decimal(i + 1), description=f'Expense {i}')
+        for i in range(7)
+    ]
+
+
+@pytest.mark.django_db
+def test_signals_maintain_expense_counter(user, expenses):
+    """
+    Test that creating and deleting expenses keeps the counter in sync.
+    """
+    expenses[0].delete()
+
+    assert AccountBudget.objects.get(user=user).expense_count == 6
+
+
+@pytest.mark.django_db
+def test_expense_counter_survives_stale_budget(user, category):
+    """
+    Test that a signal working on a stale budget does not overwrite the counter.
+    """
+    stale = AccountBudget.objects.get(user=user)
+    Expense.objects.create(user=user, category=category, amount=Decimal('1.00'))
+
+    with mock.patch('category.models.get_unique_or_none', return_value=stale):
+        Expense.objects.create(user=user, category=category, amount=Decimal('2.00'))
+    assert AccountBudget.objects.get(user=user).expense_count == 2
+
+    stale = AccountBudget.objects.get(user=user)
+    expenses = list(Expense.objects.filter(user=user))
+    expenses[0].delete()
+    with mock.patch('category.models.get_unique_or_none', return_value=stale):
+        expenses[1].delete()
+    assert AccountBudget.objects.get(user=user).expense_count == 0
+
+
+@pytest.mark.django_db
+def test_unfiltered_list_uses_counter_instead_of_count(api_request_factory, user, expenses):
+    """
+    Test that the default unfiltered list reads the counter and skips COUNT(*).
+    """
+    response, queries = list_expenses(api_request_factory, user, '?page=2')
+
+    assert response.data['count'] == 7
+    assert response.data['total_pages'] == 2
+    assert not count_queries(queries)
+
+
+@pytest.mark.django_db
+def test_filtered_count_is_cached(api_request_factory, user, expenses):
+    """
+    Test that a filtered count is computed once and then served from the cache.
+    """
+    first, first_queries = list_expenses(api_request_factory, user, '?min_price=2')
+    second, second_queries = list_expenses(api_request_factory, user, '?min_price=2&page=2')
+
+    assert first.data['count'] == second.data['count'] == 6
+    assert len(count_queries(first_queries)) == 1
+    assert not count_queries(second_queries)
+
+
+@pytest.mark.django_db
+def test_exact_count_runs_count_query(api_request_factory, user, category, expenses):
+    """
+    Test that `count=exact` counts rows the counter does not know about.
+    """
+    Expense.objects.bulk_create([Expense(user=user, category=category, amount=Decimal('1.00'))])
+
+    response, queries = list_expenses(api_request_factory, user, '?count=exact')
+
+    assert response.data['count'] == 8
+    assert len(count_queries(queries)) == 1
+
+
+@pytest.mark.django_db
+def test_no_count_uses_lookahead_row(api_request_factory, user, expenses):
+    """
+    Test that `count=none` omits the count and still links the next page.
+    """
+    first, queries = list_expenses(api_request_factory, user, '?count=none')
+    last, _ = list_expenses(api_request_factory, user, '?count=none&page=2')
+
+    assert first.data['count'] is None
+    assert first.data['total_pages'] is None
+    assert len(first.data['results']) == 5
+    assert 'page=2' in first.data['next']
+    assert len(queries) == 1
+    assert last.data['next'] is None
+    assert len(last.data['results']) == 2
+
+
+@pytest.mark.django_db
+def test_invalid_count_mode_is_rejected(api_request_factory, user, expenses):
+    """
+    Test that an unknown count mode returns 400.
+    """
+    response, _ = list_expenses(api_request_factory, user, '?count=maybe')
+
+    assert response.status_code == 400
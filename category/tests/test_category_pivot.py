@@ -0,0 +1,93 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from category.aggregations import pivot_options
+from category.models import Category, Expense
+from category.views import AggregationView
+
+
+@pytest.fixture
+def yearly_expenses(user, category):
+    """
+    Fixture to create expenses in two categories across 2024 and 2025.
+    """
+    other = Category.objects.create(name='Other', user=user)
+    for day, amount, expense_category in [
+        (date(2025, 1, 10), '40.00', category),
+        (date(2025, 1, 20), '10.00', category),
+        (date(2025, 3, 5), '20.00', other),
+        (date(2025, 12, 31), '5.00', category),
+        (date(2024, 6, 1), '99.00', other),
+    ]:
+        expense = Expense.objects.create(
+            user=user, category=expense_category, amount=Decimal(amount), description='Yearly'
+        )
+        # `date` is set on creation, so move the expense to its day afterwards.
+        Expense.objects.filter(pk=expense.pk).update(date=day)
+    return other
+
+
+def get_pivot(api_request_factory, user, query):
+    request = api_request_factory.get(f'/aggregation/?type=pivot&{query}')
+    force_authenticate(request, user=user)
+    return AggregationView.as_view()(request)
+
+
+@pytest.mark.django_db
+def test_aggregation_view_pivot(api_request_factory, user, category, yearly_expenses):
+    """
+    Test the category by month matrix of a year, built from one query.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = get_pivot(api_request_factory, user, 'rows=category&cols=month&year=2025')
+
+    assert response.status_code == 200
+    assert len(queries) == 1
+    assert response.data['rows'] == ['Other', 'TestCategory']
+    assert response.data['cols'] == [f'2025-{month:02d}' for month in range(1, 13)]
+    values = response.data['values']
+    assert len(values) == 24
+    assert values[2] == Decimal('20.00')
+    assert values[12] == Decimal('50.00')
+    assert values[23] == Decimal('5.00')
+    assert sum(values) == Decimal('75.00')
+
+
+@pytest.mark.django_db
+def test_aggregation_view_pivot_transposed(api_request_factory, user, category, yearly_expenses):
+    """
+    Test that months can be the rows and categories the columns.
+    """
+    response = get_pivot(api_request_factory, user, 'rows=month&cols=category&year=2025')
+
+    assert response.status_code == 200
+    assert response.data['rows'][0] == '2025-01'
+    assert response.data['cols'] == ['Other', 'TestCategory']
+    assert response.data['values'][:2] == [0, Decimal('50.00')]
+    assert response.data['values'][4] == Decimal('20.00')
+
+
+def test_pivot_options_defaults():
+    """
+    Test that the pivot defaults to categories by month of the current year.
+    """
+    assert pivot_options({}, today=date(2025, 7, 19)) == ('category', 'month', 2025)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('query, error', [
+    ('rows=month&cols=month', 'Invalid rows or cols parameter. Use "category" and "month".'),
+    ('rows=date', 'Invalid rows or cols parameter. Use "category" and "month".'),
+    ('year=abc', 'Invalid year parameter. Must be an integer.'),
+])
+def test_aggregation_view_pivot_invalid(api_request_factory, user, query, error):
+    """
+    Test AggregationView pivot with invalid layout or year.
+    """
+    response = get_pivot(api_request_factory, user, query)
+
+    assert response.status_code == 400
+    assert response.data['error'] == error
@@ -0,0 +1,162 @@
+import threading
+import time
+import pytest
+from decimal import Decimal
+from unittest import mock
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import force_authenticate
+from category import views
+from category.models import Expense
+from category.views import AggregationView, ExpenseViewSet
+from core.db.routers import pin_to_primary
+from core.singleflight import SingleFlight, coalesced_response, request_key
+
+CLIENTS = 8
+
+
+def run_concurrently(api_request_factory, user, view, path):
+    """
+    Send CLIENTS identical requests at once and count the SQL queries of all threads.
+    """
+    barrier = threading.Barrier(CLIENTS)
+    queries = []
+    responses = []
+
+    def count_query(execute, *args):
+        queries.append(args[0])
+        return execute(*args)
+
+    def client():
+        request = api_request_factory.get(path)
+        force_authenticate(request, user=user)
+        barrier.wait()
+        with connection.execute_wrapper(count_query):
+            response = view(request)
+        response.render()
+        responses.append(response)
+        connection.close()
+
+    threads = [threading.Thread(target=client) for _ in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses, queries
+
+
+def slow(func):
+    """
+    Wrap a query builder so the first request is still running when the others arrive.
+    """
+    def wrapper(*args, **kwargs):
+        time.sleep(0.2)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_aggregations_run_one_query_set(api_request_factory, user, expense):
+    """
+    Test that simultaneous identical aggregation requests share one computation.
+    """
+    view = AggregationView.as_view()
+
+    with mock.patch.object(views, 'total_queryset', slow(views.total_queryset)):
+        responses, queries = run_concurrently(api_request_factory, user, view, '/aggregations/?type=total')
+
+    assert len(queries) == 1
+    assert {response.status_code for response in responses} == {200}
+    assert {Decimal(response.data['total_spent']) for response in responses} == {Decimal('50.00')}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_expense_lists_run_one_query_set(api_request_factory, user, category):
+    """
+    Test that simultaneous identical expense list requests share one page and count query.
+    """
+    Expense.objects.bulk_create([Expense(user=user, category=category, amount=Decimal('5.00')) for _ in range(5)])
+    view = ExpenseViewSet.as_view({'get': 'list'})
+
+    with mock.patch.object(ExpenseViewSet, 'filter_queryset', slow(ExpenseViewSet.filter_queryset)):
+        responses, queries = run_concurrently(api_request_factory, user, view, '/expenses/?count=exact')
+
+    assert len(queries) == 2
+    assert [len(response.data['results']) for response in responses] == [5] * CLIENTS
+    assert len({response.content for response in responses}) == 1
+
+
+def test_request_key_separates_pinned_requests(api_request_factory, user):
+    """
+    Test that a request pinned to the primary never shares a replica read.
+    """
+    request = Request(api_request_factory.get('/expenses/?page=1'))
+    request.user = user
+
+    with pin_to_primary():
+        pinned = request_key(request, 'expense-list')
+    assert request_key(request, 'expense-list') != pinned
+
+
+def test_coalesced_response_copies_leader_headers(api_request_factory, user):
+    """
+    Test that waiting callers get the status, data and headers of the leader's response.
+    """
+    request = Request(api_request_factory.get('/expenses/'))
+    request.user = user
+    started, release = threading.Event(), threading.Event()
+    responses = []
+
+    def leader_response():
+        started.set()
+        release.wait()
+        return Response({'count': 1}, status=201, headers={'X-Total-Count': '1'})
+
+    leader = threading.Thread(target=lambda: responses.append(coalesced_response(request, 'test', leader_response)))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: responses.append(coalesced_response(request, 'test', None)))
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(responses) == 2 and responses[0] is not responses[1]
+    assert {response.status_code for response in responses} == {201}
+    assert {response['X-Total-Count'] for response in responses} == {'1'}
+    assert [response.data for response in responses] == [{'count': 1}] * 2
+
+
+def test_single_flight_shares_errors_and_forgets_finished_calls():
+    """
+    Test that waiters get the leader's exception and later calls compute again.
+    """
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        release.wait()
+        raise ValueError('boom')
+
+    def call():
+        try:
+            flights.do('key', fail)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+    assert flights.do('key', lambda: 1) == (1, False)
@@ -0,0 +1,147 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from category.models import Category, CategoryToken, Expense
+from category.services import bulk_delete_expenses, bulk_update_expenses, delete_category
+from category.suggestions import adjust_tokens, suggest_categories, tokenize
+from category.views import CategoryViewSet
+
+
+@pytest.fixture
+def groceries(user, category):
+    """
+    Fixture to create a few described expenses in two categories.
+    """
+    groceries = Category.objects.create(name='Groceries', user=user)
+    for description, expense_category in [
+        ('Supermarket snacks', groceries), ('Supermarket fruit', groceries), ('Bakery bread', groceries),
+        ('Cinema snacks', category),
+    ]:
+        Expense.objects.create(user=user, category=expense_category, amount=Decimal('5.00'), description=description)
+    return groceries
+
+
+def token_counts(user):
+    return {
+        (token.category_id, token.token): token.count
+        for token in CategoryToken.objects.filter(user=user, count__gt=0)
+    }
+
+
+def get_suggestions(api_request_factory, user, query):
+    request = api_request_factory.get(f'/categories/suggest/?{query}')
+    force_authenticate(request, user=user)
+    return CategoryViewSet.as_view({'get': 'suggest'})(request)
+
+
+def test_tokenize():
+    """
+    Test that descriptions are split into distinct lower-case words.
+    """
+    assert tokenize('Supermarket SNACKS, snacks & 2 x 4.99 a') == ['supermarket', 'snacks']
+    assert tokenize(None) == []
+
+
+@pytest.mark.django_db
+def test_tokens_follow_expense_signals(user, category, groceries):
+    """
+    Test that creating, updating and deleting expenses keeps the token counts current.
+    """
+    assert token_counts(user) == {
+        (groceries.id, 'supermarket'): 2, (groceries.id, 'snacks'): 1, (groceries.id, 'fruit'): 1,
+        (groceries.id, 'bakery'): 1, (groceries.id, 'bread'): 1, (category.id, 'cinema'): 1,
+        (category.id, 'snacks'): 1,
+    }
+
+    expense = Expense.objects.get(description='Bakery bread')
+    expense.description = 'Bakery rolls'
+    expense.save()
+    expense = Expense.objects.get(description='Cinema snacks')
+    expense.delete()
+
+    counts = token_counts(user)
+    assert (groceries.id, 'bread') not in counts
+    assert counts[(groceries.id, 'rolls')] == 1
+    assert (category.id, 'snacks') not in counts and (category.id, 'cinema') not in counts
+
+
+@pytest.mark.django_db
+def test_tokens_follow_bulk_services(user, category, groceries):
+    """
+    Test that the set-based services move and remove the token counts.
+    """
+    bulk_update_expenses(Expense.objects.filter(description__startswith='Supermarket'), user, {'category': category})
+    counts = token_counts(user)
+    assert counts[(category.id, 'supermarket')] == 2
+    assert (groceries.id, 'supermarket') not in counts
+
+    bulk_delete_expenses(Expense.objects.filter(category=category), user)
+    assert set(token_counts(user)) == {(groceries.id, 'bakery'), (groceries.id, 'bread')}
+
+    other = Category.objects.create(name='Other', user=user)
+    delete_category(groceries, user, reassign_to=other)
+    assert token_counts(user) == {(other.id, 'bakery'): 1, (other.id, 'bread'): 1}
+
+
+@pytest.mark.django_db
+def test_adjust_tokens_adds_to_concurrently_inserted_tokens(user, category):
+    """
+    Test that a token another writer inserts after the lookup gets the increment instead of losing it.
+    """
+    inserted = []
+
+    def insert_after_lookup(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if not inserted and sql.startswith('SELECT') and CategoryToken._meta.db_table in sql:
+            inserted.append(True)
+            CategoryToken.objects.create(user=user, category=category, token='courier', count=3)
+        return result
+
+    with connection.execute_wrapper(insert_after_lookup):
+        adjust_tokens(user.id, [{'category_id': category.id, 'description': 'Courier parcel'}])
+
+    assert inserted
+    assert token_counts(user) == {(category.id, 'courier'): 4, (category.id, 'parcel'): 1}
+
+
+@pytest.mark.django_db
+def test_suggest_categories_ranked_from_cache(user, category, groceries):
+    """
+    Test the ranking and that repeated suggestions are served without queries.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        first = suggest_categories(user.id, 'Supermarket snacks')
+        second = suggest_categories(user.id, 'snacks')
+    assert len(queries) == 1
+
+    assert first == [
+        {'id': groceries.id, 'name': 'Groceries', 'score': 0.75},
+        {'id': category.id, 'name': 'TestCategory', 'score': 0.25},
+    ]
+    assert second == [
+        {'id': groceries.id, 'name': 'Groceries', 'score': 0.5},
+        {'id': category.id, 'name': 'TestCategory', 'score': 0.5},
+    ]
+
+    Expense.objects.create(user=user, category=category, amount=Decimal('5.00'), description='Popcorn snacks')
+    assert suggest_categories(user.id, 'snacks')[0]['id'] == category.id
+
+
+@pytest.mark.django_db
+def test_category_suggest_view(api_request_factory, user, category, groceries):
+    """
+    Test the suggest endpoint, its limit and its validation.
+    """
+    response = get_suggestions(api_request_factory, user, 'description=Weekly+supermarket&limit=1')
+    assert response.status_code == 200
+    assert response.data == {'suggestions': [{'id': groceries.id, 'name': 'Groceries', 'score': 0.5}]}
+
+    response = get_suggestions(api_request_factory, user, 'description=Unknown')
+    assert response.data == {'suggestions': []}
+
+    assert get_suggestions(api_request_factory, user, 'description=').status_code == 400
+    response = get_suggestions(api_request_factory, user, 'description=snacks&limit=11')
+    assert response.status_code == 400
+    assert response.data == {'error': 'Invalid limit parameter. Must be an integer between 1 and 10.'}
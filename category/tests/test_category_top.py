@@ -0,0 +1,77 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from category.models import Category, Expense
+from category.views import AggregationView
+
+
+@pytest.fixture
+def ranked_expenses(user, category):
+    """
+    Fixture to create expenses of different amounts in two categories.
+    """
+    other = Category.objects.create(name='Other', user=user)
+    for amount, expense_category in [
+        ('10.00', category), ('40.00', category), ('20.00', category), ('30.00', category),
+        ('5.00', other),
+    ]:
+        Expense.objects.create(
+            user=user, category=expense_category, amount=Decimal(amount), description=f'Expense {amount}'
+        )
+    return other
+
+
+def get_top(api_request_factory, user, query):
+    request = api_request_factory.get(f'/aggregation/?type=top&{query}')
+    force_authenticate(request, user=user)
+    return AggregationView.as_view()(request)
+
+
+@pytest.mark.django_db
+def test_aggregation_view_top(api_request_factory, user, category, ranked_expenses):
+    """
+    Test that the largest expenses of every category are returned in one query.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = get_top(api_request_factory, user, 'n=3')
+
+    assert response.status_code == 200
+    assert len(queries) == 1
+    assert 'ROW_NUMBER' in queries[0]['sql']
+
+    other, test_category = response.data['top_expenses']
+    assert other['category__name'] == 'Other'
+    assert [e['amount'] for e in other['expenses']] == [Decimal('5.00')]
+    assert test_category['category__name'] == 'TestCategory'
+    assert [e['amount'] for e in test_category['expenses']] == [
+        Decimal('40.00'), Decimal('30.00'), Decimal('20.00')
+    ]
+    assert test_category['expenses'][0]['description'] == 'Expense 40.00'
+
+
+@pytest.mark.django_db
+def test_aggregation_view_top_default_and_categories(api_request_factory, user, category, ranked_expenses):
+    """
+    Test the default of 3 expenses and the categories filter.
+    """
+    response = get_top(api_request_factory, user, f'categories={ranked_expenses.id}')
+
+    assert response.status_code == 200
+    assert [c['category__name'] for c in response.data['top_expenses']] == ['Other']
+
+    response = get_top(api_request_factory, user, '')
+    assert len(response.data['top_expenses'][1]['expenses']) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('n', ['0', 'abc', '51'])
+def test_aggregation_view_top_invalid_n(api_request_factory, user, n):
+    """
+    Test AggregationView top with an invalid number of expenses.
+    """
+    response = get_top(api_request_factory, user, f'n={n}')
+
+    assert response.status_code == 400
+    assert response.data['error'] == 'Invalid n parameter. Must be an integer between 1 and 50.'
@@ -0,0 +1,91 @@
+import pytest
+from decimal import Decimal
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import force_authenticate
+from account.models import AccountBudget
+from category.models import Expense
+from category.services import bulk_update_expenses
+from category.views import ExpenseViewSet
+from core.versioning import VersionConflict
+
+
+def expense_request(api_request_factory, user, expense, method='get', data=None, if_match=None):
+    headers = {'HTTP_IF_MATCH': if_match} if if_match is not None else {}
+    request = getattr(api_request_factory, method)(f'/expenses/{expense.pk}/', data, format='json', **headers)
+    force_authenticate(request, user=user)
+    action = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update'}[method]
+    return ExpenseViewSet.as_view({method: action})(request, pk=expense.pk)
+
+
+@pytest.mark.django_db
+def test_expense_update_with_if_match(api_request_factory, user, expense):
+    """
+    Test that an update with the current ETag succeeds and a stale one gets 412.
+    """
+    response = expense_request(api_request_factory, user, expense)
+    assert response['ETag'] == '"1"'
+
+    response = expense_request(api_request_factory, user, expense, 'patch', {'amount': '60.00'}, if_match='"1"')
+    assert response.status_code == 200
+    assert response['ETag'] == '"2"'
+
+    response = expense_request(api_request_factory, user, expense, 'patch', {'amount': '70.00'}, if_match='"1"')
+    assert response.status_code == 412
+
+    expense.refresh_from_db()
+    assert expense.amount == Decimal('60.00')
+    assert expense.version == 2
+    assert AccountBudget.objects.get(user=user).budget == Decimal('940.00')
+
+
+@pytest.mark.django_db
+def test_expense_update_without_if_match(api_request_factory, user, expense, category):
+    """
+    Test that updates without `If-Match` (or with `*`) still apply and increment the version.
+    """
+    data = {'amount': '10.00', 'description': 'Unguarded', 'category': category.pk}
+    response = expense_request(api_request_factory, user, expense, 'put', data)
+    assert response.status_code == 200
+    response = expense_request(api_request_factory, user, expense, 'patch', {'amount': '20.00'}, if_match='*')
+    assert response.status_code == 200
+    assert response['ETag'] == '"3"'
+
+    for if_match in ('3', 'W/"3"', '"2", "3"'):
+        response = expense_request(api_request_factory, user, expense, 'patch', {'amount': '30.00'}, if_match=if_match)
+        assert response.status_code == 400
+        assert response.data['error'].startswith('Invalid If-Match header.')
+
+
+@pytest.mark.django_db
+def test_conditional_save_detects_concurrent_write(user, expense):
+    """
+    Test that a write between reading and saving makes the conditional UPDATE match nothing.
+    """
+    stale = Expense.objects.get(pk=expense.pk)
+    expense.amount = Decimal('55.00')
+    expense.save()
+
+    stale.amount = Decimal('45.00')
+    stale.expected_version = 1
+    with CaptureQueriesContext(connection) as queries, pytest.raises(VersionConflict):
+        with transaction.atomic():
+            stale.save()
+
+    update = next(query['sql'] for query in queries if query['sql'].startswith('UPDATE "category_expense"'))
+    assert '"version" = 1' in update
+    expense.refresh_from_db()
+    assert (expense.amount, expense.version) == (Decimal('55.00'), 2)
+
+
+@pytest.mark.django_db
+def test_set_based_updates_increment_versions(user, expense, category):
+    """
+    Test that bulk updates invalidate the ETags of the expenses and budget they change.
+    """
+    budget_version = AccountBudget.objects.get(user=user).version
+    bulk_update_expenses(Expense.objects.filter(pk=expense.pk), user, {'amount': Decimal('10.00')})
+
+    expense.refresh_from_db()
+    assert expense.version == 2
+    assert AccountBudget.objects.get(user=user).version == budget_version + 1
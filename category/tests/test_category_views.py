@@ -222,7 +222,7 @@ def test_aggregation_view_invalid_type(api_request_factory, user):
     response = view(request)
 
     assert response.status_code == 400
-    assert response.data['error'] == 'Invalid type parameter. Use "total", "categories", or "average".'
+    assert response.data['error'] == 'Invalid type parameter. Use "total", "categories", "average", "comparison", "top", or "pivot".'
 
 
 @pytest.mark.django_db
@@ -5,6 +5,10 @@ from .views import (
     ExpenseViewSet,
     AggregationView
 )
+from .async_views import (
+    AsyncAggregationView,
+    AsyncExpenseListView
+)
 
 
 router = DefaultRouter()
@@ -13,4 +17,6 @@ router.register(r'expenses', ExpenseViewSet, basename='expense')
 
 category_urls = router.urls + [
     path('aggregations/', AggregationView.as_view(), name='aggregations'),
+    path('async/aggregations/', AsyncAggregationView.as_view(), name='async_aggregations'),
+    path('async/expenses/', AsyncExpenseListView.as_view(), name='async_expenses'),
 ]
\ No newline at end of file
@@ -1,5 +1,7 @@
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.filters import (
     SearchFilter,
@@ -8,28 +10,61 @@ from rest_framework.filters import (
 from rest_framework.views import APIView
 from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
+from datetime import date
+
+from django.db import transaction
 from django.db.models.functions import Lower
-from django.db.models import (
-    Q,
-    Sum,
-    Avg
-)
+from django.db.models import Q
 from drf_spectacular.utils import (
     extend_schema, extend_schema_view, OpenApiParameter, OpenApiResponse
 )
 from drf_spectacular.types import OpenApiTypes
 
-from account.models import BudgetHistory
-
+from core.singleflight import coalesced_response
+from core.versioning import check_version, etag, expected_version
 from .models import (
     Category,
+    CategoryLimit,
+    CategorySpend,
     Expense
 )
 from .serializers import (
     CategorySerializer,
-    ExpenseSerializer
+    CategoryLimitSerializer,
+    CategoryWithLimitSerializer,
+    CategorySuggestionsSerializer,
+    ExpenseSerializer,
+    ExpenseBulkSerializer,
+    ExpenseBulkUpdateSerializer,
+    ExpenseBulkResultSerializer
 )
 from .filters import ExpenseFilter
+from .fieldsets import parse_fieldset, apply_fieldset
+from .limits import check_limit, month_of
+from .suggestions import DEFAULT_SUGGESTIONS, MAX_SUGGESTIONS, suggest_categories
+from .services import (
+    bulk_update_expenses,
+    bulk_delete_expenses,
+    delete_category
+)
+from .aggregations import (
+    INVALID_TYPE_ERROR,
+    TOTAL_AGGREGATES,
+    build_aggregation_filters,
+    total_queryset,
+    format_total,
+    expenses_by_categories_queryset,
+    average_expenses_queryset,
+    comparison_periods,
+    comparison_queryset,
+    format_comparison,
+    top_expenses_limit,
+    top_expenses_queryset,
+    format_top_expenses,
+    pivot_options,
+    pivot_queryset,
+    format_pivot
+)
 from .expense_pagination import ExpensePagination
 from .schemas.aggregation_schemas import aggregation_schema
 from .schemas.categories_schemas import categories_schemas
@@ -48,8 +83,73 @@ class CategoryViewSet(ModelViewSet):
     def get_queryset(self):
         return Category.objects.filter(Q(user=self.request.user) | Q(user__isnull=True))
     
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        delete_category(instance, self.request.user, reassign_to=self.reassign_to)
+
+    def list(self, request, *args, **kwargs):
+        """
+        List categories; with `?with_limits=1` each one also carries its
+        current-month spending and limit, read from the spend counters.
+        """
+        if request.query_params.get('with_limits') not in ('1', 'true'):
+            return super().list(request, *args, **kwargs)
+
+        month = month_of(date.today())
+        context = {
+            **self.get_serializer_context(),
+            'limits': {limit.category_id: limit for limit in CategoryLimit.objects.filter(user=request.user)},
+            'spends': dict(
+                CategorySpend.objects.filter(user=request.user, month=month).values_list('category_id', 'amount')
+            ),
+        }
+        serializer = CategoryWithLimitSerializer(self.get_queryset(), many=True, context=context)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['put', 'delete'], url_path='limit')
+    def limit(self, request, *args, **kwargs):
+        """
+        Set or remove the user's monthly limit on a category.
+        """
+        category = self.get_object()
+        limit = CategoryLimit.objects.filter(user=request.user, category=category).first()
+        if request.method == 'DELETE':
+            if limit is not None:
+                limit.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        serializer = CategoryLimitSerializer(limit, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user, category=category)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='suggest')
+    def suggest(self, request, *args, **kwargs):
+        """
+        Rank the user's categories for an expense description from the
+        words of their past expense descriptions.
+        """
+        description = request.query_params.get('description', '').strip()
+        if not description:
+            return Response(
+                {'error': "The 'description' parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = request.query_params.get('limit', str(DEFAULT_SUGGESTIONS))
+        if not limit.isdigit() or not 1 <= int(limit) <= MAX_SUGGESTIONS:
+            return Response(
+                {'error': f'Invalid limit parameter. Must be an integer between 1 and {MAX_SUGGESTIONS}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        suggestions = suggest_categories(request.user.pk, description, int(limit))
+        return Response(CategorySuggestionsSerializer({'suggestions': suggestions}).data)
     
     def update(self, request, *args, **kwargs):
         """
@@ -57,7 +157,7 @@ class CategoryViewSet(ModelViewSet):
         cannot be updated.
         """
         category = self.get_object()
-        if category.user is None:
+        if category.user_id is None:
             return Response(
                 {'error': 'Predefined categories cannot be updated.'},
                 status=status.HTTP_403_FORBIDDEN
@@ -70,11 +170,22 @@ class CategoryViewSet(ModelViewSet):
         cannot be deleted.
         """
         category = self.get_object()
-        if category.user is None:
+        if category.user_id is None:
             return Response(
                 {'error': 'Predefined categories cannot be deleted.'},
                 status=status.HTTP_403_FORBIDDEN
             )
+
+        self.reassign_to = None
+        reassign_to = request.query_params.get('reassign_to')
+        if reassign_to is not None:
+            if reassign_to.isdigit():
+                self.reassign_to = self.get_queryset().exclude(pk=category.pk).filter(pk=reassign_to).first()
+            if self.reassign_to is None:
+                return Response(
+                    {'error': "'reassign_to' must be the id of another available category."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         return super().destroy(request, *args, **kwargs)
 
 
@@ -95,11 +206,71 @@ class ExpenseViewSet(ModelViewSet):
     ordering_fields = ['amount', 'date', 'category__name']
     ordering = ['-date']
 
+    sparse_fields = None
+    expand = ()
+    limit_warning = None
+    response_etag = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            try:
+                self.sparse_fields, self.expand = parse_fieldset(request.query_params)
+            except ValueError as e:
+                raise ValidationError({'error': str(e)})
+
     def get_queryset(self):
-        return Expense.objects.filter(user=self.request.user)
+        queryset = Expense.objects.filter(user=self.request.user)
+        if self.request.method in SAFE_METHODS:
+            queryset = apply_fieldset(queryset, self.sparse_fields, self.expand)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request is not None and self.request.method in SAFE_METHODS:
+            kwargs.setdefault('fields', self.sparse_fields)
+            kwargs.setdefault('expand', self.expand)
+        return super().get_serializer(*args, **kwargs)
     
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.limit_warning:
+            response['X-Category-Limit-Warning'] = self.limit_warning
+        if self.response_etag:
+            response['ETag'] = self.response_etag
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        self.response_etag = etag(instance)
+        return Response(self.get_serializer(instance).data)
+
+    @transaction.atomic
     def perform_create(self, serializer):
+        data = serializer.validated_data
+        self.limit_warning = check_limit(self.request.user, data['category'], date.today(), data['amount'])
         serializer.save(user=self.request.user)
+        self.response_etag = etag(serializer.instance)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """
+        Save the changes; with `If-Match` only if the expense is still at
+        that version (see `core.versioning`).
+        """
+        instance, data = serializer.instance, serializer.validated_data
+        check_version(instance, expected_version(self.request))
+        self.limit_warning = check_limit(
+            self.request.user,
+            data.get('category', instance.category),
+            instance.date,
+            data.get('amount', instance.amount),
+            previous=instance
+        )
+        serializer.save()
+        self.response_etag = etag(serializer.instance)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
 
     def get_ordered_queryset(self, qs, initial_order):
         """
@@ -123,7 +294,48 @@ class ExpenseViewSet(ModelViewSet):
 
         return qs.order_by(order_by)
 
+    def get_bulk_queryset(self, ids):
+        """
+        Expenses targeted by a bulk operation: the given ids, or else the
+        expenses matched by the filter and search query parameters.
+        """
+        if ids:
+            return self.get_queryset().filter(pk__in=ids)
+
+        # Filters ignore empty values, so `?search=` alone would select everything.
+        filter_params = set(ExpenseFilter.base_filters) | {SearchFilter.search_param}
+        query_params = self.request.query_params
+        if not any(value.strip() for name in filter_params for value in query_params.getlist(name)):
+            return None
+        return self.filter_queryset(self.get_queryset())
+
+    @action(detail=False, methods=['patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        """
+        Update or delete many expenses with one statement.
+        """
+        serializer_class = ExpenseBulkUpdateSerializer if request.method == 'PATCH' else ExpenseBulkSerializer
+        serializer = serializer_class(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+
+        queryset = self.get_bulk_queryset(changes.pop('ids', None))
+        if queryset is None:
+            return Response(
+                {'error': 'Provide `ids` or at least one filter to select expenses.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'PATCH':
+            count, budget = bulk_update_expenses(queryset, request.user, changes)
+        else:
+            count, budget = bulk_delete_expenses(queryset, request.user)
+        return Response(ExpenseBulkResultSerializer({'count': count, 'budget': budget.budget}).data)
+
     def list(self, request, *args, **kwargs):
+        return coalesced_response(request, 'expense-list', lambda: self.get_list_response(request))
+
+    def get_list_response(self, request):
         try:
             queryset = self.get_ordered_queryset(
                 self.filter_queryset(self.get_queryset()),
@@ -149,32 +361,18 @@ class AggregationView(APIView):
     API View for dynamic aggregations based on query parameters.
     """
     permission_classes = [IsAuthenticated]
+    throttle_cost = 10
 
     def get(self, request, *args, **kwargs):
-        year = request.query_params.get('year')
-        month = request.query_params.get('month')
-        date = request.query_params.get('date')
-        categories = request.query_params.get('categories')
-        agg_type = request.query_params.get('type')
+        return coalesced_response(request, 'aggregations', lambda: self.aggregate(request))
 
-        if categories:
-            try:
-                categories = list(map(int, categories.split(',')))
-            except ValueError:
-                return Response(
-                    {'error': 'Invalid category IDs. Must be integers.'},
-                    status=400
-                )
+    def aggregate(self, request):
+        agg_type = request.query_params.get('type')
 
-        filters = Q(user=request.user)
-        if year:
-            filters &= Q(date__year=year)
-        if month:
-            filters &= Q(date__month=month)
-        if date:
-            filters &= Q(date=date)
-        if categories:
-            filters &= Q(category_id__in=categories)
+        try:
+            filters = build_aggregation_filters(request.query_params, request.user)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
 
         if agg_type == 'total':
             return self.get_total(filters)
@@ -182,9 +380,15 @@ class AggregationView(APIView):
             return self.get_expenses_by_categories(filters)
         elif agg_type == 'average':
             return self.get_average_expenses(filters)
+        elif agg_type == 'comparison':
+            return self.get_comparison(request)
+        elif agg_type == 'top':
+            return self.get_top_expenses(request, filters)
+        elif agg_type == 'pivot':
+            return self.get_pivot(request)
         else:
             return Response(
-                {'error': 'Invalid type parameter. Use "total", "categories", or "average".'},
+                {'error': INVALID_TYPE_ERROR},
                 status=400
             )
 
@@ -192,28 +396,14 @@ class AggregationView(APIView):
         """
         Calculate total earned and spent.
         """
-        budget_filters = filters & ~Q(category_id__in=[])
-        earnings = BudgetHistory.objects.filter(budget_filters).aggregate(
-            total_earned=Sum('amount', filter=Q(change_type='income')),
-            total_spent=Sum('amount', filter=Q(change_type='expense'))
-        )
-
-        total_earnings = (earnings['total_earned'] or 0) - (earnings['total_spent'] or 0)
-        if total_earnings < 0:
-            total_earnings = 0
-        return Response({
-            'total_earned': earnings['total_earned'] or 0,
-            'total_spent': earnings['total_spent'] or 0,
-            'net_earnings': total_earnings
-        })
+        earnings = total_queryset(filters).aggregate(**TOTAL_AGGREGATES)
+        return Response(format_total(earnings))
 
     def get_expenses_by_categories(self, filters):
         """
         Calculate expenses grouped by categories.
         """
-        expenses_by_category = Expense.objects.filter(filters).values('category__name').annotate(
-            total_expenses=Sum('amount')
-        ).order_by('-total_expenses')
+        expenses_by_category = expenses_by_categories_queryset(filters)
 
         return Response({
             'expenses_by_category': list(expenses_by_category)
@@ -223,11 +413,43 @@ class AggregationView(APIView):
         """
         Calculate average expenses, optionally filtered by categories.
         """
-
-        average_expenses = Expense.objects.filter(filters).values('category__name').annotate(
-            average_expense=Avg('amount')
-        ).order_by('-average_expense')
+        average_expenses = average_expenses_queryset(filters)
 
         return Response({
             'average_expenses': list(average_expenses)
-        })
\ No newline at end of file
+        })
+
+    def get_comparison(self, request):
+        """
+        Calculate per-category totals of consecutive months and their changes.
+        """
+        try:
+            periods = comparison_periods(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        rows = comparison_queryset(request.query_params, request.user, periods)
+        return Response(format_comparison(rows, periods))
+
+    def get_top_expenses(self, request, filters):
+        """
+        Fetch the largest expenses of every category.
+        """
+        try:
+            n = top_expenses_limit(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        return Response(format_top_expenses(top_expenses_queryset(filters, n)))
+
+    def get_pivot(self, request):
+        """
+        Calculate a category by month table of expense totals for a year.
+        """
+        try:
+            rows, _, year = pivot_options(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        totals = pivot_queryset(request.query_params, request.user, year)
+        return Response(format_pivot(totals, rows, year))
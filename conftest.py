@@ -0,0 +1,16 @@
+import pytest
+from django.conf import settings
+from core.throttling import get_store
+
+
+def pytest_configure():
+    # Keep throttle counters in memory, so tests never share a file.
+    settings.THROTTLE_STORE = 'memory'
+
+
+@pytest.fixture(autouse=True)
+def reset_throttle():
+    """
+    Fixture to start every test with empty throttle counters.
+    """
+    get_store().reset()
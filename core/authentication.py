@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.db.sharding import (
+    DIRECTORY_DATABASE,
+    get_ring,
+    set_current_shard
+)
+from core.hashing import hash_password, verify_password
+from core.models import UserShard
+
+
+class UserMigrating(APIException):
+    status_code = 503
+    default_detail = 'Your data is being moved to another database. Please retry shortly.'
+    default_code = 'user_migrating'
+
+
+class ShardedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that also routes the request to the user's shard.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        entry = UserShard.objects.using(DIRECTORY_DATABASE).filter(user_id=user.pk).first()
+        if entry is not None and entry.migrating:
+            raise UserMigrating()
+        alias = entry.alias if entry is not None else get_ring().node_for(user.pk)
+        set_current_shard(user.pk, alias)
+        return user
+
+
+class PooledPasswordBackend(ModelBackend):
+    """
+    `ModelBackend` that verifies passwords on the hashing pool
+    (`core.hashing`) and upgrades outdated hashes after a successful login.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway, so unknown usernames take as long as wrong passwords.
+            hash_password(password)
+            return None
+
+        valid, must_update = verify_password(password, user.password)
+        if not valid or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = hash_password(password)
+            user.save(update_fields=['password'])
+        return user
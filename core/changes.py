@@ -0,0 +1,162 @@
+"""
+Change feed for client delta sync.
+
+Every create, update and delete of the synced models is written to the
+`Change` outbox by signal receivers, in the same transaction as the write.
+Clients page through `/api/changes/?since=<cursor>` and only download rows
+that changed since their last sync, plus tombstones for deleted rows.
+
+Delivery is at least once. Change ids are assigned at insert, not at
+commit, so a change can become visible after a higher id was already read
+(a longer transaction, or a shard write finishing after its `Change` row
+on `default` committed). The cursor therefore only advances over changes
+older than `CHANGES_SAFETY_LAG`; younger ones are served but delivered
+again on the next sync. Changes are idempotent upserts and tombstones
+keyed by (`model`, `id`), so clients simply apply them again. A write
+that stays uncommitted for longer than the lag can still be missed.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.db.models.signals import post_delete, post_save
+
+from account.models import AccountBudget
+from account.serializers import AccountBudgetSerializer
+from category.models import Category, Expense
+from category.serializers import CategorySerializer, ExpenseSerializer
+from core.models import Change
+
+SYNCED_MODELS = {
+    'expense': (Expense, ExpenseSerializer),
+    'category': (Category, CategorySerializer),
+    'budget': (AccountBudget, AccountBudgetSerializer),
+}
+
+_MODEL_NAMES = {model: name for name, (model, _) in SYNCED_MODELS.items()}
+
+
+def record_changes(model, instances, action):
+    """
+    Append one change per instance to the outbox.
+
+    Bulk code paths that bypass model signals call this directly.
+    """
+    name = _MODEL_NAMES[model]
+    Change.objects.bulk_create([
+        Change(user_id=instance.user_id, model=name, object_id=instance.pk, action=action)
+        for instance in instances
+    ])
+
+
+def record_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    record_changes(sender, [instance], Change.CREATE if created else Change.UPDATE)
+
+
+def record_delete(sender, instance, **kwargs):
+    record_changes(sender, [instance], Change.DELETE)
+
+
+def connect_signals():
+    for model, _ in SYNCED_MODELS.values():
+        post_save.connect(record_save, sender=model, dispatch_uid=f'change-feed-save-{model._meta.label}')
+        post_delete.connect(record_delete, sender=model, dispatch_uid=f'change-feed-delete-{model._meta.label}')
+
+
+def get_changes(user, since=0, limit=100, now=None):
+    """
+    Changes visible to `user` after cursor `since`.
+
+    Several changes of one object within the page collapse into its latest
+    one; upserts carry the current serialized row, deletes carry no data.
+    The cursor stops before the first change younger than
+    `CHANGES_SAFETY_LAG`, so those are returned again next time.
+
+    Returns:
+        Tuple of (changes, next cursor, whether more changes are pending).
+    """
+    events = list(
+        Change.objects.filter(Q(user=user) | Q(user__isnull=True), pk__gt=since)
+        .order_by('pk')[:limit + 1]
+    )
+    events, pending = events[:limit], events[limit:]
+
+    settled = (now or timezone.now()) - timedelta(seconds=settings.CHANGES_SAFETY_LAG)
+    cursor = since
+    for event in events:
+        if event.created_at > settled:
+            break
+        cursor = event.pk
+    # Only ask for another page when this one moved the cursor to its end,
+    # so a client never loops on changes that are still settling.
+    has_more = bool(pending) and bool(events) and cursor == events[-1].pk
+
+    latest = {}
+    for event in events:
+        latest[(event.model, event.object_id)] = event
+
+    rows = {}
+    for name, (model, serializer_class) in SYNCED_MODELS.items():
+        ids = [
+            object_id for (event_model, object_id), event in latest.items()
+            if event_model == name and event.action != Change.DELETE
+        ]
+        if ids:
+            instances = model.objects.filter(pk__in=ids)
+            if name != 'category':
+                instances = instances.filter(user=user)
+            for instance in instances:
+                rows[(name, instance.pk)] = serializer_class(instance).data
+
+    changes = []
+    for key, event in sorted(latest.items(), key=lambda item: item[1].pk):
+        data = rows.get(key)
+        # An upserted row missing now was deleted by a later change.
+        action = Change.DELETE if data is None else event.action
+        changes.append({
+            'seq': event.pk,
+            'model': event.model,
+            'id': event.object_id,
+            'action': action,
+            'data': data,
+        })
+    return changes, cursor, has_more
+
+
+def compact_changes(before=None, tombstones_before=None, batch_size=1000):
+    """
+    Delete outbox rows clients no longer need.
+
+    Args:
+        before: Only compact changes created before this time.
+        tombstones_before: Also drop delete tombstones created before this
+            time; clients with an older cursor must resync from scratch.
+        batch_size: Rows deleted per statement.
+
+    Returns:
+        Number of deleted rows.
+    """
+    # Shards number their rows independently, so an object is only the same
+    # for changes of the same user (or of no user, for predefined rows).
+    newer = Change.objects.filter(
+        model=OuterRef('model'), object_id=OuterRef('object_id'), pk__gt=OuterRef('pk')
+    )
+    obsolete = Q(Exists(newer.filter(user=OuterRef('user')))) | Q(
+        Exists(newer.filter(user__isnull=True)), user__isnull=True
+    )
+    if tombstones_before is not None:
+        obsolete |= Q(action=Change.DELETE, created_at__lt=tombstones_before)
+
+    queryset = Change.objects.filter(obsolete)
+    if before is not None:
+        queryset = queryset.filter(created_at__lt=before)
+
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Change.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,72 @@
+"""
+PostgreSQL backend that hands out connections from a bounded per-process pool.
+
+Configure it through the regular `DATABASES` entry:
+
+    'ENGINE': 'core.db.backends.pooled_postgresql',
+    'CONN_MAX_AGE': 0,
+    'POOL': {
+        'MAX_SIZE': 10,
+        'TIMEOUT': 5,
+        'MAX_LIFETIME': 1800,
+        'HEALTH_CHECK_INTERVAL': 30,
+    },
+
+`CONN_MAX_AGE` keeps its usual meaning for the Django connection of each
+thread; "closing" it returns the physical connection to the pool, while
+`POOL['MAX_LIFETIME']` bounds how long the physical connection is reused.
+"""
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from core.db.pool import get_pool
+
+from .creation import DatabaseCreation
+
+
+def _ping(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+# Settings that select the server and database a pooled connection talks to.
+POOL_KEY_SETTINGS = ('NAME', 'HOST', 'PORT', 'USER')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL', {})
+        return get_pool(
+            self.alias,
+            params=[self.settings_dict.get(name) for name in POOL_KEY_SETTINGS],
+            max_size=int(options.get('MAX_SIZE', 10)),
+            timeout=float(options.get('TIMEOUT', 5)),
+            max_lifetime=options.get('MAX_LIFETIME'),
+            health_check_interval=options.get('HEALTH_CHECK_INTERVAL', 30),
+            check=_ping,
+        )
+
+    def get_new_connection(self, conn_params):
+        parent = super()
+        connection = self.pool.acquire(lambda: parent.get_new_connection(conn_params))
+        # The parent sets this while connecting; reused connections need it too.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        discard = bool(connection.closed)
+        if not discard:
+            try:
+                if not connection.autocommit:
+                    connection.rollback()
+            except self.Database.Error:
+                discard = True
+        self.pool.release(connection, discard=discard)
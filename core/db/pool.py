@@ -0,0 +1,255 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    """
+    Raised when no pooled connection becomes available within the timeout.
+    """
+
+
+class _PooledConnection:
+    __slots__ = ('connection', 'created_at', 'released_at')
+
+    def __init__(self, connection, now):
+        self.connection = connection
+        self.created_at = now
+        self.released_at = now
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of raw DB-API connections.
+
+    Args:
+        max_size: Maximum number of open connections (idle + checked out).
+        timeout: Seconds `acquire` waits for a free slot before raising PoolTimeout.
+        max_lifetime: Seconds after which a connection is closed instead of reused.
+            None keeps connections forever.
+        health_check_interval: Idle seconds after which a connection is pinged
+            with `check` before being handed out. None disables health checks.
+        check: Callable receiving a raw connection; should raise if it is unusable.
+    """
+
+    def __init__(self, max_size=10, timeout=5.0, max_lifetime=None,
+                 health_check_interval=None, check=None, clock=time.monotonic):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.check = check
+        self.clock = clock
+
+        self._idle = deque()
+        self._in_use = {}
+        self._connecting = 0
+        self._condition = threading.Condition()
+        self._counters = {
+            'created': 0,
+            'reused': 0,
+            'closed': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+            'waits': 0,
+            'timeouts': 0,
+        }
+        self._wait_time = 0.0
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._connecting
+
+    def acquire(self, connect):
+        """
+        Check out a connection, reusing an idle one when possible.
+
+        Args:
+            connect: Zero-argument callable opening a new raw connection.
+
+        Returns:
+            A raw connection owned by the caller until `release` is called.
+        """
+        deadline = self.clock() + self.timeout
+        while True:
+            entry = self._checkout(deadline)
+            if entry is None:
+                break
+            # Ping without holding the lock, so a slow or dead server only
+            # stalls this caller instead of every thread using the pool.
+            if self._is_healthy(entry):
+                with self._condition:
+                    self._counters['reused'] += 1
+                return entry.connection
+            with self._condition:
+                del self._in_use[id(entry.connection)]
+                self._counters['health_check_failures'] += 1
+                self._discard(entry)
+                self._condition.notify()
+
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._connecting -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._connecting -= 1
+            self._counters['created'] += 1
+            self._in_use[id(connection)] = _PooledConnection(connection, self.clock())
+        return connection
+
+    def release(self, connection, discard=False):
+        """
+        Return a checked-out connection to the pool.
+
+        Args:
+            connection: Connection previously returned by `acquire`.
+            discard: Close the connection instead of keeping it idle.
+        """
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                entry = _PooledConnection(connection, self.clock())
+            entry.released_at = self.clock()
+            if discard or self._is_expired(entry):
+                self._discard(entry)
+            else:
+                self._idle.append(entry)
+            self._condition.notify()
+
+    def close_all(self):
+        """
+        Close every idle connection. Checked-out connections are not affected.
+        """
+        with self._condition:
+            while self._idle:
+                self._discard(self._idle.pop())
+
+    def stats(self):
+        """
+        Snapshot of the pool gauges and counters.
+        """
+        with self._condition:
+            return {
+                'max_size': self.max_size,
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use) + self._connecting,
+                'wait_time_seconds': round(self._wait_time, 6),
+                **self._counters,
+            }
+
+    def _checkout(self, deadline):
+        """
+        Check out an idle connection, or reserve a slot for a new one.
+
+        Returns:
+            The checked-out idle entry, or None when the caller should connect.
+        """
+        waited = False
+        with self._condition:
+            while True:
+                while self._idle:
+                    entry = self._idle.pop()
+                    if self._is_expired(entry):
+                        self._counters['recycled'] += 1
+                        self._discard(entry)
+                        continue
+                    self._in_use[id(entry.connection)] = entry
+                    return entry
+
+                if self.size < self.max_size:
+                    # Reserve the slot before connecting so concurrent callers
+                    # cannot overshoot max_size while the lock is released.
+                    self._connecting += 1
+                    return None
+
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No database connection available within {self.timeout}s '
+                        f'(pool size {self.max_size}).'
+                    )
+                if not waited:
+                    waited = True
+                    self._counters['waits'] += 1
+                started = self.clock()
+                self._condition.wait(remaining)
+                self._wait_time += self.clock() - started
+
+    def _is_expired(self, entry):
+        return self.max_lifetime is not None and self.clock() - entry.created_at >= self.max_lifetime
+
+    def _is_healthy(self, entry):
+        if self.check is None or self.health_check_interval is None:
+            return True
+        if self.clock() - entry.released_at < self.health_check_interval:
+            return True
+        try:
+            self.check(entry.connection)
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, entry):
+        self._counters['closed'] += 1
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+
+def get_pool(alias, params=(), **options):
+    """
+    Return the process-wide pool for a database alias, creating it on first use.
+
+    Pools are keyed by PID as well, so a forked worker never reuses
+    connections inherited from its parent, and by the connection `params`,
+    so an alias pointed at another database (e.g. the test database) never
+    gets connections to the old one.
+    """
+    key = (alias, os.getpid(), tuple(params))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(**options)
+    return pool
+
+
+def close_pools(alias):
+    """
+    Close the idle connections of every pool the current process opened for `alias`.
+    """
+    pid = os.getpid()
+    for (pool_alias, owner, _), pool in list(_pools.items()):
+        if pool_alias == alias and owner == pid:
+            pool.close_all()
+
+
+def pool_stats():
+    """
+    Stats of every pool opened by the current process, keyed by alias.
+
+    An alias with pools for several connection params (e.g. before and
+    after the test database was set up) reports each under
+    `<alias>:<first param>`, usually the database name.
+    """
+    pid = os.getpid()
+    pools = [(alias, params, pool) for (alias, owner, params), pool in list(_pools.items()) if owner == pid]
+    aliases = [alias for alias, _, _ in pools]
+    return {
+        alias if aliases.count(alias) == 1 else f'{alias}:{params[0] if params else ""}': pool.stats()
+        for alias, params, pool in pools
+    }
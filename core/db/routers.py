@@ -0,0 +1,168 @@
+import itertools
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_pinned = ContextVar('replica_pinned', default=False)
+_wrote = ContextVar('replica_wrote', default=False)
+
+
+def is_pinned():
+    """
+    Whether reads in the current context must go to the primary.
+    """
+    return _pinned.get()
+
+
+def has_written():
+    """
+    Whether the current context routed a write to the primary.
+    """
+    return _wrote.get()
+
+
+@contextmanager
+def pin_to_primary(pinned=True):
+    """
+    Route every read inside the block to the primary and track writes made in it.
+    """
+    pinned_token = _pinned.set(pinned)
+    wrote_token = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _pinned.reset(pinned_token)
+        _wrote.reset(wrote_token)
+
+
+class RoundRobinSelector:
+    """
+    Cycle through the replicas in order.
+    """
+
+    def __init__(self, replicas):
+        self._cycle = itertools.cycle(replicas)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+class LeastLatencySelector:
+    """
+    Pick the replica with the lowest moving average query latency.
+
+    Latencies are fed by an execute wrapper installed on every replica
+    connection; replicas without samples yet are preferred so each one
+    gets measured. A replica without a sample for `probe_interval`
+    seconds counts as unmeasured again and its next sample replaces the
+    stale average, so one slow sample does not keep it out of rotation
+    forever.
+    """
+
+    def __init__(self, replicas, alpha=0.2, probe_interval=30.0, clock=time.monotonic):
+        self.replicas = list(replicas)
+        self.alpha = alpha
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.latencies = dict.fromkeys(self.replicas)
+        self.sampled_at = dict.fromkeys(self.replicas, 0.0)
+        _latency_selectors.add(self)
+
+    def choose(self):
+        now = self.clock()
+
+        def latency(alias):
+            if self.latencies[alias] is None or now - self.sampled_at[alias] >= self.probe_interval:
+                return 0.0
+            return self.latencies[alias]
+
+        return min(self.replicas, key=latency)
+
+    def record(self, alias, duration):
+        now = self.clock()
+        previous = self.latencies[alias]
+        if previous is None or now - self.sampled_at[alias] >= self.probe_interval:
+            self.latencies[alias] = duration
+        else:
+            self.latencies[alias] = previous + self.alpha * (duration - previous)
+        self.sampled_at[alias] = now
+
+    def install_wrapper(self, connection):
+        if connection.alias not in self.latencies:
+            return
+
+        def timed_execute(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.record(connection.alias, time.perf_counter() - started)
+
+        connection.execute_wrappers.append(timed_execute)
+
+
+# Selectors come and go with their routers (e.g. in tests), so they are
+# tracked weakly behind a single `connection_created` receiver.
+_latency_selectors = weakref.WeakSet()
+
+
+def _install_latency_wrappers(sender, connection, **kwargs):
+    for selector in list(_latency_selectors):
+        selector.install_wrapper(connection)
+
+
+connection_created.connect(_install_latency_wrappers, dispatch_uid='least-latency-selector')
+
+
+SELECTORS = {
+    'round_robin': RoundRobinSelector,
+    'least_latency': LeastLatencySelector,
+}
+
+
+class ReplicaRouter:
+    """
+    Database router sending reads to replicas and writes to the primary.
+
+    Reads fall back to the primary while the current context is pinned
+    (see `ReplicaPinningMiddleware`) or inside an atomic block on the
+    primary, so a request always sees its own writes.
+    """
+
+    def __init__(self, primary='default', replicas=None, selection=None):
+        self.primary = primary
+        self.replicas = list(settings.DATABASE_REPLICAS if replicas is None else replicas)
+        selection = selection or settings.REPLICA_SELECTION
+        self.selector = SELECTORS[selection](self.replicas) if self.replicas else None
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or is_pinned() or self.in_transaction():
+            return self.primary
+        return self.selector.choose()
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        _pinned.set(True)
+        return self.primary
+
+    def in_transaction(self):
+        # Atomic blocks opened by TestCase only isolate tests; like Django's
+        # own on_commit handling, don't treat them as application transactions.
+        return any(
+            not getattr(block, '_from_testcase', False)
+            for block in connections[self.primary].atomic_blocks
+        )
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {self.primary, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
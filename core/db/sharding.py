@@ -0,0 +1,340 @@
+import bisect
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.models import UserShard
+
+DIRECTORY_DATABASE = 'default'
+
+SHARDED_MODELS = {
+    'account.accountbudget',
+    'account.budgethistory',
+    'category.category',
+    'category.categorylimit',
+    'category.categorylimitevent',
+    'category.categoryspend',
+    'category.categorytoken',
+    'category.expense',
+}
+
+_current_shard = ContextVar('current_shard', default=(None, None))
+
+
+class HashRing:
+    """
+    Consistent-hash ring placing keys on nodes.
+
+    Each node is hashed onto the ring `vnodes` times, so adding or removing
+    a node only moves roughly 1/N of the keys.
+    """
+
+    def __init__(self, nodes, vnodes=128):
+        if not nodes:
+            raise ValueError('A hash ring needs at least one node.')
+        self.nodes = list(nodes)
+        points = sorted(
+            (self._hash(f'{node}#{replica}'), node)
+            for node in self.nodes
+            for replica in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(value):
+        return int.from_bytes(hashlib.md5(str(value).encode()).digest()[:8], 'big')
+
+    def node_for(self, key):
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+@lru_cache(maxsize=8)
+def _ring(nodes):
+    return HashRing(nodes)
+
+
+def sharding_enabled():
+    return bool(settings.SHARD_DATABASES)
+
+
+def get_ring():
+    return _ring(tuple(settings.SHARD_DATABASES))
+
+
+def shard_for_user(user_id):
+    """
+    Alias of the shard owning a user's data.
+
+    The directory on the default database is authoritative; users without an
+    entry yet are placed by the hash ring.
+    """
+    current_user_id, current_alias = _current_shard.get()
+    if current_user_id == user_id and current_alias is not None:
+        return current_alias
+
+    alias = (
+        UserShard.objects.using(DIRECTORY_DATABASE)
+        .filter(user_id=user_id)
+        .values_list('alias', flat=True)
+        .first()
+    )
+    return alias or get_ring().node_for(user_id)
+
+
+def current_shard():
+    return _current_shard.get()[1]
+
+
+def set_current_shard(user_id, alias):
+    """
+    Select the shard for the rest of the current context (e.g. the request).
+    """
+    _current_shard.set((user_id, alias))
+
+
+@contextmanager
+def use_shard(user_id, alias=None):
+    """
+    Route sharded models to a user's shard for the duration of the block.
+    """
+    if user_id is not None and alias is None:
+        alias = shard_for_user(user_id)
+    token = _current_shard.set((user_id, alias))
+    try:
+        yield alias
+    finally:
+        _current_shard.reset(token)
+
+
+def _copy_user(user, alias):
+    values = {
+        field.attname: getattr(user, field.attname)
+        for field in User._meta.concrete_fields
+    }
+    shard_users = User.objects.using(alias)
+    if not shard_users.filter(pk=user.pk).update(**values):
+        # bulk_create skips post_save, so the copy doesn't provision twice.
+        shard_users.bulk_create([User(**values)])
+
+
+def provision_user(user):
+    """
+    Assign a newly created user to a shard and copy the user row there.
+
+    Called from `create_account_budget` before the budget is written, so
+    the shard copy exists for the foreign keys of the user's rows.
+    """
+    if not sharding_enabled():
+        return None
+
+    alias = get_ring().node_for(user.pk)
+    UserShard.objects.using(DIRECTORY_DATABASE).get_or_create(
+        user_id=user.pk, defaults={'alias': alias}
+    )
+    _copy_user(user, alias)
+    return alias
+
+
+@receiver(post_save, sender=User)
+def sync_user_to_shard(instance, created, using, **kwargs):
+    """
+    Keep the shard copy of an existing user in sync with the directory row.
+    """
+    if created or using != DIRECTORY_DATABASE or not sharding_enabled():
+        return
+    _copy_user(instance, shard_for_user(instance.pk))
+
+
+class ShardRouter:
+    """
+    Route user-owned models to the shard of the user they belong to.
+
+    Instances carry their owner in `user_id`; plain querysets use the shard
+    selected for the current context, which `ShardedJWTAuthentication` sets
+    for the authenticated user. Other models fall through to the next router.
+    """
+
+    def _db_for_model(self, model, **hints):
+        if model._meta.label_lower not in SHARDED_MODELS:
+            return None
+        instance = hints.get('instance')
+        user_id = getattr(instance, 'user_id', None)
+        if user_id is not None:
+            return shard_for_user(user_id)
+        return current_shard()
+
+    db_for_read = _db_for_model
+    db_for_write = _db_for_model
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._state.db == obj2._state.db:
+            return True
+        # Users live in the directory and are copied to their shard.
+        if isinstance(obj1, User) or isinstance(obj2, User):
+            return True
+        return None
+
+
+def replicate_to_shards(model, instances):
+    """
+    Copy rows (with their primary keys) to every shard that lacks them.
+
+    Inserting explicit keys does not advance sequences on every backend
+    (PostgreSQL), so each shard's sequence is reset past them afterwards,
+    as `loaddata` does.
+    """
+    for alias in settings.SHARD_DATABASES:
+        existing = set(
+            model.objects.using(alias)
+            .filter(pk__in=[instance.pk for instance in instances])
+            .values_list('pk', flat=True)
+        )
+        missing = [instance for instance in instances if instance.pk not in existing]
+        if not missing:
+            continue
+        connection = connections[alias]
+        with transaction.atomic(using=alias):
+            model.objects.using(alias).bulk_create(missing)
+            statements = connection.ops.sequence_reset_sql(no_style(), [model])
+            if statements:
+                with connection.cursor() as cursor:
+                    for sql in statements:
+                        cursor.execute(sql)
+
+
+def move_user(user_id, target, batch_size=1000):
+    """
+    Move every sharded row of a user to the `target` shard.
+
+    The user is flagged as migrating while rows are copied, so their
+    requests get a 503 instead of writing to the old shard. Rows get new
+    primary keys on the target to avoid clashing with its own sequences;
+    foreign keys between them are remapped, and the change feed gets a
+    tombstone for every old id and a create for every new one. The
+    directory entry points to the target only once the source rows are
+    gone; if deleting them fails, the copies on the target are removed
+    instead.
+    """
+    from account.models import AccountBudget, BudgetHistory
+    from category.models import (
+        Category, CategoryLimit, CategoryLimitEvent, CategorySpend, CategoryToken, Expense
+    )
+
+    entry = UserShard.objects.using(DIRECTORY_DATABASE).get(user_id=user_id)
+    source = entry.alias
+    if source == target:
+        return 0
+
+    UserShard.objects.using(DIRECTORY_DATABASE).filter(pk=user_id).update(migrating=True)
+    try:
+        user = User.objects.using(DIRECTORY_DATABASE).get(pk=user_id)
+        _copy_user(user, target)
+
+        with transaction.atomic(using=target):
+            # bulk_create skips the change feed signals; the moved ids are recorded below.
+            categories = {}
+            queryset = Category.objects.using(source).filter(user_id=user_id).order_by('pk')
+            for batch in _batches(queryset, batch_size):
+                old_pks = [category.pk for category in batch]
+                for category in batch:
+                    category.pk = None
+                created = Category.objects.using(target).bulk_create(batch)
+                categories.update(zip(old_pks, (category.pk for category in created)))
+
+            budget = AccountBudget.objects.using(source).get(user_id=user_id)
+            old_budget_pk = budget.pk
+            budget.pk = None
+            AccountBudget.objects.using(target).filter(user_id=user_id).delete()
+            AccountBudget.objects.using(target).bulk_create([budget])
+            budgets = {old_budget_pk: budget.pk}
+
+            expenses = {}
+            queryset = Expense.objects.using(source).filter(user_id=user_id).order_by('pk')
+            for batch in _batches(queryset, batch_size):
+                old_pks = [expense.pk for expense in batch]
+                for expense in batch:
+                    expense.pk = None
+                    expense.category_id = categories.get(expense.category_id, expense.category_id)
+                created = Expense.objects.using(target).bulk_create(batch)
+                expenses.update(zip(old_pks, (expense.pk for expense in created)))
+
+            queryset = BudgetHistory.objects.using(source).filter(user_id=user_id).order_by('pk')
+            for batch in _batches(queryset, batch_size):
+                for history in batch:
+                    history.pk = None
+                    history.expense_id = expenses.get(history.expense_id)
+                    history.category_id = categories.get(history.category_id, history.category_id)
+                BudgetHistory.objects.using(target).bulk_create(batch)
+
+            for model in (CategoryLimit, CategorySpend, CategoryLimitEvent, CategoryToken):
+                rows = list(model.objects.using(source).filter(user_id=user_id))
+                for row in rows:
+                    row.pk = None
+                    row.category_id = categories.get(row.category_id, row.category_id)
+                model.objects.using(target).bulk_create(rows)
+
+        try:
+            _delete_user_rows(user_id, source)
+        except Exception:
+            # Leave the user whole on the source; a retry copies them again.
+            _delete_user_rows(user_id, target)
+            raise
+        UserShard.objects.using(DIRECTORY_DATABASE).filter(pk=user_id).update(alias=target)
+        _record_move(user_id, {Category: categories, Expense: expenses, AccountBudget: budgets})
+        return len(expenses)
+    finally:
+        UserShard.objects.using(DIRECTORY_DATABASE).filter(pk=user_id).update(migrating=False)
+
+
+def _record_move(user_id, moved):
+    """
+    Tell delta-sync clients about rows that changed id: tombstones for the
+    old ids first, so an old id reused by the target reads as created.
+    """
+    from core.changes import record_changes
+    from core.models import Change
+
+    for action, side in ((Change.DELETE, 0), (Change.CREATE, 1)):
+        for model, pks in moved.items():
+            record_changes(model, [model(pk=pair[side], user_id=user_id) for pair in pks.items()], action)
+
+
+def _delete_user_rows(user_id, alias):
+    """
+    Delete a user's sharded rows from one database, and the `User` copy
+    unless it is the directory row itself.
+    """
+    from account.models import AccountBudget, BudgetHistory
+    from category.models import (
+        Category, CategoryLimit, CategoryLimitEvent, CategorySpend, CategoryToken, Expense
+    )
+
+    with transaction.atomic(using=alias):
+        for model in (
+            BudgetHistory, CategoryLimitEvent, CategorySpend, CategoryLimit, CategoryToken, Expense, Category,
+            AccountBudget,
+        ):
+            model.objects.using(alias).filter(user_id=user_id)._raw_delete(alias)
+        if alias != DIRECTORY_DATABASE:
+            User.objects.using(alias).filter(pk=user_id)._raw_delete(alias)
+
+
+def _batches(queryset, batch_size):
+    batch = []
+    for instance in queryset.iterator(batch_size):
+        batch.append(instance)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,68 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django import forms
+from django.core import exceptions
+from django.db import models
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Money amount stored as an integer number of minor units (cents).
+
+    Python code and serializers keep working with `Decimal` values; only the
+    column holds integers, so SUM/AVG run as integer arithmetic and SQLite no
+    longer stores amounts as floating point. Expressions mixing a MoneyField
+    with a plain `Decimal` must wrap it as `Value(amount, output_field=MoneyField())`
+    so it is converted to cents too.
+    """
+    description = 'Money amount stored in minor units'
+
+    def __init__(self, *args, decimal_places=2, **kwargs):
+        self.decimal_places = decimal_places
+        self.quantum = Decimal(1).scaleb(-decimal_places)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.decimal_places != 2:
+            kwargs['decimal_places'] = self.decimal_places
+        return name, path, args, kwargs
+
+    def to_minor_units(self, value):
+        return int(self.to_python(value).scaleb(self.decimal_places))
+
+    def from_minor_units(self, value):
+        # Averages come back as floats of minor units.
+        value = Decimal(str(value)) if isinstance(value, float) else Decimal(value)
+        return value.scaleb(-self.decimal_places).quantize(self.quantum, rounding=ROUND_HALF_UP)
+
+    def to_python(self, value):
+        if value is None:
+            return value
+        try:
+            if isinstance(value, float):
+                value = str(value)
+            return Decimal(value).quantize(self.quantum, rounding=ROUND_HALF_UP)
+        except (InvalidOperation, TypeError, ValueError):
+            raise exceptions.ValidationError(
+                self.error_messages['invalid'],
+                code='invalid',
+                params={'value': value},
+            )
+
+    def get_prep_value(self, value):
+        if value is None or hasattr(value, 'resolve_expression'):
+            return value
+        return self.to_minor_units(value)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.from_minor_units(value)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{
+            'form_class': forms.DecimalField,
+            'decimal_places': self.decimal_places,
+            **kwargs,
+        })
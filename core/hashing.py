@@ -0,0 +1,115 @@
+"""
+Password hashing on a bounded thread pool.
+
+PBKDF2 (and the other hashers) is deliberately slow, so a burst of logins
+can take every CPU and stall all other requests. Hashing and verification
+are instead run on `PASSWORD_HASHING_WORKERS` dedicated threads, which caps
+the cores they use: `hashlib` releases the GIL while hashing, so the
+threads run in parallel with request threads without needing processes.
+
+At most `PASSWORD_HASHING_QUEUE` further requests wait for a worker.
+Beyond that, requests are refused immediately with a 429; a request whose
+hash does not finish within `PASSWORD_HASHING_TIMEOUT` seconds gets a 503.
+With `PASSWORD_HASHING_WORKERS = 0` hashing runs inline, as Django does.
+
+Only the hashing runs on the pool. Database access, such as saving an
+upgraded hash, stays in the request thread.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from rest_framework.exceptions import APIException, Throttled
+
+RETRY_AFTER_SECONDS = 1
+
+
+class PasswordHashingBusy(Throttled):
+    default_detail = 'Too many sign-ins are in progress. Please retry shortly.'
+    default_code = 'password_hashing_busy'
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = 503
+    default_detail = 'Signing in is taking longer than usual. Please retry shortly.'
+    default_code = 'password_hashing_unavailable'
+
+
+class HashingPool:
+    """
+    Thread pool that refuses work instead of queueing it without bound.
+    """
+
+    def __init__(self, workers, max_queue, timeout):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+        self.timeout = timeout
+
+    def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHashingBusy(wait=RETRY_AFTER_SECONDS)
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        # A timed out hash keeps its slot until it really finishes.
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordHashingUnavailable()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    The process-wide hashing pool, or None when hashing runs inline.
+    """
+    global _pool
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    settings.PASSWORD_HASHING_WORKERS,
+                    settings.PASSWORD_HASHING_QUEUE,
+                    settings.PASSWORD_HASHING_TIMEOUT
+                )
+    return _pool
+
+
+def _run(func, *args):
+    pool = get_pool()
+    return func(*args) if pool is None else pool.run(func, *args)
+
+
+def _verify(password, encoded):
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    preferred = get_hasher('default')
+    must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    return hasher.verify(password, encoded), must_update
+
+
+def hash_password(password):
+    """
+    Hash `password` with the preferred hasher.
+    """
+    return _run(make_password, password)
+
+
+def verify_password(password, encoded):
+    """
+    Returns:
+        Tuple of (whether `password` matches `encoded`, whether `encoded`
+        should be rehashed with the preferred hasher).
+    """
+    return _run(_verify, password, encoded)
@@ -0,0 +1,236 @@
+"""
+Database-backed background jobs.
+
+Tasks are plain functions registered with `@task` in an app's `tasks.py`.
+`enqueue` writes a `Job` row in the caller's transaction, so a job exists
+if and only if the write that produced it committed. `run_workers` claims
+and runs jobs with at-least-once semantics: a job whose worker died is
+reclaimed once its lease expires, so tasks must be idempotent.
+"""
+import logging
+import random
+import socket
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import (
+    close_old_connections,
+    connections,
+    router,
+    transaction
+)
+from django.db.models import Q
+from django.db.utils import IntegrityError
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 3600
+VISIBILITY_TIMEOUT = timedelta(minutes=10)
+
+
+def task(name=None, max_attempts=5):
+    """
+    Register a function as a job task.
+
+    Args:
+        name: Task name stored on jobs; defaults to `<module>.<function>`.
+        max_attempts: Attempts before a failing job is marked as failed.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        func.task_name = task_name
+        func.max_attempts = max_attempts
+        _registry[task_name] = func
+        return func
+    return decorator
+
+
+def autodiscover():
+    """
+    Import the `tasks` module of every installed app to register its tasks.
+    """
+    autodiscover_modules('tasks')
+
+
+def enqueue(task_name, payload=None, idempotency_key=None, run_after=None):
+    """
+    Queue a job in the current transaction.
+
+    Args:
+        task_name: Name of a registered task.
+        payload: JSON-serializable keyword arguments for the task.
+        idempotency_key: Enqueueing the same key again returns the existing job.
+        run_after: Earliest time the job may run.
+
+    Returns:
+        The Job instance.
+    """
+    func = _registry.get(task_name)
+    fields = {
+        'task': task_name,
+        'payload': payload or {},
+        'max_attempts': func.max_attempts if func else 5,
+        'run_after': run_after or timezone.now(),
+    }
+    if idempotency_key is None:
+        return Job.objects.create(**fields)
+
+    try:
+        with transaction.atomic(using=router.db_for_write(Job)):
+            return Job.objects.create(idempotency_key=idempotency_key, **fields)
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=idempotency_key)
+
+
+def backoff(attempts):
+    """
+    Seconds to wait before retrying after `attempts` failed attempts.
+    """
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _ready(now):
+    return (
+        Q(status=Job.QUEUED, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=now - VISIBILITY_TIMEOUT)
+    )
+
+
+def claim(worker_id, limit=10):
+    """
+    Lease up to `limit` runnable jobs to a worker.
+
+    Uses `SELECT ... FOR UPDATE SKIP LOCKED` where supported (PostgreSQL),
+    so concurrent workers never block on or double-claim a row. Elsewhere
+    (SQLite) each candidate is claimed with a conditional UPDATE that only
+    succeeds for the first worker to see it as runnable.
+    """
+    now = timezone.now()
+    using = router.db_for_write(Job)
+    lease = {
+        'status': Job.RUNNING,
+        'locked_by': worker_id,
+        'locked_at': now,
+    }
+    ordering = ('run_after', 'pk')
+
+    if connections[using].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=using):
+            jobs = list(
+                Job.objects.using(using)
+                .select_for_update(skip_locked=True)
+                .filter(_ready(now))
+                .order_by(*ordering)[:limit]
+            )
+            for job in jobs:
+                for field, value in lease.items():
+                    setattr(job, field, value)
+                job.attempts += 1
+            Job.objects.using(using).bulk_update(jobs, [*lease, 'attempts'])
+        return jobs
+
+    candidates = Job.objects.using(using).filter(_ready(now)).order_by(*ordering)
+    claimed = []
+    for job in candidates[:limit]:
+        updated = Job.objects.using(using).filter(
+            _ready(now), pk=job.pk, status=job.status, locked_at=job.locked_at
+        ).update(attempts=job.attempts + 1, **lease)
+        if updated:
+            job.attempts += 1
+            for field, value in lease.items():
+                setattr(job, field, value)
+            claimed.append(job)
+    return claimed
+
+
+def run(job):
+    """
+    Run a claimed job and record its outcome.
+
+    Returns:
+        True if the task succeeded.
+    """
+    owned = Job.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    func = _registry.get(job.task)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {job.task!r}.')
+        func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Job %s (%s) failed on attempt %s.', job.pk, job.task, job.attempts)
+        if job.attempts >= job.max_attempts:
+            owned.update(status=Job.FAILED, last_error=error, finished_at=timezone.now())
+        else:
+            owned.update(
+                status=Job.QUEUED,
+                last_error=error,
+                locked_by='',
+                locked_at=None,
+                run_after=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+            )
+        return False
+
+    owned.update(status=Job.DONE, finished_at=timezone.now(), last_error='')
+    return True
+
+
+class Worker:
+    """
+    Claim and run jobs until stopped.
+
+    Args:
+        batch_size: Jobs leased per claim.
+        poll_interval: Seconds to sleep when the queue is empty.
+    """
+
+    def __init__(self, batch_size=10, poll_interval=1.0, name=None):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.name = name or f'{socket.gethostname()}:{uuid.uuid4().hex[:8]}'
+        self.stopped = threading.Event()
+        self.processed = 0
+
+    def run_once(self):
+        """
+        Run every currently runnable job, then return how many ran.
+        """
+        count = 0
+        while not self.stopped.is_set():
+            close_old_connections()
+            jobs = claim(self.name, limit=self.batch_size)
+            if not jobs:
+                break
+            for job in jobs:
+                run(job)
+                count += 1
+        self.processed += count
+        return count
+
+    def run_forever(self):
+        """
+        Poll for jobs until stopped. An error while polling (e.g. the
+        database being briefly unavailable) is logged and retried after
+        `poll_interval` instead of ending the worker.
+        """
+        while not self.stopped.is_set():
+            try:
+                ran = self.run_once()
+            except Exception:
+                logger.exception('Worker %s failed to poll for jobs.', self.name)
+                ran = 0
+            if not ran:
+                self.stopped.wait(self.poll_interval)
+
+    def stop(self):
+        self.stopped.set()
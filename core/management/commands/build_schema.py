@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.schema import build_schema
+
+
+class Command(BaseCommand):
+    help = 'Render the OpenAPI schema to SCHEMA_DIR so it is served without being generated.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Output directory (default: SCHEMA_DIR).')
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.SCHEMA_DIR
+        version = build_schema(directory)
+        self.stdout.write(self.style.SUCCESS(f'Wrote schema version {version} to {directory}.'))
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = 'Remove change feed entries superseded by a newer change of the same object.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days', type=int, default=0,
+            help='Only compact changes older than this many days.'
+        )
+        parser.add_argument(
+            '--tombstone-days', type=int, default=None,
+            help='Also drop delete tombstones older than this many days.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        tombstone_days = options['tombstone_days']
+        deleted = compact_changes(
+            before=now - timedelta(days=options['older_than_days']),
+            tombstones_before=now - timedelta(days=tombstone_days) if tombstone_days is not None else None,
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Removed {deleted} change feed entries.'))
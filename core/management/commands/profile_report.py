@@ -0,0 +1,44 @@
+import io
+import pstats
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.profiling import list_captures, parse_capture_name
+
+
+class Command(BaseCommand):
+    help = 'Aggregate the request profiles written by ProfilingMiddleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Capture directory (default: PROFILING_DIR).')
+        parser.add_argument('--url-name', default=None, help='Only include captures of this URL name.')
+        parser.add_argument('--limit', type=int, default=25, help='Number of functions to list.')
+        parser.add_argument(
+            '--sort', default='cumulative', choices=('cumulative', 'tottime', 'ncalls'),
+            help='Column to order the functions by.'
+        )
+
+    def handle(self, *args, **options):
+        captures = [
+            (path, parse_capture_name(path.name))
+            for path in list_captures(options['dir'] or settings.PROFILING_DIR)
+        ]
+        if options['url_name']:
+            captures = [(path, info) for path, info in captures if info['url_name'] == options['url_name']]
+        if not captures:
+            self.stdout.write('No captures found.')
+            return
+
+        durations = [info['duration_ms'] for _, info in captures]
+        queries = [info['queries'] for _, info in captures]
+        self.stdout.write(
+            f'{len(captures)} captures, median {statistics.median(durations):g} ms '
+            f'and {statistics.median(queries):g} queries per request.'
+        )
+
+        output = io.StringIO()
+        stats = pstats.Stats(*(str(path) for path, _ in captures), stream=output)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+        self.stdout.write(output.getvalue())
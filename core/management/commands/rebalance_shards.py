@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.db.sharding import (
+    DIRECTORY_DATABASE,
+    get_ring,
+    move_user
+)
+from core.models import UserShard
+
+
+class Command(BaseCommand):
+    help = (
+        'Move users whose data is not on the shard the hash ring assigns them to. '
+        'Users are moved one at a time; only the user being moved is briefly refused.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report the planned moves.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows copied per batch.')
+
+    def handle(self, *args, **options):
+        if not settings.SHARD_DATABASES:
+            raise CommandError('Sharding is not enabled (SHARD_DATABASES is empty).')
+
+        ring = get_ring()
+
+        # Users created before sharding was enabled still live on `default`.
+        unassigned = User.objects.using(DIRECTORY_DATABASE).filter(shard__isnull=True).values_list('pk', flat=True)
+        UserShard.objects.using(DIRECTORY_DATABASE).bulk_create(
+            [UserShard(user_id=user_id, alias=DIRECTORY_DATABASE) for user_id in unassigned]
+        )
+
+        entries = UserShard.objects.using(DIRECTORY_DATABASE).order_by('user_id').values_list('user_id', 'alias')
+        moves = [
+            (user_id, alias, ring.node_for(user_id))
+            for user_id, alias in entries.iterator()
+            if ring.node_for(user_id) != alias
+        ]
+        if not moves:
+            self.stdout.write(self.style.SUCCESS('All users are on their assigned shard.'))
+            return
+
+        for index, (user_id, source, target) in enumerate(moves, start=1):
+            if options['dry_run']:
+                self.stdout.write(f'Would move user {user_id}: {source} -> {target}')
+                continue
+            expenses = move_user(user_id, target, batch_size=options['batch_size'])
+            self.stdout.write(
+                f'[{index}/{len(moves)}] Moved user {user_id}: {source} -> {target} ({expenses} expenses)'
+            )
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Moved {len(moves)} users.'))
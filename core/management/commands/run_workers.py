@@ -0,0 +1,63 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.jobs import (
+    Worker,
+    autodiscover
+)
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Number of worker threads.')
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per query.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when idle.')
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once no runnable jobs are left instead of polling forever.'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover()
+        workers = [
+            Worker(batch_size=options['batch_size'], poll_interval=options['poll_interval'])
+            for _ in range(options['concurrency'])
+        ]
+        burst = options['burst']
+        crashed = []
+
+        def work(worker):
+            try:
+                worker.run_once() if burst else worker.run_forever()
+            except Exception as e:
+                crashed.append(worker.name)
+                self.stderr.write(f'Worker {worker.name} crashed: {e!r}')
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=work, args=(worker,), name=worker.name) for worker in workers]
+
+        def shutdown(signum, frame):
+            self.stdout.write(self.style.WARNING('Stopping workers after their current job...'))
+            for worker in workers:
+                worker.stop()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, shutdown)
+            signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(f'Started {len(workers)} worker(s).')
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        processed = sum(worker.processed for worker in workers)
+        if crashed:
+            raise CommandError(f'{len(crashed)} worker(s) crashed after running {processed} job(s).')
+        self.stdout.write(self.style.SUCCESS(f'Workers stopped after running {processed} job(s).'))
@@ -0,0 +1,156 @@
+import cProfile
+import hashlib
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.db.routers import (
+    has_written,
+    pin_to_primary
+)
+from core.db.sharding import use_shard
+from core.profiling import save_capture
+
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Provide read-your-writes consistency on top of `ReplicaRouter`.
+
+    Once a client writes, its reads go to the primary for the rest of the
+    request and for `REPLICA_PIN_SECONDS` afterwards, giving replicas time
+    to catch up. Clients are identified by their Authorization header, then
+    session cookie, then IP address, so the pin also works before DRF has
+    authenticated the JWT user. The pin is stored in the default cache,
+    which must be shared between workers in production.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+
+    def __call__(self, request):
+        key = self.get_client_key(request)
+        pinned = request.method in UNSAFE_METHODS or cache.get(key) is not None
+
+        with pin_to_primary(pinned):
+            response = self.get_response(request)
+            if has_written():
+                cache.set(key, 1, timeout=self.pin_seconds)
+        return response
+
+    def get_client_key(self, request):
+        identity = (
+            request.META.get('HTTP_AUTHORIZATION')
+            or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+            or request.META.get('REMOTE_ADDR', '')
+        )
+        return 'replica-pin:' + hashlib.sha256(identity.encode()).hexdigest()
+
+
+class ShardContextMiddleware:
+    """
+    Reset the shard selected by `ShardedJWTAuthentication` after each request,
+    so a reused worker thread never routes to the previous user's shard.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SHARD_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with use_shard(None):
+            return self.get_response(request)
+
+
+def is_staff_request(request):
+    """
+    Whether the request is made by a staff user, signed in with a session
+    or sending a valid JWT access token.
+    """
+    if getattr(getattr(request, 'user', None), 'is_staff', False):
+        return True
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return False
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except InvalidToken:
+        return False
+    return get_user_model().objects.filter(
+        **{jwt_settings.USER_ID_FIELD: token.get(jwt_settings.USER_ID_CLAIM)},
+        is_active=True,
+        is_staff=True
+    ).exists()
+
+
+class ProfilingMiddleware:
+    """
+    Run selected requests under `cProfile` and save the result with
+    `core.profiling.save_capture`.
+
+    A request is profiled when it is sampled (`PROFILING_SAMPLE_RATE`) or
+    a staff user asks for it with the `X-Profile: 1` header. JWT users are
+    only authenticated inside the view, so the header's token is checked
+    here first; other users cannot make their requests slower. Only enable
+    this where the overhead of profiling is acceptable.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.directory = settings.PROFILING_DIR
+        self.max_files = settings.PROFILING_MAX_FILES
+
+    def __call__(self, request):
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        requested = request.META.get('HTTP_X_PROFILE') == '1' and is_staff_request(request)
+        if not (sampled or requested):
+            return self.get_response(request)
+
+        queries = 0
+
+        def count_queries(execute, *args):
+            nonlocal queries
+            queries += 1
+            return execute(*args)
+
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_queries))
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        save_capture(
+            profiler,
+            self.directory,
+            match.view_name if match else None,
+            queries,
+            duration,
+            self.max_files
+        )
+        return response
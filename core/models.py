@@ -0,0 +1,141 @@
+from django.db import models
+from django.db.models import F
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.versioning import VersionConflict
+
+
+class VersionedModel(models.Model):
+    """
+    Abstract model with a `version` incremented by every save, for
+    optimistic concurrency control (see `core.versioning`).
+
+    Saves increment the column in SQL (`version = version + 1`), so
+    concurrent writers never produce the same version. Setting
+    `expected_version` before a save adds `WHERE version = <expected>` to
+    its UPDATE and raises `VersionConflict` if no row matched. Set-based
+    updates of these models must increment `version` themselves.
+    """
+    version = models.PositiveIntegerField(default=1)
+
+    # Version the next save requires the row to have; None saves unconditionally.
+    expected_version = None
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        adding, expected = self._state.adding, self.expected_version
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self.expected_version = None
+        if not adding:
+            # Exact for conditional saves; otherwise a concurrent writer may
+            # be ahead, which only makes this ETag stale.
+            self.version = (self.version if expected is None else expected) + 1
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not version]
+        values.append((version, None, F('version') + 1))
+        if self.expected_version is not None:
+            base_qs = base_qs.filter(version=self.expected_version)
+        updated = super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+        if not updated and self.expected_version is not None:
+            raise VersionConflict()
+        return updated
+
+
+class UserShard(models.Model):
+    """
+    Directory entry mapping a user to the database holding their data.
+
+    Lives on the `default` database next to `User`; `migrating` is set while
+    `rebalance_shards` moves the user so their requests are briefly refused.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='shard'
+    )
+    alias = models.CharField(max_length=100)
+    migrating = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.alias}'
+
+
+class Job(models.Model):
+    """
+    Unit of deferred work stored in the database and run by `run_workers`.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='core_job_ready_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk} ({self.status})'
+
+
+class Change(models.Model):
+    """
+    Outbox entry recording a write to a synced model.
+
+    The primary key doubles as the change sequence clients use as cursor.
+    `user` is empty for changes visible to everyone (predefined categories).
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTIONS = [
+        (CREATE, 'Create'),
+        (UPDATE, 'Update'),
+        (DELETE, 'Delete'),
+    ]
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='changes'
+    )
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='core_change_user_seq_idx'),
+            models.Index(fields=['model', 'object_id'], name='core_change_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.pk} {self.action} {self.model} {self.object_id}'
@@ -0,0 +1,75 @@
+"""
+Request profile captures.
+
+`ProfilingMiddleware` writes one `.prof` file (a `cProfile` dump readable by
+`pstats`) per profiled request. The file name carries what is needed to pick
+captures without loading them:
+
+    <epoch_us>-<url_name>-<queries>q-<duration_ms>ms.prof
+
+The directory keeps the newest `PROFILING_MAX_FILES` captures; older ones
+are removed when a new one is written.
+"""
+import os
+import re
+import time
+from pathlib import Path
+
+CAPTURE_PATTERN = re.compile(r'^(?P<timestamp>\d+)-(?P<url_name>.+)-(?P<queries>\d+)q-(?P<duration>\d+)ms\.prof$')
+
+
+def capture_name(url_name, queries, duration):
+    url_name = re.sub(r'[^\w.-]', '.', url_name or 'unresolved')
+    return f'{time.time_ns() // 1000}-{url_name}-{queries}q-{int(duration * 1000)}ms.prof'
+
+
+def parse_capture_name(name):
+    """
+    Returns:
+        Dict with `url_name`, `queries` and `duration_ms`, or None if `name`
+        is not a capture file.
+    """
+    match = CAPTURE_PATTERN.match(name)
+    if match is None:
+        return None
+    return {
+        'url_name': match['url_name'],
+        'queries': int(match['queries']),
+        'duration_ms': int(match['duration']),
+    }
+
+
+def list_captures(directory):
+    """
+    Capture files in `directory`, oldest first.
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        (path for path in directory.iterdir() if parse_capture_name(path.name)),
+        key=lambda path: path.name
+    )
+
+
+def save_capture(profiler, directory, url_name, queries, duration, max_files):
+    """
+    Dump `profiler` into `directory` and drop the oldest captures beyond
+    `max_files`.
+
+    Returns:
+        Path of the written file.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / capture_name(url_name, queries, duration)
+    profiler.dump_stats(path)
+
+    captures = list_captures(directory)
+    for old in captures[:max(len(captures) - max_files, 0)]:
+        try:
+            os.remove(old)
+        except FileNotFoundError:
+            # Another worker rotated it first.
+            pass
+    return path
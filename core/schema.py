@@ -0,0 +1,163 @@
+"""
+Precomputed OpenAPI schema.
+
+Generating the schema introspects every view and serializer, which takes
+hundreds of milliseconds. `manage.py build_schema` renders it once at
+deploy time into `SCHEMA_DIR`; `SchemaView` serves those files, or, when
+they are missing, a schema generated on first use and kept for the life
+of the process (so it changes only on deploy).
+
+Every build has a `version`, a hash of the schema. Responses carry it in
+their ETag, and the docs pages request `/schema/?v=<version>`, which is
+cached as immutable since a new build changes the URL.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from drf_spectacular.plumbing import set_query_parameters
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+
+SCHEMA_RENDERERS = {
+    'yaml': OpenApiYamlRenderer,
+    'json': OpenApiJsonRenderer,
+}
+SCHEMA_FILE_NAME = 'openapi.{format}'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+
+
+@dataclass(frozen=True)
+class SchemaDocument:
+    content: bytes
+    version: str
+
+
+_documents = {}
+_lock = threading.Lock()
+
+
+def schema_version(json_content):
+    return hashlib.sha256(json_content).hexdigest()[:16]
+
+
+def generate_schema():
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    return generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+
+
+def render_schema(schema):
+    """
+    Returns:
+        Dict of rendered content (bytes) by format.
+    """
+    return {name: renderer().render(schema, renderer_context={}) for name, renderer in SCHEMA_RENDERERS.items()}
+
+
+def build_schema(directory):
+    """
+    Generate the schema and write it to `directory` in every format.
+
+    Returns:
+        The schema version.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rendered = render_schema(generate_schema())
+    for name, content in rendered.items():
+        (directory / SCHEMA_FILE_NAME.format(format=name)).write_bytes(content)
+    return schema_version(rendered['json'])
+
+
+def _schema_paths(directory):
+    return {name: Path(directory) / SCHEMA_FILE_NAME.format(format=name) for name in SCHEMA_RENDERERS}
+
+
+def schema_is_built(directory=None):
+    return all(path.is_file() for path in _schema_paths(directory or settings.SCHEMA_DIR).values())
+
+
+def _load_documents(directory):
+    if schema_is_built(directory):
+        rendered = {name: path.read_bytes() for name, path in _schema_paths(directory).items()}
+    else:
+        rendered = render_schema(generate_schema())
+    version = schema_version(rendered['json'])
+    return {name: SchemaDocument(content, version) for name, content in rendered.items()}
+
+
+def get_schema_document(format):
+    """
+    The schema rendered in `format` (`yaml` or `json`), read or generated
+    once per process.
+    """
+    directory = settings.SCHEMA_DIR
+    documents = _documents.get(directory)
+    if documents is None:
+        with _lock:
+            documents = _documents.get(directory)
+            if documents is None:
+                documents = _documents[directory] = _load_documents(directory)
+    return documents[format]
+
+
+def clear_schema_cache():
+    _documents.clear()
+
+
+class SchemaView(SpectacularAPIView):
+    """
+    `SpectacularAPIView` serving the prebuilt or memoized schema with an
+    ETag. Requests for another language or API version are still generated
+    on demand.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('lang') or request.GET.get('version') or self.custom_settings:
+            return super().get(request, *args, **kwargs)
+
+        renderer = request.accepted_renderer
+        document = get_schema_document(renderer.format)
+        etag = f'"{document.version}-{renderer.format}"'
+        if request.GET.get('v') == document.version:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            cache_control = REVALIDATE_CACHE_CONTROL
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(document.content, content_type=renderer.media_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
+
+
+class VersionedSchemaUrlMixin:
+    """
+    Point the docs page at `/schema/?v=<version>` so browsers may cache the
+    schema until the next build.
+    """
+
+    def _get_schema_url(self, request):
+        url = super()._get_schema_url(request)
+        if request.GET.get('lang') or request.GET.get('version'):
+            return url
+        return set_query_parameters(url, v=get_schema_document('json').version)
+
+
+class SchemaSwaggerView(VersionedSchemaUrlMixin, SpectacularSwaggerView):
+    pass
+
+
+class SchemaRedocView(VersionedSchemaUrlMixin, SpectacularRedocView):
+    pass
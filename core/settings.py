@@ -2,6 +2,8 @@ from datetime import timedelta
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -54,8 +56,23 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
     'NON_FIELD_ERRORS_KEY': 'error',
+    'DEFAULT_THROTTLE_CLASSES': (
+        'core.throttling.UserSlidingWindowThrottle',
+        'core.throttling.IPSlidingWindowThrottle',
+    ),
+    # Cost units per window; views set `throttle_cost` (default 1).
+    'DEFAULT_THROTTLE_RATES': {
+        'user': os.getenv('DJANGO_THROTTLE_USER_RATE', '600/min'),
+        'ip': os.getenv('DJANGO_THROTTLE_IP_RATE', '1200/min'),
+    },
 }
 
+# Where the throttle counters live: `sqlite` (a file shared by the workers
+# of one host) or `memory` (per worker process, so each worker grants the
+# full rate; meant for tests and single-process runs).
+THROTTLE_STORE = os.getenv('DJANGO_THROTTLE_STORE', 'sqlite')
+THROTTLE_STORE_PATH = os.getenv('DJANGO_THROTTLE_STORE_PATH', os.path.join(BASE_DIR.parent, 'throttle.sqlite3'))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
@@ -105,6 +122,9 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
+    'core.middleware.ShardContextMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -143,10 +163,89 @@ DATABASES = {
         'USER': os.getenv('DJANGO_DB_USER', ''),
         'PASSWORD': os.getenv('DJANGO_DB_PASSWORD', ''),
         'HOST': os.getenv('DJANGO_DB_HOST', ''),
-        'PORT': os.getenv('DJANGO_DB_PORT', '')
+        'PORT': os.getenv('DJANGO_DB_PORT', ''),
+        'CONN_MAX_AGE': int(os.getenv('DJANGO_DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': os.getenv('DJANGO_DB_CONN_HEALTH_CHECKS', 'False') == 'True',
+        # Only read by the `core.db.backends.pooled_postgresql` engine.
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DJANGO_DB_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': float(os.getenv('DJANGO_DB_POOL_TIMEOUT', 5)),
+            'MAX_LIFETIME': float(os.getenv('DJANGO_DB_POOL_MAX_LIFETIME', 1800)),
+            'HEALTH_CHECK_INTERVAL': float(os.getenv('DJANGO_DB_POOL_HEALTH_CHECK_INTERVAL', 30)),
+        },
     }
 }
 
+# Read replicas: a comma-separated list of hosts sharing the primary's
+# name and credentials. Reads are routed to them by `ReplicaRouter`.
+DATABASE_REPLICAS = []
+for index, host in enumerate(filter(None, os.getenv('DJANGO_DB_REPLICA_HOSTS', '').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Optional user sharding: one database per comma-separated host, each
+# holding the user-owned tables of the users the hash ring assigns to it.
+# `default` keeps users and the shard directory.
+SHARD_DATABASES = []
+for index, host in enumerate(filter(None, os.getenv('DJANGO_DB_SHARD_HOSTS', '').split(','))):
+    alias = f'shard_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'HOST': host.strip()}
+    if DATABASES[alias]['ENGINE'] == 'django.db.backends.sqlite3':
+        DATABASES[alias]['NAME'] = f"{DATABASES['default']['NAME']}.{alias}"
+    SHARD_DATABASES.append(alias)
+
+DATABASE_ROUTERS = []
+if SHARD_DATABASES:
+    DATABASE_ROUTERS.append('core.db.sharding.ShardRouter')
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = (
+        'core.authentication.ShardedJWTAuthentication',
+    )
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS.append('core.db.routers.ReplicaRouter')
+
+# `round_robin` or `least_latency`.
+REPLICA_SELECTION = os.getenv('DJANGO_DB_REPLICA_SELECTION', 'round_robin')
+
+# Seconds a client keeps reading from the primary after a write.
+REPLICA_PIN_SECONDS = int(os.getenv('DJANGO_DB_REPLICA_PIN_SECONDS', 5))
+
+
+# Request profiling: when enabled, sampled requests and staff requests
+# sent with `X-Profile: 1` are run under cProfile. `manage.py profile_report`
+# summarizes the captures.
+PROFILING_ENABLED = os.getenv('DJANGO_PROFILING_ENABLED', 'False') == 'True'
+PROFILING_SAMPLE_RATE = float(os.getenv('DJANGO_PROFILING_SAMPLE_RATE', 0))
+PROFILING_DIR = os.getenv('DJANGO_PROFILING_DIR', os.path.join(BASE_DIR.parent, 'profiles'))
+PROFILING_MAX_FILES = int(os.getenv('DJANGO_PROFILING_MAX_FILES', 200))
+
+
+# Output of `manage.py build_schema`, served by `core.schema.SchemaView`.
+# Without it the schema is generated once per process.
+SCHEMA_DIR = os.getenv('DJANGO_SCHEMA_DIR', os.path.join(BASE_DIR.parent, 'schema'))
+
+
+# Prime URL resolvers, serializers, filtersets and JWT when `core.wsgi` or
+# `core.asgi` is loaded, then freeze the GC (see `core.warmup`).
+WARMUP_ENABLED = os.getenv('DJANGO_WARMUP_ENABLED', 'True') == 'True'
+
+
+# Seconds a change feed entry may stay uncommitted (or its shard write
+# unfinished) after it was inserted; the sync cursor never moves past
+# entries younger than this (see `core.changes.get_changes`).
+CHANGES_SAFETY_LAG = float(os.getenv('DJANGO_CHANGES_SAFETY_LAG', 30))
+
+
+# Per-process cache of the category suggestion indexes (see
+# `category.suggestions`). Writes in other processes show up once an entry
+# is older than the TTL (seconds).
+SUGGESTION_CACHE_TTL = float(os.getenv('DJANGO_SUGGESTION_CACHE_TTL', 60))
+SUGGESTION_CACHE_SIZE = int(os.getenv('DJANGO_SUGGESTION_CACHE_SIZE', 1000))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -167,6 +266,35 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# The first hasher is used for new hashes; older hashes are upgraded to it
+# on the next successful login. `DJANGO_PASSWORD_HASHER` picks another one
+# from the list (argon2 and bcrypt need their optional packages).
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+_preferred_hasher = os.getenv('DJANGO_PASSWORD_HASHER')
+if _preferred_hasher:
+    if _preferred_hasher not in PASSWORD_HASHERS:
+        raise ImproperlyConfigured(
+            f'DJANGO_PASSWORD_HASHER must be one of {", ".join(PASSWORD_HASHERS)}, not {_preferred_hasher!r}.'
+        )
+    PASSWORD_HASHERS.remove(_preferred_hasher)
+    PASSWORD_HASHERS.insert(0, _preferred_hasher)
+
+AUTHENTICATION_BACKENDS = ['core.authentication.PooledPasswordBackend']
+
+# Password hashing runs on this many dedicated threads (0 = inline in the
+# request thread); see `core.hashing`. Requests waiting for a hash hold a
+# server thread, so keep WORKERS + QUEUE below the server's thread count.
+PASSWORD_HASHING_WORKERS = int(os.getenv('DJANGO_PASSWORD_HASHING_WORKERS', 2))
+PASSWORD_HASHING_QUEUE = int(os.getenv('DJANGO_PASSWORD_HASHING_QUEUE', 2))
+PASSWORD_HASHING_TIMEOUT = float(os.getenv('DJANGO_PASSWORD_HASHING_TIMEOUT', 5))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
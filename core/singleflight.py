@@ -0,0 +1,101 @@
+"""
+Single-flight request coalescing.
+
+When identical requests arrive at the same time (one user opening the app
+on several devices), only the first computes the result; the others wait
+for it and share it instead of running the same queries again. Nothing is
+cached: once the computation finishes, the next request computes afresh.
+
+Coalescing works across the threads of one worker process.
+"""
+import threading
+
+from rest_framework.response import Response
+
+from core.db.routers import is_pinned
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs a function once per key for all callers that overlap in time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func):
+        """
+        Returns:
+            Tuple of (result of `func`, whether it was computed by another
+            caller). An exception raised by `func` is raised in every caller.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+
+_flights = SingleFlight()
+
+
+def request_key(request, namespace):
+    """
+    Key of a GET request: user, replica pin, URL and query parameters in a
+    fixed order. A request pinned to the primary (right after the user
+    wrote) never shares a response read from a lagging replica.
+    """
+    return (
+        namespace,
+        request.user.pk,
+        is_pinned(),
+        request.build_absolute_uri(request.path),
+        tuple(sorted((name, tuple(values)) for name, values in request.query_params.lists())),
+    )
+
+
+def coalesced_response(request, namespace, get_response):
+    """
+    Return `get_response()`, sharing one call among concurrent identical
+    requests. Callers that did not compute it get a new `Response` with the
+    same data and headers, since a response object can only be rendered
+    once.
+    """
+    def compute():
+        response = get_response()
+        # Copied before the leader renders the response and sets its content headers.
+        headers = {
+            name: value for name, value in response.items()
+            if name.lower() not in ('content-type', 'content-length')
+        }
+        return response, headers
+
+    (response, headers), shared = _flights.do(request_key(request, namespace), compute)
+    if shared:
+        return Response(response.data, status=response.status_code, headers=headers)
+    return response
@@ -0,0 +1,40 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connections
+
+
+def add_sqlite_database(alias):
+    """
+    Register an extra in-memory SQLite database so routing can be tested
+    against several real databases.
+    """
+    default = connections.settings['default']
+    config = {
+        **default,
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {**default['TEST'], 'NAME': None, 'MIRROR': None},
+    }
+    settings.DATABASES[alias] = config
+    connections.settings[alias] = config
+
+
+for alias in ('replica', 'shard_a', 'shard_b', 'shard_c'):
+    add_sqlite_database(alias)
+
+
+@pytest.fixture
+def api_request_factory():
+    """
+    Fixture to create an APIRequestFactory for testing.
+    """
+    return APIRequestFactory()
+
+@pytest.fixture
+def user(db):
+    """
+    Fixture to create a test user.
+    """
+    return User.objects.create_user(username="testuser", password="password123")
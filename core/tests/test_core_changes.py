@@ -0,0 +1,174 @@
+import pytest
+from decimal import Decimal
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import force_authenticate
+from category.models import Category, Expense
+from core.models import Change
+from core.views import ChangeFeedView
+
+
+def get_feed(api_request_factory, user, query=''):
+    request = api_request_factory.get(f'/changes/{query}')
+    force_authenticate(request, user=user)
+    return ChangeFeedView.as_view()(request)
+
+
+@pytest.fixture(autouse=True)
+def settled_changes(settings):
+    """
+    Fixture to treat every change as settled, so cursors advance immediately.
+    """
+    settings.CHANGES_SAFETY_LAG = 0
+
+
+@pytest.fixture
+def category(user):
+    """
+    Fixture to create a test category.
+    """
+    return Category.objects.create(name='TestCategory', user=user)
+
+
+@pytest.mark.django_db
+def test_change_feed_returns_rows_and_tombstones(api_request_factory, user, category):
+    """
+    Test that creates, updates and deletes are returned in sequence order.
+    """
+    kept = Expense.objects.create(user=user, category=category, amount=Decimal('10.00'), description='Kept')
+    removed = Expense.objects.create(user=user, category=category, amount=Decimal('20.00'), description='Removed')
+    kept.amount = Decimal('15.00')
+    kept.save()
+    removed_id = removed.pk
+    removed.delete()
+
+    response = get_feed(api_request_factory, user)
+
+    assert response.status_code == 200
+    changes = {(change['model'], change['id']): change for change in response.data['changes']}
+    assert changes[('category', category.pk)]['data']['name'] == 'TestCategory'
+    assert changes[('expense', kept.pk)]['action'] == Change.UPDATE
+    assert changes[('expense', kept.pk)]['data']['amount'] == '15.00'
+    assert changes[('expense', removed_id)]['action'] == Change.DELETE
+    assert changes[('expense', removed_id)]['data'] is None
+    assert changes[('budget', user.account_budget.pk)]['data']['budget'] == '985.00'
+    assert response.data['cursor'] == Change.objects.latest('pk').pk
+    assert response.data['has_more'] is False
+
+
+@pytest.mark.django_db
+def test_change_feed_only_returns_changes_after_cursor(api_request_factory, user, category):
+    """
+    Test that a client only receives the changes made after its cursor.
+    """
+    cursor = get_feed(api_request_factory, user).data['cursor']
+    expense = Expense.objects.create(user=user, category=category, amount=Decimal('10.00'))
+
+    response = get_feed(api_request_factory, user, f'?since={cursor}')
+
+    assert {(change['model'], change['id']) for change in response.data['changes']} == {
+        ('expense', expense.pk), ('budget', user.account_budget.pk)
+    }
+
+
+@pytest.mark.django_db
+def test_change_feed_paginates_with_limit(api_request_factory, user, category):
+    """
+    Test that `limit` pages through the feed with `has_more`.
+    """
+    first = get_feed(api_request_factory, user, '?limit=1')
+    second = get_feed(api_request_factory, user, f"?limit=1&since={first.data['cursor']}")
+
+    assert first.data['has_more'] is True
+    assert len(first.data['changes']) == 1
+    assert second.data['changes'][0]['seq'] > first.data['cursor']
+
+
+@pytest.mark.django_db
+def test_change_feed_redelivers_recent_changes(api_request_factory, user, category, settings):
+    """
+    Test that the cursor stays before changes younger than the safety lag.
+    """
+    settings.CHANGES_SAFETY_LAG = 60
+    Change.objects.filter(user=user).update(created_at=timezone.now() - timedelta(minutes=5))
+    settled = Change.objects.latest('pk').pk
+    expense = Expense.objects.create(user=user, category=category, amount=Decimal('10.00'))
+
+    first = get_feed(api_request_factory, user, '?limit=100')
+    assert first.data['cursor'] == settled
+    assert ('expense', expense.pk) in {(change['model'], change['id']) for change in first.data['changes']}
+
+    second = get_feed(api_request_factory, user, f"?since={first.data['cursor']}")
+    assert ('expense', expense.pk) in {(change['model'], change['id']) for change in second.data['changes']}
+
+    paged = get_feed(api_request_factory, user, f'?since={settled}&limit=1')
+    assert paged.data['cursor'] == settled
+    assert paged.data['has_more'] is False
+
+
+@pytest.mark.django_db
+def test_change_feed_hides_other_users_changes(api_request_factory, user, category):
+    """
+    Test that a user never sees changes to another user's rows.
+    """
+    other = User.objects.create_user(username='other', password='password123')
+
+    response = get_feed(api_request_factory, other)
+
+    assert {change['model'] for change in response.data['changes']} == {'budget'}
+
+
+@pytest.mark.django_db
+def test_change_feed_rejects_invalid_cursor(api_request_factory, user):
+    """
+    Test that a non-integer cursor is rejected.
+    """
+    response = get_feed(api_request_factory, user, '?since=abc')
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_compact_changes_keeps_latest_change_per_object(user, category):
+    """
+    Test that compaction drops superseded changes and optionally old tombstones.
+    """
+    expense = Expense.objects.create(user=user, category=category, amount=Decimal('10.00'))
+    for amount in ('11.00', '12.00'):
+        expense.amount = Decimal(amount)
+        expense.save()
+
+    call_command('compact_changes')
+
+    assert list(Change.objects.filter(model='expense').values_list('action', flat=True)) == [Change.UPDATE]
+    assert Change.objects.filter(model='budget').count() == 1
+
+    expense.delete()
+    Change.objects.filter(action=Change.DELETE).update(created_at=timezone.now() - timedelta(days=40))
+    call_command('compact_changes', '--tombstone-days', '30')
+
+    assert not Change.objects.filter(model='expense').exists()
+
+
+@pytest.mark.django_db
+def test_compact_changes_keeps_other_users_objects_with_same_id(user):
+    """
+    Test that a newer change of one user's object does not remove another user's change of the same id.
+    """
+    other_user = User.objects.create_user(username='otheruser', password='password123')
+    Change.objects.create(user=user, model='expense', object_id=7, action=Change.CREATE)
+    Change.objects.create(user=other_user, model='expense', object_id=7, action=Change.CREATE)
+    Change.objects.create(user=other_user, model='expense', object_id=7, action=Change.UPDATE)
+    Change.objects.create(user=None, model='category', object_id=1, action=Change.CREATE)
+    Change.objects.create(user=None, model='category', object_id=1, action=Change.UPDATE)
+
+    call_command('compact_changes')
+
+    kept = Change.objects.filter(model__in=['expense', 'category'], object_id__in=[1, 7])
+    assert set(kept.values_list('user', 'model', 'action')) == {
+        (user.pk, 'expense', Change.CREATE),
+        (other_user.pk, 'expense', Change.UPDATE),
+        (None, 'category', Change.UPDATE),
+    }
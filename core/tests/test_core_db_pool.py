@@ -0,0 +1,224 @@
+import threading
+import pytest
+from unittest import mock
+from django.contrib.auth.models import User
+from rest_framework.test import force_authenticate
+from django.db.backends.postgresql import creation
+from core.db.backends.pooled_postgresql.base import DatabaseWrapper
+from core.db.pool import (
+    ConnectionPool,
+    PoolTimeout,
+    close_pools,
+    get_pool,
+    pool_stats
+)
+from core.views import DatabasePoolStatsView
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_pool_reuses_released_connections():
+    """
+    Test that a released connection is handed out again instead of reconnecting.
+    """
+    pool = ConnectionPool(max_size=2)
+
+    first = pool.acquire(FakeConnection)
+    pool.release(first)
+    second = pool.acquire(FakeConnection)
+
+    assert second is first
+    stats = pool.stats()
+    assert stats['created'] == 1
+    assert stats['reused'] == 1
+    assert stats['in_use'] == 1
+
+
+def test_pool_is_bounded():
+    """
+    Test that acquire times out when every connection is checked out.
+    """
+    pool = ConnectionPool(max_size=1, timeout=0.05)
+    pool.acquire(FakeConnection)
+
+    with pytest.raises(PoolTimeout):
+        pool.acquire(FakeConnection)
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_pool_waiter_gets_released_connection():
+    """
+    Test that a waiting caller receives a connection released by another thread.
+    """
+    pool = ConnectionPool(max_size=1, timeout=5)
+    connection = pool.acquire(FakeConnection)
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(FakeConnection)))
+    waiter.start()
+    pool.release(connection)
+    waiter.join(timeout=5)
+
+    assert acquired == [connection]
+    assert pool.stats()['created'] == 1
+
+
+def test_pool_recycles_connections_past_max_lifetime():
+    """
+    Test that connections older than max_lifetime are closed instead of reused.
+    """
+    clock = FakeClock()
+    pool = ConnectionPool(max_size=1, max_lifetime=60, clock=clock)
+    connection = pool.acquire(FakeConnection)
+    pool.release(connection)
+
+    clock.now = 61
+    replacement = pool.acquire(FakeConnection)
+
+    assert replacement is not connection
+    assert connection.closed
+    assert pool.stats()['recycled'] == 1
+
+
+def test_pool_health_check_discards_broken_connections():
+    """
+    Test that idle connections failing the health check are replaced.
+    """
+    def check(connection):
+        raise RuntimeError('server closed the connection unexpectedly')
+
+    clock = FakeClock()
+    pool = ConnectionPool(max_size=1, health_check_interval=30, check=check, clock=clock)
+    connection = pool.acquire(FakeConnection)
+    pool.release(connection)
+
+    clock.now = 10
+    assert pool.acquire(FakeConnection) is connection
+    pool.release(connection)
+
+    clock.now = 45
+    replacement = pool.acquire(FakeConnection)
+
+    assert replacement is not connection
+    assert connection.closed
+    assert pool.stats()['health_check_failures'] == 1
+
+
+def test_pool_health_check_runs_outside_the_lock():
+    """
+    Test that a slow health check does not block other callers of the pool.
+    """
+    pinging, proceed = threading.Event(), threading.Event()
+
+    def check(connection):
+        pinging.set()
+        proceed.wait(5)
+
+    clock = FakeClock()
+    pool = ConnectionPool(max_size=2, health_check_interval=30, check=check, clock=clock)
+    idle = pool.acquire(FakeConnection)
+    pool.release(idle)
+    clock.now = 45
+
+    checker = threading.Thread(target=pool.acquire, args=(FakeConnection,))
+    checker.start()
+    assert pinging.wait(5)
+    acquired = []
+    other = threading.Thread(target=lambda: acquired.append(pool.acquire(FakeConnection)))
+    other.start()
+    other.join(timeout=1)
+    blocked = other.is_alive()
+    proceed.set()
+    checker.join(timeout=5)
+
+    assert not blocked
+    assert acquired[0] is not idle
+    assert pool.stats()['in_use'] == 2
+
+
+def test_pool_release_with_discard_closes_connection():
+    """
+    Test that a connection released as broken is closed and frees its slot.
+    """
+    pool = ConnectionPool(max_size=1)
+    connection = pool.acquire(FakeConnection)
+    pool.release(connection, discard=True)
+
+    assert connection.closed
+    assert pool.stats()['size'] == 0
+
+
+def test_pools_are_keyed_by_connection_params():
+    """
+    Test that an alias gets a separate pool for every database it points at.
+    """
+    pool = get_pool('params-alias', params=['home_budget', 'db'])
+
+    assert get_pool('params-alias', params=['home_budget', 'db']) is pool
+    assert get_pool('params-alias', params=['test_home_budget', 'db']) is not pool
+    assert {'params-alias:home_budget', 'params-alias:test_home_budget'} <= set(pool_stats())
+
+
+def test_close_pools_closes_idle_connections_of_alias():
+    """
+    Test that closing an alias closes the idle connections of all its pools only.
+    """
+    connections = {}
+    for alias, name in [('closed-alias', 'first'), ('closed-alias', 'second'), ('open-alias', 'first')]:
+        pool = get_pool(alias, params=[name])
+        connections[alias, name] = pool.acquire(FakeConnection)
+        pool.release(connections[alias, name])
+
+    close_pools('closed-alias')
+
+    assert connections['closed-alias', 'first'].closed
+    assert connections['closed-alias', 'second'].closed
+    assert not connections['open-alias', 'first'].closed
+
+
+def test_destroying_test_database_closes_pooled_connections():
+    """
+    Test that idle pooled connections to the test database are closed before it is dropped.
+    """
+    wrapper = DatabaseWrapper({'NAME': 'test_home_budget', 'OPTIONS': {}}, alias='destroyed-alias')
+    connection = wrapper.pool.acquire(FakeConnection)
+    wrapper.pool.release(connection)
+
+    with mock.patch.object(creation.DatabaseCreation, '_destroy_test_db') as destroy:
+        wrapper.creation._destroy_test_db('test_home_budget', verbosity=0)
+
+    assert connection.closed
+    destroy.assert_called_once_with('test_home_budget', 0)
+
+
+@pytest.mark.django_db
+def test_pool_stats_view_requires_staff(api_request_factory):
+    """
+    Test that only staff users can read the pool metrics.
+    """
+    get_pool('test-alias').acquire(FakeConnection)
+    view = DatabasePoolStatsView.as_view()
+
+    request = api_request_factory.get('/metrics/db-pool/')
+    force_authenticate(request, user=User.objects.create_user(username='regular'))
+    assert view(request).status_code == 403
+
+    request = api_request_factory.get('/metrics/db-pool/')
+    force_authenticate(request, user=User.objects.create_user(username='staff', is_staff=True))
+    response = view(request)
+    assert response.status_code == 200
+    assert response.data['test-alias']['in_use'] == 1
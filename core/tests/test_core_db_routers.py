@@ -0,0 +1,151 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from account.models import AccountBudget
+from core.db.routers import (
+    LeastLatencySelector,
+    ReplicaRouter,
+    RoundRobinSelector,
+    pin_to_primary
+)
+from core.middleware import ReplicaPinningMiddleware
+
+DATABASES = ['default', 'replica']
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def replica_router():
+    """
+    Fixture to route reads to the `replica` SQLite database.
+    """
+    router = ReplicaRouter(replicas=['replica'], selection='round_robin')
+    with override_settings(DATABASE_ROUTERS=[router], DATABASE_REPLICAS=['replica']):
+        yield router
+
+
+def test_round_robin_selector_cycles_replicas():
+    """
+    Test that round robin selection alternates between replicas.
+    """
+    selector = RoundRobinSelector(['replica_0', 'replica_1'])
+
+    assert [selector.choose() for _ in range(4)] == ['replica_0', 'replica_1', 'replica_0', 'replica_1']
+
+
+def test_least_latency_selector_prefers_fastest_replica():
+    """
+    Test that least latency selection picks the replica with the lowest average.
+    """
+    selector = LeastLatencySelector(['replica_0', 'replica_1'])
+    selector.record('replica_0', 0.020)
+    assert selector.choose() == 'replica_1'
+
+    selector.record('replica_1', 0.050)
+    assert selector.choose() == 'replica_0'
+
+
+def test_least_latency_selector_reprobes_slow_replica():
+    """
+    Test that a replica without recent samples is measured again.
+    """
+    clock = FakeClock()
+    selector = LeastLatencySelector(['replica_0', 'replica_1'], probe_interval=30, clock=clock)
+    selector.record('replica_0', 0.500)
+    selector.record('replica_1', 0.010)
+
+    clock.now = 20
+    selector.record('replica_1', 0.010)
+    assert selector.choose() == 'replica_1'
+
+    clock.now = 31
+    assert selector.choose() == 'replica_0'
+
+    selector.record('replica_0', 0.005)
+    assert selector.choose() == 'replica_0'
+
+
+def test_least_latency_selectors_share_one_receiver():
+    """
+    Test that creating selectors does not pile up `connection_created` receivers.
+    """
+    receivers = len(connection_created.receivers)
+    selectors = [LeastLatencySelector(['replica']) for _ in range(3)]
+    assert len(connection_created.receivers) == receivers
+
+    connection = connections['replica']
+    wrappers = list(connection.execute_wrappers)
+    try:
+        connection_created.send(sender=type(connection), connection=connection)
+        assert len(connection.execute_wrappers) == len(wrappers) + len(selectors)
+    finally:
+        connection.execute_wrappers[:] = wrappers
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_router_sends_reads_to_replica(replica_router):
+    """
+    Test that reads hit the replica while writes hit the primary.
+    """
+    User.objects.create_user(username='primary-only')
+    User.objects.using('replica').bulk_create([User(username='replica-only')])
+
+    with pin_to_primary(False):
+        assert list(User.objects.values_list('username', flat=True)) == ['replica-only']
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_router_reads_own_writes(replica_router):
+    """
+    Test that reads after a write in the same context go to the primary.
+    """
+    with pin_to_primary(False):
+        User.objects.create_user(username='writer')
+
+        assert User.objects.filter(username='writer').exists()
+        assert AccountBudget.objects.filter(user__username='writer').exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_router_reads_primary_inside_atomic_block(replica_router):
+    """
+    Test that reads inside a transaction on the primary stay on the primary.
+    """
+    User.objects.create_user(username='primary-only')
+
+    with pin_to_primary(False), transaction.atomic():
+        assert User.objects.filter(username='primary-only').exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_pinning_middleware_pins_client_after_write(replica_router):
+    """
+    Test that a client reads from the primary on the request after a write.
+    """
+    seen = []
+
+    def view(request):
+        if request.method == 'POST':
+            User.objects.create_user(username=request.POST['username'])
+        seen.append(User.objects.filter(username='pinned').exists())
+        return HttpResponse()
+
+    middleware = ReplicaPinningMiddleware(view)
+    factory = RequestFactory()
+    headers = {'HTTP_AUTHORIZATION': 'Bearer client-a'}
+
+    middleware(factory.post('/', {'username': 'pinned'}, **headers))
+    middleware(factory.get('/', **headers))
+    middleware(factory.get('/', HTTP_AUTHORIZATION='Bearer client-b'))
+
+    assert seen == [True, True, False]
@@ -0,0 +1,246 @@
+import json
+import pytest
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from account.models import AccountBudget, BudgetHistory
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from category.async_views import AsyncAggregationView
+from category.models import Category, Expense
+from category.views import ExpenseViewSet
+from core.authentication import ShardedJWTAuthentication
+from core.changes import get_changes
+from core.db.sharding import (
+    HashRing,
+    ShardRouter,
+    move_user,
+    use_shard
+)
+from core.models import Change, UserShard
+
+DATABASES = ['default', 'shard_a', 'shard_b', 'shard_c']
+
+
+@pytest.fixture
+def shards():
+    """
+    Fixture enabling sharding across the `shard_a` and `shard_b` SQLite databases.
+    """
+    with override_settings(SHARD_DATABASES=['shard_a', 'shard_b'], DATABASE_ROUTERS=[ShardRouter()]):
+        yield ['shard_a', 'shard_b']
+
+
+def test_hash_ring_moves_few_keys_when_a_node_is_added():
+    """
+    Test that adding a node only reassigns a fraction of the keys.
+    """
+    before = HashRing(['shard_a', 'shard_b', 'shard_c'])
+    after = HashRing(['shard_a', 'shard_b', 'shard_c', 'shard_d'])
+
+    placements = [before.node_for(key) for key in range(10000)]
+    moved = sum(1 for key in range(10000) if before.node_for(key) != after.node_for(key))
+
+    assert set(placements) == {'shard_a', 'shard_b', 'shard_c'}
+    assert 1500 < moved < 3500
+    assert all(after.node_for(key) == 'shard_d' for key in range(10000) if before.node_for(key) != after.node_for(key))
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_new_user_is_provisioned_on_its_shard(shards):
+    """
+    Test that creating a user copies it to its shard and writes the budget there.
+    """
+    user = User.objects.create_user(username='sharded', password='password123')
+
+    alias = UserShard.objects.get(user=user).alias
+    assert alias in shards
+    assert User.objects.using(alias).filter(pk=user.pk).exists()
+    assert AccountBudget.objects.using(alias).get(user_id=user.pk).budget == Decimal('1000.00')
+    assert not AccountBudget.objects.using('default').filter(user_id=user.pk).exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_sharded_request_writes_to_user_shard(shards):
+    """
+    Test that an authenticated request stores expenses and history on the user's shard.
+    """
+    user = User.objects.create_user(username='sharded', password='password123')
+    alias = UserShard.objects.get(user=user).alias
+    category = Category.objects.using(alias).create(name='Sharded', user_id=user.pk)
+
+    view = ExpenseViewSet.as_view({'post': 'create'}, authentication_classes=[ShardedJWTAuthentication])
+    request = APIRequestFactory().post(
+        '/expenses/',
+        {'amount': '40.00', 'description': 'On shard', 'category': category.pk},
+        format='json',
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    with use_shard(None):
+        response = view(request)
+
+    assert response.status_code == 201
+    assert Expense.objects.using(alias).filter(description='On shard').exists()
+    assert not Expense.objects.using('default').exists()
+    assert AccountBudget.objects.using(alias).get(user_id=user.pk).budget == Decimal('960.00')
+    assert BudgetHistory.objects.using(alias).filter(user_id=user.pk).count() == 2
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_migrating_user_is_refused(shards):
+    """
+    Test that requests of a user being moved get a 503.
+    """
+    user = User.objects.create_user(username='sharded', password='password123')
+    UserShard.objects.filter(user=user).update(migrating=True)
+
+    view = ExpenseViewSet.as_view({'get': 'list'}, authentication_classes=[ShardedJWTAuthentication])
+    request = APIRequestFactory().get('/expenses/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    with use_shard(None):
+        response = view(request)
+
+    assert response.status_code == 503
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_predefined_categories_are_replicated_to_every_shard(shards):
+    """
+    Test that predefined categories exist with the same ids on every shard.
+    """
+    reset_sql = {}
+    for alias in shards:
+        ops = connections[alias].ops
+        reset_sql[alias] = mock.patch.object(ops, 'sequence_reset_sql', wraps=ops.sequence_reset_sql).start()
+    try:
+        call_command('create_predefined_categories')
+    finally:
+        mock.patch.stopall()
+
+    expected = sorted(Category.objects.using('default').filter(user=None).values_list('pk', 'name'))
+    for alias in shards:
+        assert sorted(Category.objects.using(alias).filter(user=None).values_list('pk', 'name')) == expected
+        # Shard sequences must skip the copied ids (SQLite does this itself).
+        reset_sql[alias].assert_called_once_with(mock.ANY, [Category])
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rebalance_shards_moves_users_to_new_shard():
+    """
+    Test that rebalancing after adding shards moves users and all of their rows.
+    """
+    with override_settings(SHARD_DATABASES=['shard_a'], DATABASE_ROUTERS=[ShardRouter()]):
+        users = [User.objects.create_user(username=f'user{i}', password='password123') for i in range(12)]
+        for user in users:
+            with use_shard(user.pk):
+                category = Category.objects.create(name=f'Category {user.pk}', user=user)
+                Expense.objects.create(user=user, category=category, amount=Decimal('25.00'), description='Move me')
+
+    with override_settings(SHARD_DATABASES=['shard_a', 'shard_b', 'shard_c'], DATABASE_ROUTERS=[ShardRouter()]):
+        call_command('rebalance_shards')
+
+        moved = UserShard.objects.exclude(alias='shard_a')
+        assert moved.exists()
+        for entry in moved:
+            assert not Expense.objects.using('shard_a').filter(user_id=entry.user_id).exists()
+            assert not BudgetHistory.objects.using('shard_a').filter(user_id=entry.user_id).exists()
+
+            expense = Expense.objects.using(entry.alias).get(user_id=entry.user_id)
+            assert expense.category.name == f'Category {entry.user_id}'
+            assert AccountBudget.objects.using(entry.alias).get(user_id=entry.user_id).budget == Decimal('975.00')
+            assert BudgetHistory.objects.using(entry.alias).filter(
+                user_id=entry.user_id, expense_id=expense.pk
+            ).exists()
+        assert not UserShard.objects.filter(migrating=True).exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_rebalance_shards_moves_users_created_before_sharding():
+    """
+    Test that users still on `default` are moved without deleting their directory `User` row.
+    """
+    users = [User.objects.create_user(username=f'legacy{i}', password='password123') for i in range(4)]
+    for user in users:
+        category = Category.objects.create(name=f'Legacy {user.pk}', user=user)
+        Expense.objects.create(user=user, category=category, amount=Decimal('25.00'), description='Legacy')
+
+    with override_settings(SHARD_DATABASES=['shard_a', 'shard_b'], DATABASE_ROUTERS=[ShardRouter()]):
+        call_command('rebalance_shards')
+
+        for user in users:
+            entry = UserShard.objects.get(user_id=user.pk)
+            assert entry.alias in ('shard_a', 'shard_b')
+            assert not entry.migrating
+            assert User.objects.using('default').filter(pk=user.pk).exists()
+            assert not Expense.objects.using('default').filter(user_id=user.pk).exists()
+            assert not AccountBudget.objects.using('default').filter(user_id=user.pk).exists()
+            expense = Expense.objects.using(entry.alias).get(user_id=user.pk)
+            assert expense.category.name == f'Legacy {user.pk}'
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_delta_sync_follows_moved_rows(settings):
+    """
+    Test that a client synced before a move gets tombstones for the old ids and the rows under their new ids.
+    """
+    settings.CHANGES_SAFETY_LAG = 0
+    # Rows already on the target, so the moved rows get other ids there.
+    with override_settings(SHARD_DATABASES=['shard_b'], DATABASE_ROUTERS=[ShardRouter()]):
+        other = User.objects.create_user(username='resident', password='password123')
+        with use_shard(other.pk):
+            for index in range(2):
+                filler = Category.objects.create(name=f'Filler {index}', user=other)
+                Expense.objects.create(user=other, category=filler, amount=Decimal('1.00'))
+
+    with override_settings(SHARD_DATABASES=['shard_a'], DATABASE_ROUTERS=[ShardRouter()]):
+        user = User.objects.create_user(username='mover', password='password123')
+        with use_shard(user.pk):
+            category = Category.objects.create(name='Moving', user=user)
+            expense = Expense.objects.create(user=user, category=category, amount=Decimal('25.00'))
+            _, cursor, _ = get_changes(user)
+
+    with override_settings(SHARD_DATABASES=['shard_a', 'shard_b'], DATABASE_ROUTERS=[ShardRouter()]):
+        move_user(user.pk, 'shard_b')
+        with use_shard(user.pk):
+            changes, _, _ = get_changes(user, since=cursor)
+            moved = Expense.objects.get(user=user, amount=Decimal('25.00'))
+
+    actions = {(change['model'], change['id']): change['action'] for change in changes}
+    assert actions[('expense', expense.pk)] == Change.DELETE
+    assert actions[('category', category.pk)] == Change.DELETE
+    assert actions[('expense', moved.pk)] == Change.CREATE
+    assert actions[('category', moved.category_id)] == Change.CREATE
+    assert moved.pk != expense.pk
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_async_views_use_the_user_shard(shards, settings):
+    """
+    Test that async views authenticate with the configured classes, reading from the shard and refusing migrating users.
+    """
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_AUTHENTICATION_CLASSES': ('core.authentication.ShardedJWTAuthentication',),
+    }
+    user = User.objects.create_user(username='sharded', password='password123')
+    with use_shard(user.pk):
+        category = Category.objects.create(name='Sharded', user=user)
+        Expense.objects.create(user=user, category=category, amount=Decimal('40.00'))
+
+    def aggregate():
+        request = RequestFactory().get(
+            '/async/aggregations/?type=total', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        with use_shard(None):
+            return async_to_sync(AsyncAggregationView.as_view())(request)
+
+    response = aggregate()
+    assert response.status_code == 200
+    assert Decimal(json.loads(response.content)['total_spent']) == Decimal('40.00')
+
+    UserShard.objects.filter(user=user).update(migrating=True)
+    assert aggregate().status_code == 503
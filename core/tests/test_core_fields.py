@@ -0,0 +1,111 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Avg, F, Sum, Value
+from account.models import AccountBudget
+from category.models import Category, Expense
+from category.serializers import ExpenseSerializer
+from core.fields import MoneyField
+
+
+@pytest.fixture
+def category(user):
+    """
+    Fixture to create a test category.
+    """
+    return Category.objects.create(name='TestCategory', user=user)
+
+
+def test_money_field_converts_to_and_from_minor_units():
+    """
+    Test that values are stored as integer cents and loaded as two-place decimals.
+    """
+    field = MoneyField()
+
+    assert field.get_prep_value(Decimal('12.34')) == 1234
+    assert field.get_prep_value('0.29') == 29
+    assert field.get_prep_value(0.1) == 10
+    assert field.from_db_value(1234, None, connection) == Decimal('12.34')
+    assert str(field.from_db_value(5, None, connection)) == '0.05'
+    assert field.from_db_value(1234.5, None, connection) == Decimal('12.35')
+
+
+@pytest.mark.django_db
+def test_expense_amount_is_stored_as_cents(user, category):
+    """
+    Test that the column holds cents while the model and serializer use decimals.
+    """
+    expense = Expense.objects.create(user=user, category=category, amount=Decimal('19.99'))
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT amount FROM category_expense WHERE id = %s', [expense.pk])
+        assert cursor.fetchone()[0] == 1999
+
+    expense.refresh_from_db()
+    assert expense.amount == Decimal('19.99')
+    assert ExpenseSerializer(expense).data['amount'] == '19.99'
+    assert Expense.objects.filter(amount__gte=Decimal('19.99')).exists()
+    assert not Expense.objects.filter(amount__gt=20).exists()
+
+
+@pytest.mark.django_db
+def test_aggregates_and_expressions_use_cents(user, category):
+    """
+    Test that SUM/AVG results and F() updates come back as decimals.
+    """
+    for amount in ('10.00', '0.05', '0.10'):
+        Expense.objects.create(user=user, category=category, amount=Decimal(amount))
+
+    totals = Expense.objects.aggregate(total=Sum('amount'), average=Avg('amount', output_field=MoneyField()))
+    AccountBudget.objects.filter(user=user).update(budget=F('budget') + Value(Decimal('0.15'), output_field=MoneyField()))
+
+    assert totals == {'total': Decimal('10.15'), 'average': Decimal('3.38')}
+    assert AccountBudget.objects.get(user=user).budget == Decimal('990.00')
+
+
+@pytest.mark.django_db
+def test_new_budget_defaults_to_one_thousand():
+    """
+    Test that the budget default survives the switch to cents.
+    """
+    user = User.objects.create_user(username='money', password='password123')
+
+    assert AccountBudget.objects.get(user=user).budget == Decimal('1000.00')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_money_migrations_convert_amounts_both_ways():
+    """
+    Test that the minor units migrations scale existing amounts to cents and back.
+    """
+    decimal_state = [('account', '0003_accountbudget_expense_count'), ('category', '0001_initial')]
+    latest = MigrationExecutor(connection).loader.graph.leaf_nodes()
+    try:
+        executor = MigrationExecutor(connection)
+        executor.migrate(decimal_state)
+        old_apps = executor.loader.project_state(decimal_state).apps
+        user = old_apps.get_model('auth', 'User').objects.create(username='migrated')
+        old_apps.get_model('account', 'AccountBudget').objects.create(user=user, budget=Decimal('1234.56'))
+        old_apps.get_model('account', 'BudgetHistory').objects.create(
+            user=user, change_type='expense', amount=Decimal('0.99')
+        )
+        category = old_apps.get_model('category', 'Category').objects.create(name='Migrated', user=user)
+        old_apps.get_model('category', 'Expense').objects.create(user=user, category=category, amount=Decimal('10.05'))
+
+        MigrationExecutor(connection).migrate(latest)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT budget FROM account_accountbudget WHERE user_id = %s', [user.pk])
+            assert cursor.fetchone()[0] == 123456
+        assert AccountBudget.objects.get(user_id=user.pk).budget == Decimal('1234.56')
+        assert Expense.objects.get(user_id=user.pk).amount == Decimal('10.05')
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(decimal_state)
+        old_apps = executor.loader.project_state(decimal_state).apps
+        assert old_apps.get_model('account', 'AccountBudget').objects.get(user=user.pk).budget == Decimal('1234.56')
+        assert old_apps.get_model('account', 'BudgetHistory').objects.get(user=user.pk).amount == Decimal('0.99')
+        assert old_apps.get_model('category', 'Expense').objects.get(user=user.pk).amount == Decimal('10.05')
+    finally:
+        MigrationExecutor(connection).migrate(latest)
@@ -0,0 +1,79 @@
+import threading
+import pytest
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from core import hashing
+
+
+@pytest.fixture
+def blocked_pool():
+    """
+    Fixture to create a one-worker pool without a queue whose worker is kept busy.
+    """
+    release = threading.Event()
+    pool = hashing.HashingPool(workers=1, max_queue=0, timeout=0.05)
+    with pytest.raises(hashing.PasswordHashingUnavailable):
+        pool.run(release.wait)
+    yield pool
+    release.set()
+    pool.executor.shutdown(wait=True)
+
+
+def test_pool_refuses_work_beyond_its_queue(blocked_pool):
+    """
+    Test that a full pool fails fast with a 429 and times out with a 503.
+    """
+    with pytest.raises(hashing.PasswordHashingBusy) as busy:
+        blocked_pool.run(make_password, 'password123')
+
+    assert busy.value.status_code == 429
+    assert hashing.PasswordHashingUnavailable.status_code == 503
+
+
+def test_pool_frees_its_slot_when_the_hash_finishes():
+    """
+    Test that slots are returned, so later work is accepted again.
+    """
+    pool = hashing.HashingPool(workers=1, max_queue=0, timeout=5)
+
+    results = [pool.run(hashing._verify, 'password123', make_password('password123')) for _ in range(3)]
+
+    assert results == [(True, False)] * 3
+
+
+@pytest.mark.django_db
+def test_login_upgrades_outdated_hash():
+    """
+    Test that a successful login rehashes the password with the preferred hasher.
+    """
+    user = User.objects.create(username='legacy', password=make_password('password123', hasher='pbkdf2_sha1'))
+    client = APIClient()
+
+    assert client.post('/api/login/', {'username': 'legacy', 'password': 'wrong'}).status_code == 401
+    user.refresh_from_db()
+    assert user.password.startswith('pbkdf2_sha1$')
+
+    response = client.post('/api/login/', {'username': 'legacy', 'password': 'password123'})
+
+    assert response.status_code == 200
+    user.refresh_from_db()
+    assert user.password.startswith('pbkdf2_sha256$')
+    assert user.check_password('password123')
+
+
+@pytest.mark.django_db
+def test_login_and_register_answer_429_when_pool_is_full(blocked_pool, user):
+    """
+    Test that sign-ins and registrations are refused while hashing is saturated.
+    """
+    client = APIClient()
+
+    with mock.patch.object(hashing, 'get_pool', return_value=blocked_pool):
+        login = client.post('/api/login/', {'username': user.username, 'password': 'password123'})
+        register = client.post('/api/register/', {'username': 'new', 'password': 'password123'})
+
+    assert login.status_code == register.status_code == 429
+    assert login['Retry-After'] == str(hashing.RETRY_AFTER_SECONDS)
+    assert not User.objects.filter(username='new').exists()
@@ -0,0 +1,145 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+from django.utils import timezone
+from core import jobs
+from core.models import Job
+
+calls = []
+
+
+@jobs.task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@jobs.task(name='tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+@pytest.mark.django_db
+def test_enqueue_with_idempotency_key_returns_existing_job():
+    """
+    Test that enqueueing the same idempotency key twice creates one job.
+    """
+    first = jobs.enqueue('tests.record', {'value': 1}, idempotency_key='expense:1')
+    second = jobs.enqueue('tests.record', {'value': 1}, idempotency_key='expense:1')
+
+    assert first.pk == second.pk
+    assert Job.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_claim_does_not_hand_out_a_job_twice():
+    """
+    Test that a claimed job is not claimed again by another worker.
+    """
+    job = jobs.enqueue('tests.record', {'value': 1})
+
+    assert [claimed.pk for claimed in jobs.claim('worker-a')] == [job.pk]
+    assert jobs.claim('worker-b') == []
+
+    job.refresh_from_db()
+    assert job.status == Job.RUNNING
+    assert job.locked_by == 'worker-a'
+    assert job.attempts == 1
+
+
+@pytest.mark.django_db
+def test_claim_skips_jobs_scheduled_in_the_future():
+    """
+    Test that jobs are not claimed before their run_after time.
+    """
+    jobs.enqueue('tests.record', {'value': 1}, run_after=timezone.now() + timedelta(minutes=5))
+
+    assert jobs.claim('worker-a') == []
+
+
+@pytest.mark.django_db
+def test_expired_lease_is_reclaimed():
+    """
+    Test that a job whose worker died is handed to another worker (at-least-once).
+    """
+    job = jobs.enqueue('tests.record', {'value': 1})
+    jobs.claim('worker-a')
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - jobs.VISIBILITY_TIMEOUT - timedelta(seconds=1))
+
+    assert [claimed.locked_by for claimed in jobs.claim('worker-b')] == ['worker-b']
+
+
+@pytest.mark.django_db
+def test_failed_job_is_retried_with_backoff_then_marked_failed():
+    """
+    Test that failing jobs are rescheduled until max_attempts is reached.
+    """
+    job = jobs.enqueue('tests.explode')
+
+    jobs.run(jobs.claim('worker-a')[0])
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert job.run_after > timezone.now()
+    assert 'boom' in job.last_error
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    jobs.run(jobs.claim('worker-a')[0])
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_workers_burst_runs_queued_jobs():
+    """
+    Test that run_workers --burst runs every queued job and exits.
+    """
+    for value in range(3):
+        jobs.enqueue('tests.record', {'value': value})
+
+    call_command('run_workers', '--burst', '--concurrency', '2', stdout=StringIO())
+
+    assert sorted(calls) == [0, 1, 2]
+    assert Job.objects.filter(status=Job.DONE).count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_workers_fails_when_a_worker_crashes():
+    """
+    Test that run_workers exits with an error instead of reporting success when a worker dies.
+    """
+    jobs.enqueue('tests.record', {'value': 1})
+
+    with mock.patch.object(jobs, 'claim', side_effect=OperationalError('database is locked')):
+        with pytest.raises(CommandError, match='1 worker'):
+            call_command('run_workers', '--burst', stdout=StringIO(), stderr=StringIO())
+
+    assert Job.objects.get().status == Job.QUEUED
+
+
+def test_run_forever_survives_polling_errors():
+    """
+    Test that a worker logs a failed poll and keeps polling.
+    """
+    worker = jobs.Worker(poll_interval=0)
+    outcomes = iter([OperationalError('database is locked'), 1])
+
+    def run_once():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        worker.stop()
+        return outcome
+
+    with mock.patch.object(worker, 'run_once', side_effect=run_once) as run:
+        worker.run_forever()
+
+    assert run.call_count == 2
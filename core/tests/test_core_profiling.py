@@ -0,0 +1,100 @@
+import pytest
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.urls import resolve
+from rest_framework_simplejwt.tokens import AccessToken
+from core import middleware
+from category.models import Category
+from core.middleware import ProfilingMiddleware
+from core.profiling import list_captures, parse_capture_name
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    """
+    Fixture to enable profiling into a temporary directory.
+    """
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_MAX_FILES = 3
+    return tmp_path
+
+
+def list_categories(request):
+    request.resolver_match = resolve('/api/categories/')
+    return list(Category.objects.all())
+
+
+def run(user, headers=None):
+    request = RequestFactory().get('/api/categories/', **(headers or {}))
+    request.user = user
+    return ProfilingMiddleware(list_categories)(request)
+
+
+@pytest.mark.django_db
+def test_staff_request_is_captured_with_url_name_and_query_count(profiling, user):
+    """
+    Test that `X-Profile` from a staff user writes a capture named after the URL.
+    """
+    run(user, {'HTTP_X_PROFILE': '1'})
+    assert list_captures(profiling) == []
+
+    user.is_staff = True
+    run(user, {'HTTP_X_PROFILE': '1'})
+
+    [capture] = list_captures(profiling)
+    info = parse_capture_name(capture.name)
+    assert info['url_name'] == 'category-list'
+    assert info['queries'] == 1
+
+
+@pytest.mark.django_db
+def test_profile_header_needs_staff_before_profiling(profiling, user):
+    """
+    Test that `X-Profile` only turns the profiler on for staff, including JWT users not yet authenticated.
+    """
+    headers = {'HTTP_X_PROFILE': '1', 'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+    with mock.patch.object(middleware.cProfile, 'Profile', wraps=middleware.cProfile.Profile) as profile:
+        run(AnonymousUser(), headers)
+        run(AnonymousUser(), {**headers, 'HTTP_AUTHORIZATION': 'Bearer invalid'})
+        assert not profile.called
+
+        user.is_staff = True
+        user.save(update_fields=['is_staff'])
+        run(AnonymousUser(), headers)
+        assert profile.call_count == 1
+
+    assert len(list_captures(profiling)) == 1
+
+
+@pytest.mark.django_db
+def test_sampled_captures_rotate(profiling, settings, user):
+    """
+    Test that sampled requests are captured and only the newest files are kept.
+    """
+    settings.PROFILING_SAMPLE_RATE = 1
+
+    for _ in range(5):
+        run(user)
+
+    assert len(list_captures(profiling)) == 3
+
+
+@pytest.mark.django_db
+def test_profile_report_aggregates_captures(profiling, settings, user):
+    """
+    Test that the report lists the functions of all matching captures.
+    """
+    settings.PROFILING_SAMPLE_RATE = 1
+    run(user)
+    run(user)
+    out = StringIO()
+
+    call_command('profile_report', '--url-name', 'category-list', stdout=out)
+
+    assert out.getvalue().startswith('2 captures')
+    assert 'list_categories' in out.getvalue()
@@ -0,0 +1,69 @@
+import pytest
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import Client
+from core import schema
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path):
+    """
+    Fixture to point SCHEMA_DIR at an empty directory and reset the memoized schema.
+    """
+    settings.SCHEMA_DIR = str(tmp_path)
+    schema.clear_schema_cache()
+    yield tmp_path
+    schema.clear_schema_cache()
+
+
+def test_build_schema_writes_every_format(schema_dir):
+    """
+    Test that the command writes the YAML and JSON schema files.
+    """
+    out = StringIO()
+
+    call_command('build_schema', stdout=out)
+
+    assert (schema_dir / 'openapi.yaml').read_bytes().startswith(b'openapi:')
+    assert b'"/api/expenses/"' in (schema_dir / 'openapi.json').read_bytes()
+    assert schema.schema_version((schema_dir / 'openapi.json').read_bytes()) in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_schema_is_served_from_the_build_with_etag(schema_dir):
+    """
+    Test that the built file is served as is and revalidates with its ETag.
+    """
+    call_command('build_schema', stdout=StringIO())
+    (schema_dir / 'openapi.yaml').write_bytes(b'openapi: 3.0.3\n')
+    client = Client()
+
+    response = client.get('/schema/')
+
+    assert response.content == b'openapi: 3.0.3\n'
+    assert response['Cache-Control'] == schema.REVALIDATE_CACHE_CONTROL
+    assert client.get('/schema/', HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+
+    version = schema.get_schema_document('json').version
+    response = client.get(f'/schema/?format=json&v={version}')
+    assert response['Content-Type'] == 'application/vnd.oai.openapi+json'
+    assert response['Cache-Control'] == schema.IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.mark.django_db
+def test_schema_without_build_is_generated_once(schema_dir):
+    """
+    Test that without a build the schema is generated on first use only.
+    """
+    client = Client()
+
+    with mock.patch.object(schema, 'generate_schema', wraps=schema.generate_schema) as generate:
+        first = client.get('/schema/')
+        second = client.get('/schema/?format=json')
+        docs = client.get('/docs/')
+
+    assert generate.call_count == 1
+    assert first.status_code == second.status_code == docs.status_code == 200
+    assert first['ETag'].strip('"').split('-')[0] == second['ETag'].strip('"').split('-')[0]
+    assert docs.data['schema_url'] == f"/schema/?v={schema.get_schema_document('json').version}"
@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from rest_framework.test import APIClient, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+from category.async_views import AsyncAggregationView
+from category.views import AggregationView
+from core import throttling
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """
+    Fixture to create each kind of throttle store.
+    """
+    if request.param == 'sqlite':
+        return throttling.SqliteRateStore(str(tmp_path / 'throttle.sqlite3'))
+    return throttling.MemoryRateStore()
+
+
+def test_parse_rate():
+    """
+    Test that rates are read as cost units per window in seconds.
+    """
+    assert throttling.parse_rate('600/min') == (600, 60)
+    assert throttling.parse_rate('10/s') == (10, 1)
+
+
+def test_window_slides_over_the_previous_window(store):
+    """
+    Test that the previous window's hits count in proportion to their overlap.
+    """
+    with mock.patch.object(throttling.time, 'time', return_value=600.0):
+        assert [store.hit('user:1', 4, 10, 60)[0] for _ in range(3)] == [True, True, False]
+
+    # A quarter into the next window, 3/4 of the previous 12 units still count.
+    with mock.patch.object(throttling.time, 'time', return_value=675.0):
+        allowed, retry_after = store.hit('user:1', 2, 10, 60)
+        assert (allowed, retry_after) == (False, 45.0)
+
+    with mock.patch.object(throttling.time, 'time', return_value=735.0):
+        assert store.hit('user:1', 4, 10, 60) == (True, None)
+        assert store.hit('user:2', 10, 10, 60) == (True, None)
+
+
+def test_memory_store_forgets_least_recently_seen_client():
+    """
+    Test that a full memory store evicts the client seen least recently.
+    """
+    store = throttling.MemoryRateStore()
+    store.max_keys = 2
+    with mock.patch.object(throttling.time, 'time', return_value=600.0):
+        store.hit('user:1', 4, 10, 60)
+        store.hit('user:2', 4, 10, 60)
+        store.hit('user:1', 4, 10, 60)
+        store.hit('user:3', 4, 10, 60)
+
+    assert list(store.buckets) == ['user:1', 'user:3']
+
+
+@pytest.mark.django_db
+def test_aggregations_cost_more_than_other_requests(settings, api_request_factory, user):
+    """
+    Test that the aggregation cost exhausts the user's budget and returns 429 with Retry-After.
+    """
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'user': '25/min', 'ip': '1000/min'},
+    }
+    view = AggregationView.as_view()
+
+    def aggregate():
+        request = api_request_factory.get('/aggregations/', {'type': 'total'})
+        force_authenticate(request, user=user)
+        return view(request)
+
+    assert [aggregate().status_code for _ in range(3)] == [200, 200, 429]
+    assert int(aggregate()['Retry-After']) > 0
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    assert client.get('/api/budget/').status_code == 429
+
+
+@pytest.mark.django_db
+def test_ip_throttle_applies_to_anonymous_requests(settings):
+    """
+    Test that requests without a user are limited per IP address.
+    """
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'user': '1000/min', 'ip': '2/min'},
+    }
+    client = APIClient()
+
+    statuses = [client.post('/api/login/', {'username': 'x', 'password': 'y'}).status_code for _ in range(3)]
+
+    assert statuses == [401, 401, 429]
+
+
+@pytest.mark.django_db
+def test_async_views_are_throttled(settings, user):
+    """
+    Test that the async aggregation view charges the same cost as the sync one.
+    """
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'user': '15/min', 'ip': '1000/min'},
+    }
+    view = async_to_sync(AsyncAggregationView.as_view())
+
+    def aggregate():
+        request = RequestFactory().get(
+            '/async/aggregations/?type=total', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        return view(request)
+
+    first, second = aggregate(), aggregate()
+
+    assert (first.status_code, second.status_code) == (200, 429)
+    assert 'Retry-After' in second
+
+
+@pytest.mark.django_db
+def test_async_views_check_throttles_off_the_event_loop(user):
+    """
+    Test that the blocking throttle store is not called on the event loop.
+    """
+    on_event_loop = []
+    hit = throttling.MemoryRateStore.hit
+
+    def record_hit(store, *args):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return hit(store, *args)
+
+    request = RequestFactory().get(
+        '/async/aggregations/?type=total', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    with mock.patch.object(throttling.MemoryRateStore, 'hit', record_hit):
+        response = async_to_sync(AsyncAggregationView.as_view())(request)
+
+    assert response.status_code == 200
+    assert on_event_loop and not any(on_event_loop)
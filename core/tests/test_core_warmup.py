@@ -0,0 +1,35 @@
+import logging
+import pytest
+from unittest import mock
+from django.db import connection
+from core import warmup
+
+
+@pytest.mark.django_db
+def test_warm_up_runs_every_step_and_closes_connections(caplog):
+    """
+    Test that every warm-up step succeeds and no connection is left open for the fork.
+    """
+    connection.ensure_connection()
+
+    with caplog.at_level(logging.INFO, logger='core.warmup'), mock.patch.object(connection, 'close') as close:
+        timings = warmup.warm_up(freeze=False)
+
+    assert list(timings) == [step.__name__ for step in warmup.WARMUP_STEPS]
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+    close.assert_called_once()
+
+
+def test_failing_step_is_logged_and_skipped(caplog):
+    """
+    Test that a broken step does not stop the others.
+    """
+    def broken():
+        raise RuntimeError('boom')
+
+    steps = (broken, warmup.warm_resolvers)
+    with mock.patch.object(warmup, 'WARMUP_STEPS', steps):
+        timings = warmup.warm_up(freeze=False)
+
+    assert set(timings) == {'broken', 'warm_resolvers'}
+    assert 'Warm-up step broken failed.' in caplog.text
@@ -0,0 +1,217 @@
+"""
+Sliding-window request throttling.
+
+Each client gets a budget of cost units per window (`'600/min'`); views
+set `throttle_cost` so expensive endpoints (aggregations) use up more of
+it than cheap reads. The window slides by weighting the previous fixed
+window's total by how much of it still overlaps the sliding one, which
+needs two counters per client instead of a timestamp per request.
+
+Counters live in a `RateStore`:
+- `sqlite` (default): a SQLite file (`THROTTLE_STORE_PATH`) shared by all
+  worker processes on the host, updated with one UPSERT per request.
+- `memory`: a dict in the worker process. Fastest, but every process
+  counts on its own; used by the tests.
+
+Refused requests are counted too, so a client that keeps hammering stays
+throttled until it backs off.
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+CLEANUP_PROBABILITY = 0.001
+
+
+def parse_rate(rate):
+    """
+    Returns:
+        Tuple of (cost units allowed, window in seconds) for a rate such as
+        `'600/min'`.
+    """
+    limit, period = rate.split('/')
+    return int(limit), DURATIONS[period[0]]
+
+
+class RateStore:
+    """
+    Base class of the counter stores. Subclasses implement `add`.
+    """
+
+    def add(self, key, window, cost, expires):
+        """
+        Add `cost` to the counter of `key` in fixed window number `window`.
+
+        Returns:
+            Tuple of (total of the current window, total of the previous one).
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def hit(self, key, cost, limit, duration):
+        """
+        Count a request and decide whether it is within the limit.
+
+        Returns:
+            Tuple of (allowed, seconds until the client should retry).
+        """
+        now = time.time()
+        window, elapsed = divmod(now, duration)
+        count, previous = self.add(key, int(window), cost, now + 2 * duration)
+        used = previous * (1 - elapsed / duration) + count
+        if used <= limit:
+            return True, None
+        return False, duration - elapsed
+
+
+class MemoryRateStore(RateStore):
+    """
+    Counters in an LRU dict: past `max_keys` clients, the one seen least
+    recently is forgotten, at O(1) per request.
+    """
+    max_keys = 100000
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, key, window, cost, expires):
+        with self.lock:
+            last_window, count, previous = self.buckets.get(key, (window, 0, 0))
+            if last_window == window - 1:
+                count, previous = 0, count
+            elif last_window != window:
+                count, previous = 0, 0
+            count += cost
+            self.buckets[key] = (window, count, previous)
+            self.buckets.move_to_end(key)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return count, previous
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class SqliteRateStore(RateStore):
+    # Update expressions see the row as it was before the update.
+    upsert_sql = '''
+        INSERT INTO throttle (key, window, count, previous, expires) VALUES (?, ?, ?, 0, ?)
+        ON CONFLICT (key) DO UPDATE SET
+            previous = CASE
+                WHEN throttle.window = excluded.window THEN throttle.previous
+                WHEN throttle.window = excluded.window - 1 THEN throttle.count
+                ELSE 0
+            END,
+            count = CASE
+                WHEN throttle.window = excluded.window THEN throttle.count + excluded.count
+                ELSE excluded.count
+            END,
+            window = excluded.window,
+            expires = excluded.expires
+        RETURNING count, previous
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, opened again after a fork.
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle ('
+                'key TEXT PRIMARY KEY, window INTEGER NOT NULL, count INTEGER NOT NULL, '
+                'previous INTEGER NOT NULL, expires REAL NOT NULL)'
+            )
+            self.local.connection, self.local.pid = connection, os.getpid()
+        return connection
+
+    def add(self, key, window, cost, expires):
+        connection = self._connection()
+        if random.random() < CLEANUP_PROBABILITY:
+            connection.execute('DELETE FROM throttle WHERE expires < ?', [time.time()])
+        return connection.execute(self.upsert_sql, [key, window, cost, expires]).fetchone()
+
+    def reset(self):
+        self._connection().execute('DELETE FROM throttle')
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.THROTTLE_STORE == 'sqlite':
+                    _store = SqliteRateStore(settings.THROTTLE_STORE_PATH)
+                else:
+                    _store = MemoryRateStore()
+    return _store
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Throttle charging `view.throttle_cost` (default 1) per request against
+    the rate configured for `scope` in `DEFAULT_THROTTLE_RATES`.
+    """
+    scope = None
+
+    def __init__(self):
+        self.limit, self.duration = parse_rate(api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        self.retry_after = None
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        key = self.get_key(request)
+        if key is None:
+            return True
+        cost = getattr(view, 'throttle_cost', 1)
+        allowed, self.retry_after = get_store().hit(f'{self.scope}:{key}', cost, self.limit, self.duration)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottle):
+    """
+    Limits each authenticated user.
+    """
+    scope = 'user'
+
+    def get_key(self, request):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    """
+    Limits each client IP address, authenticated or not.
+    """
+    scope = 'ip'
+
+    def get_key(self, request):
+        return self.get_ident(request)
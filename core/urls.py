@@ -7,21 +7,25 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView
-)
 
 from account.urls import account_urls
 from category.urls import category_urls
+from core.schema import (
+    SchemaView,
+    SchemaSwaggerView,
+    SchemaRedocView
+)
+from core.views import (
+    ChangeFeedView,
+    DatabasePoolStatsView
+)
 
 spectacular_urls = [
-    path('schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('schema/', SchemaView.as_view(), name='schema'),
 
-    path('docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('docs/', SchemaSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
 
-    path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('redoc/', SchemaRedocView.as_view(url_name='schema'), name='redoc'),
 ]
 
 auth_urls = [
@@ -29,10 +33,16 @@ auth_urls = [
     path('login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
 
+metrics_urls = [
+    path('db-pool/', DatabasePoolStatsView.as_view(), name='db_pool_stats'),
+]
+
 api_urls = [
     path('', include(auth_urls)),
     path('', include(account_urls)),
-    path('', include(category_urls))
+    path('', include(category_urls)),
+    path('changes/', ChangeFeedView.as_view(), name='changes'),
+    path('metrics/', include(metrics_urls))
 ]
 
 urlpatterns = [
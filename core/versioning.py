@@ -0,0 +1,75 @@
+"""
+Optimistic concurrency control for single-object updates.
+
+Rows of a `core.models.VersionedModel` carry a `version` that every save
+increments. Responses for one such object send it as a strong `ETag`;
+clients echo it in `If-Match` when they update the object, and the save
+becomes a conditional `UPDATE ... WHERE version = %s`. When another write
+got there first no row matches and the client gets 412 Precondition
+Failed instead of silently overwriting the other change. No lock is held
+between reading and writing. Requests without `If-Match` (or with `*`)
+are applied unconditionally, as before.
+"""
+from django.utils.http import parse_etags
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse
+from rest_framework.exceptions import APIException, ValidationError
+
+INVALID_IF_MATCH_ERROR = 'Invalid If-Match header. Send the ETag of the resource, e.g. If-Match: "3".'
+
+
+class VersionConflict(APIException):
+    status_code = 412
+    default_detail = 'The resource was changed since you read it. Fetch it again and retry.'
+    default_code = 'version_conflict'
+
+
+def etag(instance):
+    """
+    The instance's version as an ETag, or None if the column was not loaded.
+    """
+    if 'version' in instance.get_deferred_fields():
+        return None
+    return f'"{instance.version}"'
+
+
+def expected_version(request):
+    """
+    Returns:
+        The version named by the request's `If-Match` header, or None when
+        the header is missing or `*`.
+
+    Raises:
+        ValidationError: If the header is not a single strong ETag. Weak
+            ETags (`W/"3"`) are refused, since `If-Match` compares strongly.
+    """
+    header = request.headers.get('If-Match')
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if etags == ['*']:
+        return None
+    if len(etags) != 1 or etags[0].startswith('W/') or not etags[0][1:-1].isdigit():
+        raise ValidationError({'error': INVALID_IF_MATCH_ERROR})
+    return int(etags[0][1:-1])
+
+
+def check_version(instance, version):
+    """
+    Fail early when the object read for an update is already past the
+    expected version, and make its next save conditional on that version.
+    """
+    if version is None:
+        return
+    if instance.version != version:
+        raise VersionConflict()
+    instance.expected_version = version
+
+
+IF_MATCH_PARAMETER = OpenApiParameter(
+    name='If-Match',
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    description='ETag of the version being updated, e.g. `"3"`. When it is stale the update is refused with 412.',
+)
+VERSION_CONFLICT_RESPONSE = OpenApiResponse(description='The resource was changed since the `If-Match` version.')
@@ -0,0 +1,89 @@
+from rest_framework.permissions import (
+    IsAdminUser,
+    IsAuthenticated
+)
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework import status
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+
+from core.changes import get_changes
+from core.db.pool import pool_stats
+
+CHANGES_DEFAULT_LIMIT = 100
+CHANGES_MAX_LIMIT = 1000
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Expose the connection pool metrics of the worker serving the request.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        description=(
+            'Connection pool gauges and counters per database alias for the worker '
+            'process that handled the request. Only available to staff users.'
+        ),
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(pool_stats())
+
+
+class ChangeFeedView(APIView):
+    """
+    Incremental sync: changes to the user's expenses, categories and budget.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        description=(
+            'Return the changes made after `since`, oldest first. Each entry has the change '
+            '`seq`, the `model` (`expense`, `category` or `budget`), the object `id`, the '
+            '`action` (`create`, `update` or `delete`) and the current row in `data` '
+            '(`null` for deletes).\n\n'
+            'Store the returned `cursor` and pass it as `since` on the next sync. '
+            'Keep fetching while `has_more` is true.\n\n'
+            'Delivery is at least once: the cursor does not move past changes made in the last '
+            'few seconds, which are returned again by the next sync. Apply changes as idempotent '
+            'upserts and deletes keyed by `model` and `id`.'
+        ),
+        parameters=[
+            OpenApiParameter(
+                name='since',
+                type=OpenApiTypes.INT,
+                description='Cursor returned by the previous sync. Use `0` for a full sync.',
+                required=False
+            ),
+            OpenApiParameter(
+                name='limit',
+                type=OpenApiTypes.INT,
+                description=f'Maximum number of changes to return (1-{CHANGES_MAX_LIMIT}).',
+                required=False
+            ),
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', CHANGES_DEFAULT_LIMIT))
+        except ValueError:
+            return Response(
+                {'error': "'since' and 'limit' must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if since < 0 or not 1 <= limit <= CHANGES_MAX_LIMIT:
+            return Response(
+                {'error': f"'since' must not be negative and 'limit' between 1 and {CHANGES_MAX_LIMIT}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        changes, cursor, has_more = get_changes(request.user, since=since, limit=limit)
+        return Response({
+            'changes': changes,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
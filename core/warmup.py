@@ -0,0 +1,123 @@
+"""
+Worker warm-up.
+
+Django and DRF build most of their request machinery lazily, so the first
+requests a worker serves pay for compiling URL patterns, introspecting
+serializer fields, building filterset forms and loading the JWT backend.
+`warm_up()` does that work up front. Called from `core/wsgi.py` and
+`core/asgi.py`, it runs in the master process when the server preloads the
+application (e.g. `gunicorn --preload`), so forked workers share the
+result. It ends with `gc.freeze()`, which moves everything allocated so far
+out of the collector's reach: collections in the workers then no longer
+touch (and copy) the shared pages.
+
+No database connection is left open, since connections must not be shared
+across a fork.
+"""
+import gc
+import logging
+import time
+
+from django.db import connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def _iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield pattern
+            yield from _iter_patterns(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+def _view_classes():
+    classes = []
+    for pattern in _iter_patterns(get_resolver().url_patterns):
+        if not isinstance(pattern, URLPattern):
+            continue
+        view_class = getattr(pattern.callback, 'cls', None) or getattr(pattern.callback, 'view_class', None)
+        if view_class is not None and view_class not in classes:
+            classes.append(view_class)
+    return classes
+
+
+def warm_resolvers():
+    resolver = get_resolver()
+    # Builds the reverse lookup tables and compiles every pattern's regex.
+    resolver.reverse_dict
+    for pattern in _iter_patterns(resolver.url_patterns):
+        pattern.pattern.regex
+
+
+def warm_serializers():
+    for view_class in _view_classes():
+        serializer_class = getattr(view_class, 'serializer_class', None)
+        if serializer_class is not None:
+            serializer_class().fields
+
+
+def warm_filtersets():
+    for view_class in _view_classes():
+        filterset_class = getattr(view_class, 'filterset_class', None)
+        if filterset_class is not None:
+            filterset_class(queryset=filterset_class._meta.model.objects.none()).form
+
+
+def warm_jwt():
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    # Encoding and decoding a token loads the signing algorithm.
+    token = AccessToken()
+    JWTAuthentication().get_validated_token(str(token).encode())
+
+
+def warm_schema():
+    from core.schema import get_schema_document, schema_is_built
+
+    # Generating the schema takes long; only load a prebuilt one.
+    if schema_is_built():
+        get_schema_document('json')
+
+
+WARMUP_STEPS = (
+    warm_resolvers,
+    warm_serializers,
+    warm_filtersets,
+    warm_jwt,
+    warm_schema,
+)
+
+
+def warm_up(freeze=True):
+    """
+    Prime the lazily initialized request paths, then freeze the GC.
+
+    A failing step is logged and skipped: warm-up must never keep a worker
+    from starting.
+
+    Returns:
+        Dict of seconds spent per step.
+    """
+    timings = {}
+    for step in WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('Warm-up step %s failed.', step.__name__)
+        timings[step.__name__] = time.perf_counter() - start
+    # Servers such as uvicorn import the application inside their event loop,
+    # where closing a connection is refused even if it was never opened.
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            connection.close()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    logger.info('Warm-up finished in %.0f ms.', sum(timings.values()) * 1000)
+    return timings
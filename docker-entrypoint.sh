@@ -10,6 +10,8 @@ done
 echo "PostgreSQL started"
 echo "Running migrations"
 python3 manage.py migrate
+echo "Building API schema..."
+python3 manage.py build_schema
 echo "Creating predefined categories..."
 python3 manage.py create_predefined_categories
 echo "Creating superuser..."